@@ -1,5 +1,8 @@
+from abc import ABC, abstractmethod
 from dataclasses import dataclass
-import json, random
+from collections.abc import Sequence
+from core import io as core_io
+import numpy as np
 
 @dataclass
 class Item:
@@ -9,100 +12,162 @@ class Item:
     domain: str
     meta: dict | None = None
 
-def make_simple_math(n:int=10, seed:int=0, mode:str="single"):
+
+class ItemBatch(Sequence, ABC):
     """
-    mode = "single" (a±b), "multi" (2-step), "negatives" (includes negatives), "carry" (bigger numbers)
+    Array-backed, read-only sequence of items. Columns are NumPy arrays; an
+    `Item` is only built when one is indexed or iterated over. Subclasses
+    build the item for row i in `_item`.
     """
-    random.seed(seed)
-    items=[]
-    for i in range(n):
-        if mode == "single":
-            a,b = random.randint(1,20), random.randint(1,20)
-            op = random.choice(["+","-"])
-            ans = a+b if op=="+" else a-b
-            prompt = f"{a} {op} {b} = ?"
-        elif mode == "multi":
-            # two-step arithmetic (a±b±c)
-            a,b,c = random.randint(1,30), random.randint(1,30), random.randint(1,30)
-            op1, op2 = random.choice(["+","-"]), random.choice(["+","-"])
-            ans = (a+b if op1=="+" else a-b)
-            ans = ans + c if op2=="+" else ans - c
-            prompt = f"{a} {op1} {b} {op2} {c} = ?"
-        elif mode == "negatives":
-            a,b = random.randint(-20,20), random.randint(-20,20)
-            op = random.choice(["+","-"])
-            ans = a+b if op=="+" else a-b
-            prompt = f"{a} {op} {b} = ?"
-        elif mode == "carry":
-            a,b = random.randint(50,999), random.randint(50,999)
-            op = random.choice(["+","-"])
-            ans = a+b if op=="+" else a-b
-            prompt = f"{a} {op} {b} = ?"
-        else:
-            raise ValueError(f"unknown mode: {mode}")
-
-        items.append(Item(
-            id=f"math-{mode}-{i}",
-            prompt=prompt,
-            answer=str(ans),
+    domain = ""
+
+    def __init__(self, columns: dict, offset: int = 0):
+        self.columns = columns
+        self.offset = offset  # global index of row 0, so a slice keeps its items' ids
+
+    def __len__(self):
+        return len(next(iter(self.columns.values())))
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            rows = range(len(self))[i]
+            if rows.step != 1:
+                raise ValueError("ItemBatch slices must be contiguous (item ids follow the row index)")
+            start = rows.start if rows else 0
+            return type(self)({k: v[i] for k, v in self.columns.items()}, self.offset + start, **self._extra())
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._item(i)
+
+    def _extra(self) -> dict:
+        return {}
+
+    @abstractmethod
+    def _item(self, i: int) -> Item:
+        ...
+
+
+# --- Math dataset (a±b, a±b±c) ---
+
+MATH_RANGES = {
+    "single": (1, 20),
+    "multi": (1, 30),       # two-step arithmetic (a±b±c)
+    "negatives": (-20, 20),
+    "carry": (50, 999),     # bigger numbers
+}
+OPS = np.array(["+", "-"])
+
+
+class MathBatch(ItemBatch):
+    domain = "math"
+
+    def __init__(self, columns: dict, offset: int = 0, mode: str = "single"):
+        super().__init__(columns, offset)
+        self.mode = mode
+
+    def _extra(self):
+        return {"mode": self.mode}
+
+    def _item(self, i):
+        c = self.columns
+        prompt = f"{c['a'][i]} {OPS[c['op1'][i]]} {c['b'][i]}"
+        if "c" in c:
+            prompt += f" {OPS[c['op2'][i]]} {c['c'][i]}"
+        return Item(
+            id=f"math-{self.mode}-{self.offset + i}",
+            prompt=prompt + " = ?",
+            answer=str(c["answer"][i]),
             domain="math",
-            meta={"mode": mode}
-        ))
-    return items
+            meta={"mode": self.mode},
+        )
 
-def save_benchmark(items, path:str):
-    with open(path, "w") as f:
-        json.dump([item.__dict__ for item in items], f, indent=2)
 
-        # --- Reasoning dataset (binary "Yes/No" with explanation) ---
+def math_arrays(n: int, rng: np.random.Generator, mode: str = "single") -> dict:
+    """Operands, operator codes (0 '+', 1 '-') and gold answers as int32 arrays."""
+    if mode not in MATH_RANGES:
+        raise ValueError(f"unknown mode: {mode}")
+    lo, hi = MATH_RANGES[mode]
+    cols = {
+        "a": rng.integers(lo, hi + 1, n, dtype=np.int32),
+        "b": rng.integers(lo, hi + 1, n, dtype=np.int32),
+        "op1": rng.integers(0, 2, n, dtype=np.int8),
+    }
+    ans = np.where(cols["op1"] == 0, cols["a"] + cols["b"], cols["a"] - cols["b"])
+    if mode == "multi":
+        cols["c"] = rng.integers(lo, hi + 1, n, dtype=np.int32)
+        cols["op2"] = rng.integers(0, 2, n, dtype=np.int8)
+        ans = np.where(cols["op2"] == 0, ans + cols["c"], ans - cols["c"])
+    cols["answer"] = ans.astype(np.int32)
+    return cols
 
-def make_reasoning(n: int = 10, seed: int = 0):
+def make_simple_math(n:int=10, seed:int=0, mode:str="single") -> MathBatch:
     """
-    Generate simple logic/entailment tasks that require an explanation.
-    Gold is 'Yes' or 'No' + a reference rationale string.
+    mode = "single" (a±b), "multi" (2-step), "negatives" (includes negatives), "carry" (bigger numbers)
+    Uses its own Generator per seed; global `random` state is left alone.
     """
-    import random
-    random.seed(seed)
-    items = []
-
-    # A few templates
-    templates = [
-        # syllogism
-        ("All {A} are {B}. {X} is a {A}. Is {X} a {B}?",
-         lambda A,B,X: ("Yes", f"By universal rule 'All {A} are {B}', and {X} is {A}, so {X} is {B}.")),
-        # denial of the antecedent
-        ("If {A} then {B}. Not {A}. Is {B} true?",
-         lambda A,B,_: ("No", f"Denying antecedent is invalid; from not {A} we cannot infer {B}.")),
-        # modus ponens
-        ("If {A} then {B}. {A}. Is {B} true?",
-         lambda A,B,_: ("Yes", f"Modus ponens: {A} ⇒ {B}; given {A}, therefore {B}.")),
-        # subset/entailment
-        ("Every {A} likes {B}. {X} is a {A}. Does {X} like {B}?",
-         lambda A,B,X: ("Yes", f"Universal statement applies to all {A}; {X} is {A}, so yes.")),
-        # contrapositive intuition
-        ("If {A} then {B}. {B} is false. Is {A} false?",
-         lambda A,B,_: ("Yes", f"Contrapositive: If A→B then ¬B→¬A; since ¬{B}, ¬{A}."))
-    ]
-    nouns = ["cats", "teachers", "robots", "scientists", "painters", "drivers"]
-    props = ["mammals", "smart", "licensed", "tired", "happy", "kind"]
-    names = ["Alex", "Sam", "Riley", "Jordan", "Casey", "Taylor"]
-
-    for i in range(n):
-        t, gold_fn = random.choice(templates)
-        A = random.choice(nouns); B = random.choice(props); X = random.choice(names)
-        prompt = t.format(A=A, B=B, X=X)
+    return MathBatch(math_arrays(n, np.random.default_rng(seed), mode), mode=mode)
+
+def save_benchmark(items, path:str, out=None):
+    """Atomic JSON copy of a dataset; with `out` (a core.io.ArtifactWriter) it joins that batch."""
+    (out or core_io).write_json(path, [item.__dict__ for item in items])
+
+        # --- Reasoning dataset (binary "Yes/No" with explanation) ---
+
+# A few templates
+REASON_TEMPLATES = [
+    # syllogism
+    ("All {A} are {B}. {X} is a {A}. Is {X} a {B}?",
+     lambda A,B,X: ("Yes", f"By universal rule 'All {A} are {B}', and {X} is {A}, so {X} is {B}.")),
+    # denial of the antecedent
+    ("If {A} then {B}. Not {A}. Is {B} true?",
+     lambda A,B,_: ("No", f"Denying antecedent is invalid; from not {A} we cannot infer {B}.")),
+    # modus ponens
+    ("If {A} then {B}. {A}. Is {B} true?",
+     lambda A,B,_: ("Yes", f"Modus ponens: {A} ⇒ {B}; given {A}, therefore {B}.")),
+    # subset/entailment
+    ("Every {A} likes {B}. {X} is a {A}. Does {X} like {B}?",
+     lambda A,B,X: ("Yes", f"Universal statement applies to all {A}; {X} is {A}, so yes.")),
+    # contrapositive intuition
+    ("If {A} then {B}. {B} is false. Is {A} false?",
+     lambda A,B,_: ("Yes", f"Contrapositive: If A→B then ¬B→¬A; since ¬{B}, ¬{A}."))
+]
+NOUNS = ["cats", "teachers", "robots", "scientists", "painters", "drivers"]
+PROPS = ["mammals", "smart", "licensed", "tired", "happy", "kind"]
+NAMES = ["Alex", "Sam", "Riley", "Jordan", "Casey", "Taylor"]
+
+
+class ReasonBatch(ItemBatch):
+    domain = "reason"
+
+    def _item(self, i):
+        c = self.columns
+        t, gold_fn = REASON_TEMPLATES[c["template"][i]]
+        A, B, X = NOUNS[c["noun"][i]], PROPS[c["prop"][i]], NAMES[c["name"][i]]
         yesno, rationale = gold_fn(A,B,X)
-        # ask model to answer + explain + put final label
-        user = (
-            prompt + "\n\n"
-            "Answer Yes or No and explain in 2–3 sentences.\n"
-            "Put your final decision on a new last line exactly as: Final: Yes   or   Final: No"
-        )
-        items.append(Item(
-            id=f"reason-{i}",
-            prompt=user,
+        # answer/explain/final-label instructions live in the shared system prompt (models/prompts.REASON)
+        return Item(
+            id=f"reason-{self.offset + i}",
+            prompt=t.format(A=A, B=B, X=X),
             answer=yesno,     # gold label only; rationale is free-form
             domain="reason",
             meta={"rationale": rationale}
-        ))
-    return items
\ No newline at end of file
+        )
+
+
+def reasoning_arrays(n: int, rng: np.random.Generator) -> dict:
+    """Template / noun / property / name indices as small int arrays."""
+    return {
+        "template": rng.integers(0, len(REASON_TEMPLATES), n, dtype=np.int8),
+        "noun": rng.integers(0, len(NOUNS), n, dtype=np.int8),
+        "prop": rng.integers(0, len(PROPS), n, dtype=np.int8),
+        "name": rng.integers(0, len(NAMES), n, dtype=np.int8),
+    }
+
+def make_reasoning(n: int = 10, seed: int = 0) -> ReasonBatch:
+    """
+    Generate simple logic/entailment tasks that require an explanation.
+    Gold is 'Yes' or 'No' + a reference rationale string.
+    """
+    return ReasonBatch(reasoning_arrays(n, np.random.default_rng(seed)))
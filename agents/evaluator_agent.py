@@ -1,57 +1,84 @@
-from core.scoring import exact_match, score_run
-from models.ollama_client import chat
+from core.scoring import score_records, score_run
 
-def evaluate(records):
-    for r in records:
-        r["correct"] = exact_match(r["pred"], r["gold"])
+def evaluate(records, metric: str | None = None, **opts):
+    """Math records: numeric answer match by default (see core.scoring.METRICS for others)."""
+    score_records(records, "math", metric=metric, **opts)
     return score_run(records)
 
 
 
 import re
-from core.scoring import exact_match, score_run
-from models.ollama_client import chat
-
-FINAL_RE = re.compile(r"Final:\s*(Yes|No)\s*$", re.IGNORECASE | re.MULTILINE)
-
-def parse_final_yesno(text: str) -> str | None:
-    m = FINAL_RE.search(text)
-    return m.group(1).capitalize() if m else None
+from core.scoring import FINAL_RE, extract_yesno as parse_final_yesno
+from core.scheduler import gather_bounded
+from models import prompts
 
 async def llm_judge_score(judge_model: str, gold_label: str, gold_rationale: str, pred_text: str) -> float:
     """
     Ask a local model to grade the explanation quality on 1..5.
+    The rubric is the shared prompts.JUDGE prefix; only the item follows it.
     """
-    rubric = (
-        "You are a strict evaluator.\n"
-        "Score the ASSISTANT'S explanation from 1.0 to 5.0 based on:\n"
-        "  (1) Correctness of final Yes/No vs GOLD label\n"
-        "  (2) Soundness and clarity of reasoning\n"
-        "  (3) Consistency with the gold rationale\n"
-        "Output ONLY a number (e.g., 4.0)."
-        f"\n\nGOLD LABEL: {gold_label}\nGOLD RATIONALE: {gold_rationale}\n\nASSISTANT:\n{pred_text}\n"
-    )
-    msgs = [
-        {"role": "system", "content": "Return only a numeric score."},
-        {"role": "user", "content": rubric},
-    ]
+    item = f"GOLD LABEL: {gold_label}\nGOLD RATIONALE: {gold_rationale}\n\nASSISTANT:\n{pred_text}\n"
     try:
-        txt = await chat(judge_model, msgs, temperature=0.0)
+        txt = await prompts.JUDGE.chat(judge_model, item, temperature=0.0)
         return float(re.findall(r"\d+(?:\.\d+)?", txt)[0])
     except Exception:
         return 3.0  # neutral fallback
 
-async def evaluate_reasoning(records, judge_model: str):
+async def llm_judge_batch(judge_model: str, records: list[dict]) -> list[float] | None:
+    """
+    Grade several records with one judge call. Returns one score per record,
+    or None when the reply can't be parsed into exactly len(records) scores.
+    """
+    blocks = "\n\n".join(
+        f"### ITEM {i}\nGOLD LABEL: {r['gold']}\nGOLD RATIONALE: {r.get('gold_rationale','')}\n"
+        f"ASSISTANT:\n{r['pred_text']}"
+        for i, r in enumerate(records, 1)
+    )
+    try:
+        txt = await prompts.JUDGE_BATCH.chat(
+            judge_model, f"{blocks}\n\nOutput exactly {len(records)} lines.", temperature=0.0
+        )
+    except Exception:
+        return None
+    scores = {int(i): float(v) for i, v in re.findall(r"^\s*(?:ITEM\s*)?(\d+)\s*[:.)-]\s*(\d+(?:\.\d+)?)", txt, re.MULTILINE | re.IGNORECASE)}
+    if sorted(scores) != list(range(1, len(records) + 1)):
+        return None
+    return [scores[i] for i in range(1, len(records) + 1)]
+
+def label_accuracy(records) -> float:
+    """Parse each record's final Yes/No into pred_label/correct; returns label accuracy."""
+    for r in records:
+        r["pred_label"] = parse_final_yesno(r["pred_text"]) or ""
+    return float(score_records(records, "reason").sum()) / max(1, len(records))
+
+async def evaluate_reasoning(records, judge_model: str, *, concurrency: int = 4, batch_size: int = 1, limiter=None):
     """
     records: list of dicts with keys {id, prompt, gold, pred_text}
     Returns metrics with both exact label accuracy and avg judge score.
+    Judge calls run `concurrency` at a time; batch_size>1 packs that many
+    records into one rubric prompt, and the records of a packed reply that
+    doesn't parse are then graded individually.
     """
-    for r in records:
-        label = parse_final_yesno(r["pred_text"]) or ""
-        r["pred_label"] = label
-        r["correct"] = 1 if label and exact_match(label, r["gold"]) else 0
-        r["judge"] = await llm_judge_score(judge_model, r["gold"], r.get("gold_rationale",""), r["pred_text"])
-    acc = sum(r["correct"] for r in records) / max(1, len(records))
+    acc = label_accuracy(records)
+    k = max(1, batch_size)
+    ungraded = records
+    if k > 1:
+        chunks = [records[i:i + k] for i in range(0, len(records), k)]
+        ungraded = chunks.pop() if len(chunks[-1]) == 1 else []
+        results = await gather_bounded(lambda c: llm_judge_batch(judge_model, c), chunks, limit=concurrency,
+                                       limiter=limiter)
+        for chunk, scores in zip(chunks, results):
+            if scores is None:
+                ungraded += chunk  # the packed reply didn't parse: grade these one by one
+                continue
+            for r, score in zip(chunk, scores):
+                r["judge"] = score
+    scores = await gather_bounded(
+        lambda r: llm_judge_score(judge_model, r["gold"], r.get("gold_rationale", ""), r["pred_text"]),
+        ungraded, limit=concurrency, limiter=limiter,
+    )
+    for r, score in zip(ungraded, scores):
+        r["judge"] = score
     judge_avg = sum(r["judge"] for r in records) / max(1, len(records))
     return {"accuracy": acc, "judge_avg": judge_avg, "n": len(records)}
 
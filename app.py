@@ -1,22 +1,47 @@
 # app.py
+# Kept light on purpose: schedulers call the CLI many times, so typer and the
+# pipeline (orchestrator -> httpx, yaml, numpy, agents) are only imported once
+# a command runs, and not at all when the job goes to a daemon (daemon.py).
+# tools/bench_startup.py guards the cold-start cost of `python app.py <cmd>`.
 import os
-import asyncio
-import typer
 
-from orchestrator import run_round, run_experiment
+# ---------- helpers ----------
+def _run(cmd: str, no_cache: bool = False, **kwargs):
+    """
+    Run an eval/experiment/tournament job: in the daemon listening on
+    $AUTOEVAL_DAEMON if there is one, else in this process. no_cache jobs
+    always run here (the daemon's cache setting is shared by all its jobs), as
+    do jobs the daemon can't take: nothing listening on a leftover socket
+    file, or a daemon started in another directory/environment.
+    """
+    sock = os.environ.get("AUTOEVAL_DAEMON", "")
+    if sock and os.path.exists(sock) and not no_cache:
+        from daemon import Refused, submit
 
-app = typer.Typer(add_completion=False)
+        try:
+            return submit(sock, cmd, kwargs)
+        except (ConnectionRefusedError, FileNotFoundError):
+            print(f"[warn] no daemon listening on {sock}; running here")
+        except Refused as e:
+            print(f"[warn] daemon on {sock} can't take this job ({e}); running here")
+    import asyncio
+    from daemon import run_job
 
-# ---------- helpers ----------
-def _run_eval(n: int, model: str, mode: str, domain: str, judge_model: str | None):
-    os.environ["CANDIDATE_MODEL"] = model
-    report = asyncio.run(
-        run_round(
-            n_items=n,
-            mode=mode,
-            domain=domain,
-            judge_model=judge_model,
-        )
+    if no_cache:
+        os.environ["AUTOEVAL_NO_CACHE"] = "1"
+    return asyncio.run(run_job(cmd, kwargs))
+
+def _run_eval(n: int, model: str, mode: str, domain: str, judge_model: str | None, resume: str | None = None,
+              no_cache: bool = False):
+    report = _run(
+        "eval",
+        no_cache,
+        n_items=n,
+        mode=mode,
+        domain=domain,
+        judge_model=judge_model,
+        model=model,
+        resume=resume,
     )
     print("\n=== REPORT ===")
     print(report["metrics"])
@@ -31,32 +56,48 @@ def _run_experiment(
     plateau_delta: float,
     domain: str,
     judge_model: str | None,
+    resume: str | None = None,
+    no_cache: bool = False,
 ):
-    os.environ["CANDIDATE_MODEL"] = model
-    asyncio.run(
-        run_experiment(
-            rounds=rounds,
-            start_mode=start_mode,
-            n_items=n,
-            plateau_delta=plateau_delta,
-            domain=domain,
-            judge_model=judge_model,
-        )
+    _run(
+        "experiment",
+        no_cache,
+        rounds=rounds,
+        start_mode=start_mode,
+        n_items=n,
+        plateau_delta=plateau_delta,
+        domain=domain,
+        judge_model=judge_model,
+        model=model,
+        resume=resume,
     )
 
-# ---------- typer commands ----------
-@app.command("eval")
+def _run_tournament(models: str, rounds: int, mode: str, n: int, domain: str, judge_model: str | None,
+                    no_cache: bool = False):
+    _run(
+        "tournament",
+        no_cache,
+        models=[m.strip() for m in models.split(",") if m.strip()],
+        domain=domain,
+        mode=mode,
+        n_items=n,
+        rounds=rounds,
+        judge_model=judge_model,
+    )
+
+# ---------- commands (registered with typer in _typer_app) ----------
 def eval_cmd(
     n: int = 10,
     model: str = "qwen2.5:0.5b-instruct",
     mode: str = "single",                # used for math only
     domain: str = "math",                # "math" | "reason"
     judge_model: str = "",               # optional, for domain="reason"
+    no_cache: bool = False,              # bypass the model response cache
+    resume: str = "",                    # run_id of an interrupted round
 ):
     jm = judge_model or None
-    _run_eval(n=n, model=model, mode=mode, domain=domain, judge_model=jm)
+    _run_eval(n=n, model=model, mode=mode, domain=domain, judge_model=jm, resume=resume or None, no_cache=no_cache)
 
-@app.command("experiment")
 def experiment_cmd(
     rounds: int = 5,
     start_mode: str = "single",          # math only
@@ -65,6 +106,8 @@ def experiment_cmd(
     plateau_delta: float = 0.01,
     domain: str = "math",                # "math" | "reason"
     judge_model: str = "",               # optional, for domain="reason"
+    no_cache: bool = False,              # bypass the model response cache
+    resume: str = "",                    # exp_id of an interrupted experiment
 ):
     jm = judge_model or None
     _run_experiment(
@@ -75,16 +118,170 @@ def experiment_cmd(
         plateau_delta=plateau_delta,
         domain=domain,
         judge_model=jm,
+        resume=resume or None,
+        no_cache=no_cache,
+    )
+
+def tournament_cmd(
+    models: str = "qwen2.5:0.5b-instruct,gemma3:1b",   # comma-separated candidates
+    rounds: int = 1,
+    mode: str = "single",                # math only, same for every model
+    n: int = 12,
+    domain: str = "math",                # "math" | "reason"
+    judge_model: str = "",               # optional, for domain="reason"
+    no_cache: bool = False,              # bypass the model response cache
+):
+    jm = judge_model or None
+    _run_tournament(models=models, rounds=rounds, mode=mode, n=n, domain=domain, judge_model=jm, no_cache=no_cache)
+
+def rescore_cmd(
+    metric: str = "numeric",             # any core.scoring metric (exact/numeric/yesno/f1/regex) or "judge"
+    runs: str = "",                      # comma-separated run_ids (default: all runs in the store)
+    model: str = "",                     # only runs of this candidate model
+    mode: str = "",                      # only runs of this mode/domain
+    version: str = "",                   # result version tag (default: metric + hash of its options)
+    pattern: str = "",                   # regex metric: pattern to search each pred for
+    rel_tol: float = 1e-6,               # numeric metric tolerance
+    judge_model: str = "",               # judge metric (default: each run's recorded judge)
+    workers: int = 0,                    # parser processes (0 = CPU count)
+    plugin: str = "",                    # comma-separated modules that register extra metrics
+):
+    """Re-score archived records offline and store the results in the run store."""
+    from core.rescore import rescore
+
+    opts = {}
+    if metric == "numeric":
+        opts["rel_tol"] = rel_tol
+    if metric == "regex" and pattern:
+        opts["pattern"] = pattern
+    rows = rescore(
+        metric,
+        run_ids=[r.strip() for r in runs.split(",") if r.strip()] or None,
+        model=model or None,
+        mode=mode or None,
+        version=version or None,
+        workers=workers or None,
+        plugins=tuple(m.strip() for m in plugin.split(",") if m.strip()),
+        judge_model=judge_model or None,
+        **opts,
     )
+    for r in rows:
+        print(f"{r['run_id']}  {r['metric']}={r['value']:.4f}  (n={r['n']})")
+    print(f"Stored {len(rows)} results as version {rows[0]['version'] if rows else '-'}")
+
+def export_cmd(
+    run_id: str,                         # run whose rows to export
+    kind: str = "records",               # "records" | "benchmark"
+    outdir: str = "experiments",         # the round's outdir (rows are in <outdir>/store)
+    out: str = "",                       # output file (default: <outdir>/<run_id>_<kind>.json)
+):
+    """Write one run's stored rows as the legacy pretty-printed JSON file."""
+    from core.records import count_rows, export_json
+
+    root = f"{outdir}/store"
+    if not count_rows(run_id, kind, root):
+        raise SystemExit(f"no {kind} for run {run_id} in {root}")
+    path = out or f"{outdir}/{run_id}_{kind}.json"
+    export_json(run_id, kind, path, root=root)
+    print(f"Wrote {count_rows(run_id, kind, root)} rows to {path}")
+
+def worker_cmd(
+    queue: str = "experiments/queue.sqlite",  # same file as `work_queue` in the coordinator's governance.yaml
+    name: str = "",                      # worker name in records (default: host-pid)
+    idle_exit: float = 0.0,              # exit after this many idle seconds (0 = run until interrupted)
+):
+    """Serve distributed work units against this host's Ollama."""
+    import asyncio
+    from worker import run_worker
+
+    try:
+        n = asyncio.run(run_worker(queue, name=name or None, idle_exit_s=idle_exit or None))
+        print(f"Processed {n} work units")
+    except KeyboardInterrupt:
+        pass
+
+def serve_cmd(
+    socket: str = "experiments/autoeval.sock",  # clients set AUTOEVAL_DAEMON to this path
+):
+    """Run the eval daemon: one warm process that eval/experiment/tournament calls are forwarded to."""
+    import asyncio
+    from daemon import serve
+
+    try:
+        asyncio.run(serve(socket))
+    except KeyboardInterrupt:
+        pass
+
+def server_cmd(
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    outdir: str = "experiments",         # where every job writes (jobs can't override it); run store: <outdir>/runs.sqlite unless $AUTOEVAL_RUN_STORE
+):
+    """Run the eval job service: an HTTP API with queued, prioritised eval/experiment/tournament jobs."""
+    import asyncio
+    from server import serve
+
+    try:
+        asyncio.run(serve(host, port, outdir))
+    except KeyboardInterrupt:
+        pass
+
+COMMANDS = {
+    "eval": eval_cmd,
+    "experiment": experiment_cmd,
+    "tournament": tournament_cmd,
+    "rescore": rescore_cmd,
+    "export": export_cmd,
+    "worker": worker_cmd,
+    "serve": serve_cmd,
+    "server": server_cmd,
+}
+
+def _parse_args(fn, argv):
+    """
+    Parse `argv` into fn's keyword arguments with argparse, using the same
+    option names typer derives from the signature (--judge-model, --no-cache).
+    Used for jobs forwarded to the daemon, so that path never imports typer.
+    """
+    import argparse
+
+    code = fn.__code__
+    parser = argparse.ArgumentParser(prog=f"app.py {fn.__name__.removesuffix('_cmd')}")
+    for name, default in zip(code.co_varnames[code.co_argcount - len(fn.__defaults__):code.co_argcount],
+                             fn.__defaults__):
+        flag = "--" + name.replace("_", "-")
+        if isinstance(default, bool):
+            parser.add_argument(flag, dest=name, action="store_true", default=default)
+        else:
+            parser.add_argument(flag, dest=name, type=type(default), default=default)
+    return vars(parser.parse_args(argv))
+
+def _forwarded(argv) -> bool:
+    """A job command that will go to the daemon (see _run)."""
+    sock = os.environ.get("AUTOEVAL_DAEMON", "")
+    return (len(argv) > 1 and argv[1] in ("eval", "experiment", "tournament") and bool(sock)
+            and os.path.exists(sock) and "--no-cache" not in argv)
+
+def _typer_app():
+    import typer
+
+    app = typer.Typer(add_completion=False)
+    for name, fn in COMMANDS.items():
+        app.command(name)(fn)
+    return app
 
 # ---------- argparse fallback ----------
 if __name__ == "__main__":
     import sys
     import argparse
 
-    # If user explicitly calls a Typer subcommand, delegate to Typer.
-    if len(sys.argv) > 1 and sys.argv[1] in {"eval", "experiment"}:
-        app()
+    # Jobs for the daemon are parsed here, without importing typer; any other
+    # explicit subcommand is delegated to Typer.
+    if _forwarded(sys.argv):
+        fn = COMMANDS[sys.argv[1]]
+        fn(**_parse_args(fn, sys.argv[2:]))
+    elif len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        _typer_app()()
     else:
         parser = argparse.ArgumentParser(description="AutoEval Lab CLI (fallback)")
         parser.add_argument("--n", type=int, default=10, help="Number of items per round")
@@ -92,6 +289,9 @@ if __name__ == "__main__":
         parser.add_argument("--mode", type=str, default="single", help="Difficulty mode (math only)")
         parser.add_argument("--domain", type=str, default="math", choices=["math", "reason"], help="Evaluation domain")
         parser.add_argument("--judge-model", type=str, default="", help="Judge model for reasoning domain (optional)")
+        parser.add_argument("--models", type=str, default="", help="Comma-separated candidates: run a tournament on shared datasets")
+        parser.add_argument("--no-cache", action="store_true", help="Bypass the model response cache")
+        parser.add_argument("--resume", type=str, default="", help="run_id (eval) or exp_id (experiment) to resume")
 
         # experiment options (set --rounds>0 to run multi-round experiment)
         parser.add_argument("--rounds", type=int, default=0, help="If >0, run a self-improving experiment for N rounds")
@@ -101,7 +301,17 @@ if __name__ == "__main__":
         args = parser.parse_args()
         jm = args.judge_model or None
 
-        if args.rounds and args.rounds > 0:
+        if args.models:
+            _run_tournament(
+                models=args.models,
+                rounds=max(1, args.rounds),
+                mode=args.mode,
+                n=args.n,
+                domain=args.domain,
+                judge_model=jm,
+                no_cache=args.no_cache,
+            )
+        elif args.rounds and args.rounds > 0:
             _run_experiment(
                 rounds=args.rounds,
                 start_mode=args.start_mode,
@@ -110,6 +320,8 @@ if __name__ == "__main__":
                 plateau_delta=args.plateau_delta,
                 domain=args.domain,
                 judge_model=jm,
+                resume=args.resume or None,
+                no_cache=args.no_cache,
             )
         else:
             _run_eval(
@@ -118,4 +330,6 @@ if __name__ == "__main__":
                 mode=args.mode,
                 domain=args.domain,
                 judge_model=jm,
-            )
\ No newline at end of file
+                resume=args.resume or None,
+                no_cache=args.no_cache,
+            )
@@ -0,0 +1,78 @@
+import hashlib, json, os, sqlite3, time
+
+CACHE_PATH = os.environ.get("AUTOEVAL_CACHE_PATH", "experiments/cache/responses.sqlite")
+CACHE_MAX_MB = float(os.environ.get("AUTOEVAL_CACHE_MAX_MB", "256"))
+
+
+def cache_key(model: str, messages: list[dict], options: dict) -> str:
+    """sha256 over model + messages (whitespace-trimmed) + options, key order independent."""
+    norm = {
+        "model": model,
+        "messages": [{"role": m.get("role", ""), "content": (m.get("content") or "").strip()} for m in messages],
+        "options": options,
+    }
+    return hashlib.sha256(json.dumps(norm, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    On-disk, content-addressed store of model replies (sqlite).
+    Least-recently-used entries are evicted once the total exceeds `max_mb`.
+    """
+    def __init__(self, path: str = CACHE_PATH, max_mb: float = CACHE_MAX_MB):
+        self.path = path
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self._db = None
+
+    def _conn(self):
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(self.path)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, atime REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_atime ON responses(atime)")
+        return self._db
+
+    def get(self, key: str) -> str | None:
+        db = self._conn()
+        row = db.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        db.execute("UPDATE responses SET atime = ? WHERE key = ?", (time.time(), key))
+        db.commit()
+        return row[0]
+
+    def put(self, key: str, value: str):
+        db = self._conn()
+        size = len(value.encode())
+        db.execute(
+            "INSERT OR REPLACE INTO responses (key, value, size, atime) VALUES (?, ?, ?, ?)",
+            (key, value, size, time.time()),
+        )
+        self._evict(db)
+        db.commit()
+
+    def _evict(self, db):
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in db.execute("SELECT key, size FROM responses ORDER BY atime").fetchall():
+            db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": (self.hits / total) if total else 0.0}
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,91 @@
+import json, os, time
+
+from core.io import write_json
+
+# One JSONL file per in-progress round: a header line with the round's
+# parameters, then one line per answered item, flushed as each completes.
+# Flushed lines survive a crash of the process; they are fsynced in batches
+# (every fsync_every records / fsync_s seconds, and on close), so a power
+# loss costs at most that window and the event loop doesn't wait for the
+# disk on every item.
+
+
+def checkpoint_path(outdir: str, run_id: str) -> str:
+    return f"{outdir}/checkpoints/{run_id}.jsonl"
+
+
+def experiment_state_path(outdir: str, exp_id: str) -> str:
+    return f"{outdir}/checkpoints/exp-{exp_id}.json"
+
+
+class Checkpoint:
+    def __init__(self, path: str, fsync_every: int = 32, fsync_s: float = 1.0):
+        self.path = path
+        self.fsync_every, self.fsync_s = fsync_every, fsync_s
+        self._f = None  # kept open while records arrive
+        self._unsynced = 0
+        self._synced_at = time.monotonic()
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def start(self, meta: dict):
+        """Begin a new checkpoint (no-op if one already exists, i.e. on resume)."""
+        if self.exists():
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w") as f:
+            f.write(json.dumps({"meta": meta}) + "\n")
+
+    def append(self, record: dict):
+        if self._f is None:
+            self._f = open(self.path, "a")
+        self._f.write(json.dumps({"record": record}, ensure_ascii=False) + "\n")
+        self._f.flush()
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every or time.monotonic() - self._synced_at >= self.fsync_s:
+            self.sync()
+
+    def sync(self):
+        """fsync the records appended so far."""
+        if self._f is not None and self._unsynced:
+            os.fsync(self._f.fileno())
+        self._unsynced = 0
+        self._synced_at = time.monotonic()
+
+    def close(self):
+        """Sync and close the file (append() reopens it)."""
+        if self._f is not None:
+            self.sync()
+            self._f.close()
+            self._f = None
+
+    def load(self) -> tuple[dict, dict]:
+        """(meta, {item id: record}); a torn last line from a crash is ignored."""
+        meta, done = {}, {}
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if "meta" in row:
+                    meta = row["meta"]
+                elif "record" in row:
+                    done[row["record"]["id"]] = row["record"]
+        return meta, done
+
+    def remove(self):
+        self.close()
+        if self.exists():
+            os.remove(self.path)
+
+
+def write_state(path: str, state: dict):
+    """Small JSON state file (experiment progress), replaced atomically."""
+    write_json(path, state)
+
+
+def read_state(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
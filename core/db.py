@@ -0,0 +1,17 @@
+from contextlib import contextmanager
+
+# SQLite helpers shared by the run store (core.memory) and the work queue
+# (core.workqueue). Both open connections with isolation_level=None and
+# manage transactions themselves.
+
+
+@contextmanager
+def transaction(conn):
+    """BEGIN IMMEDIATE (take the write lock up front) ... COMMIT, or ROLLBACK on any error."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
@@ -0,0 +1,33 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Progress events (round started, item answered, round scored, ...) for
+# callers that want them, e.g. the job server streaming them to clients.
+# Like track_usage(), the listener is a ContextVar: it sees events from every
+# task started inside listen(), and emit() is a no-op outside one.
+
+_listener: ContextVar = ContextVar("autoeval_events", default=None)
+
+
+@contextmanager
+def listen(callback):
+    """Call `callback(event)` for every emit() inside the block; event is {"event", "t", ...}."""
+    token = _listener.set(callback)
+    try:
+        yield
+    finally:
+        _listener.reset(token)
+
+
+def emit(kind: str, **data):
+    callback = _listener.get()
+    if callback is not None:
+        callback({"event": kind, "t": time.time(), **data})
+
+
+def item_event(run_id: str, rec: dict):
+    """One answered (or failed) item, without the prompt/answer text."""
+    gen = rec.get("gen") or {}
+    emit("item", run_id=run_id, id=rec["id"], error=rec.get("error"),
+         latency_s=gen.get("latency_s"), cached=bool(gen.get("cached")), worker=gen.get("worker"))
@@ -1,6 +1,7 @@
+import asyncio, time, weakref
 import yaml, os
 
-CONFIG_PATH = "config/governance.yaml"
+CONFIG_PATH = os.environ.get("AUTOEVAL_GOVERNANCE", "config/governance.yaml")
 
 def load_rules():
     if not os.path.exists(CONFIG_PATH):
@@ -11,4 +12,69 @@ def load_rules():
 def enforce_rate_limit(n_items:int, rules:dict):
     limit = rules.get("max_items_per_round", 20)
     if n_items > limit:
-        raise ValueError(f"Too many items! max allowed is {limit}")
\ No newline at end of file
+        raise ValueError(f"Too many items! max allowed is {limit}")
+
+
+def schedule_params(rules:dict, limiter=None) -> dict:
+    """
+    core.scheduler.gather_bounded keyword arguments for answering items under
+    `rules`: max_concurrency, item_retries (transient model errors only),
+    item_timeout_s and item_backoff_s, drawing calls from `limiter`.
+    """
+    from models.ollama_client import is_transient  # core stays importable without httpx
+    return dict(
+        limit=int(rules.get("max_concurrency", 4)),
+        retries=int(rules.get("item_retries", 0)),
+        timeout=rules.get("item_timeout_s"),
+        limiter=limiter,
+        backoff=float(rules.get("item_backoff_s", 1.0)),
+        retry_if=is_transient,
+    )
+
+
+class TokenBucket:
+    """
+    Async token bucket: `rate_per_min` model calls per minute, with bursts of up to `burst`.
+    A rate of 0/None disables limiting.
+    """
+    def __init__(self, rate_per_min:float|None, burst:int|None=None):
+        self.rate = (rate_per_min or 0) / 60.0
+        self.capacity = float(burst or max(1, int(rate_per_min or 1)))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+# One bucket per (event loop, backend, settings): concurrent rounds, tournament
+# drains and server jobs draw from the same budget instead of each getting
+# the full rate_limit_per_min.
+_buckets: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = weakref.WeakKeyDictionary()
+
+def rate_limiter(rules:dict, backend:str="*") -> TokenBucket:
+    """
+    The shared token bucket for `backend` ("*": all configured backends), built
+    from `rate_limit_per_min` (burst defaults to `max_concurrency`).
+    """
+    rate, burst = rules.get("rate_limit_per_min"), rules.get("rate_limit_burst") or rules.get("max_concurrency")
+    try:
+        per_loop = _buckets.setdefault(asyncio.get_running_loop(), {})
+    except RuntimeError:  # no loop yet: a private bucket
+        return TokenBucket(rate, burst)
+    key = (backend, rate, burst)
+    if key not in per_loop:
+        per_loop[key] = TokenBucket(rate, burst)
+    return per_loop[key]
@@ -1,8 +1,171 @@
-import json, os, time
+import json, math, os, re, secrets, time
+from concurrent.futures import ThreadPoolExecutor
+
+try:  # optional fast encoder (pip install orjson); dumps() gives the same bytes without it
+    import orjson
+except ImportError:
+    orjson = None
+
+# Artifacts are written to `<path>.tmp` and renamed into place, so readers
+# (dashboard, tools/backfill_index.py) never see a truncated file: after a
+# crash a path holds either its previous contents or the complete new ones.
+
+
+def _finite(obj):
+    """obj with NaN/inf floats replaced by None, as orjson writes them."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {k: _finite(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(v) for v in obj]
+    return obj
+
+
+def dumps(obj, indent: bool = True) -> bytes:
+    """
+    UTF-8 JSON, 2-space indented or compact. The json fallback is set up like
+    orjson: non-ASCII text as is, NaN/inf as null (strict JSON), compact
+    separators. Only orjson encodes numpy values.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=(orjson.OPT_INDENT_2 if indent else 0) | orjson.OPT_NON_STR_KEYS
+                                | orjson.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            pass  # e.g. int subclasses or ints > 64 bit; json handles those
+    kw = dict(indent=2 if indent else None, separators=None if indent else (",", ":"),
+              ensure_ascii=False, allow_nan=False)
+    try:
+        return json.dumps(obj, **kw).encode()
+    except ValueError:  # out-of-range float
+        return json.dumps(_finite(obj), **kw).encode()
+
+
+def _write_tmp(path: str, data: bytes, fsync: bool) -> str:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    return tmp
+
+
+def _fsync_dir(path: str):
+    fd = os.open(path or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_bytes(path: str, data: bytes, fsync: bool = True):
+    """Replace `path` atomically (temp file + rename)."""
+    os.replace(_write_tmp(path, data, fsync), path)
+    if fsync:
+        _fsync_dir(os.path.dirname(path))
+
+
+def write_json(path, obj, fsync: bool = True):
+    write_bytes(path, dumps(obj), fsync)
+
+
+def write_text(path: str, text: str, fsync: bool = True):
+    write_bytes(path, text.encode(), fsync)
+
+
+class ArtifactWriter:
+    """
+    Batched artifact writes for one round. write_json/write_text return at
+    once: serialization and the temp-file write run on a background thread.
+    commit() waits for them, fsyncs the temp files, renames them all into
+    place and fsyncs each directory once. Used as a context manager, it
+    commits on a clean exit and discards the temp files on an error.
+
+        with ArtifactWriter() as out:
+            out.write_json(report_path, report)
+            out.write_text(md_path, md)
+    """
+    def __init__(self):
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="autoeval-artifacts")
+        self._pending: list = []  # (path, future of its temp file)
+
+    def _submit(self, path: str, encode):
+        self._pending.append((path, self._pool.submit(lambda: _write_tmp(path, encode(), fsync=False))))
+
+    def write_json(self, path: str, obj):
+        self._submit(path, lambda: dumps(obj))
+
+    def write_text(self, path: str, text: str):
+        self._submit(path, text.encode)
+
+    def commit(self):
+        pending, self._pending = self._pending, []
+        tmps = [(path, fut.result()) for path, fut in pending]
+        for _, tmp in tmps:
+            fd = os.open(tmp, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        for path, tmp in tmps:
+            os.replace(tmp, path)
+        for d in {os.path.dirname(path) for path, _ in tmps}:
+            _fsync_dir(d)
+
+    def discard(self):
+        pending, self._pending = self._pending, []
+        for _, fut in pending:
+            try:
+                os.remove(fut.result())
+            except Exception:
+                pass
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.commit() if exc_type is None else self.discard()
+        finally:
+            self.close()
+
+
+def pool_map(fn, items: list, min_items: int, workers: int | None = None, chunksize: int = 16) -> list:
+    """
+    [fn(x) for x in items], in a process pool (`workers` processes, default
+    CPU count) once there are at least `min_items`. Smaller batches run
+    inline: starting the pool (and re-importing the modules in each worker)
+    costs more than it saves. workers=1 always runs inline.
+    """
+    if len(items) < min_items or workers == 1:
+        return [fn(x) for x in items]
+    from concurrent.futures import ProcessPoolExecutor  # pulls in multiprocessing; only when used
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(fn, items, chunksize=chunksize))
 
-def write_json(path, obj):
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w") as f: json.dump(obj, f, indent=2)
 
 def timestamp():
-    return time.strftime("%Y%m%d-%H%M%S")
\ No newline at end of file
+    return time.strftime("%Y%m%d-%H%M%S")
+
+_issued = set()
+
+def new_run_id(tag:str="")->str:
+    """
+    timestamp(), plus a filename-safe `tag` (e.g. the model) when given, plus a
+    random suffix, so CLI/worker/daemon processes starting rounds in the same
+    second don't collide; -2, -3, ... guards this process's own ids.
+    """
+    base = timestamp() + (f"-{re.sub(r'[^A-Za-z0-9.]+', '-', tag).strip('-')}" if tag else "")
+    base += f"-{secrets.token_hex(3)}"
+    run_id, i = base, 1
+    while run_id in _issued:
+        i += 1
+        run_id = f"{base}-{i}"
+    _issued.add(run_id)
+    return run_id
@@ -1,28 +1,209 @@
-import json, os
-from statistics import mean
-
-INDEX_PATH = "experiments/index.json"
-
-def load_index():
-    if not os.path.exists(INDEX_PATH):
-        return []
-    with open(INDEX_PATH) as f:
-        return json.load(f)
-
-def save_index(runs):
-    os.makedirs(os.path.dirname(INDEX_PATH), exist_ok=True)
-    with open(INDEX_PATH, "w") as f:
-        json.dump(runs, f, indent=2)
-
-def add_run_entry(run_id:str, model:str, mode:str, acc:float):
-    runs = load_index()
-    runs.append({"run_id": run_id, "model": model, "mode": mode, "accuracy": acc})
-    save_index(runs)
-    return runs
-
-def get_trend_summary():
-    runs = load_index()
-    if not runs:
+import json, os, sqlite3
+from contextlib import closing
+
+from core.db import transaction
+
+INDEX_PATH = "experiments/index.json"        # legacy flat file, imported once into the store
+STORE_PATH = os.environ.get("AUTOEVAL_RUN_STORE", "experiments/runs.sqlite")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    seq      INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id   TEXT NOT NULL UNIQUE,
+    model    TEXT,
+    mode     TEXT,
+    accuracy REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_model ON runs(model);
+CREATE INDEX IF NOT EXISTS runs_mode ON runs(mode);
+CREATE TABLE IF NOT EXISTS aggregates (
+    model   TEXT NOT NULL,
+    mode    TEXT NOT NULL,
+    n       INTEGER NOT NULL,
+    acc_sum REAL NOT NULL,
+    PRIMARY KEY (model, mode)
+);
+CREATE TABLE IF NOT EXISTS metric_results (
+    run_id  TEXT NOT NULL,
+    metric  TEXT NOT NULL,
+    version TEXT NOT NULL,
+    value   REAL,
+    n       INTEGER,
+    params  TEXT,
+    created TEXT,
+    PRIMARY KEY (run_id, metric, version)
+);
+CREATE TABLE IF NOT EXISTS backfill_manifest (
+    path     TEXT PRIMARY KEY,
+    size     INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    run_id   TEXT
+);
+"""
+
+# Optional per-run performance columns (added to older stores on open).
+PERF_COLUMNS = {
+    "total_s": "REAL",
+    "items_per_s": "REAL",
+    "p50_latency_ms": "REAL",
+    "eval_tokens": "INTEGER",
+    "load_ms": "REAL",
+}
+RUN_COLUMNS = ["run_id", "model", "mode", "accuracy", *PERF_COLUMNS]
+
+
+def _connect(path: str | None = None):
+    """
+    Open the run store at `path` (default STORE_PATH; every function below
+    takes the same `path`) in WAL mode, so readers never block the single
+    writer. On first use, an existing experiments/index.json is imported.
+    """
+    path = path or STORE_PATH
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fresh = not os.path.exists(path)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA)
+    have = {row[1] for row in conn.execute("PRAGMA table_info(runs)")}
+    for col, typ in PERF_COLUMNS.items():
+        if col not in have:
+            conn.execute(f"ALTER TABLE runs ADD COLUMN {col} {typ}")
+    if fresh and os.path.exists(INDEX_PATH):
+        with open(INDEX_PATH) as f:
+            _replace_all(conn, json.load(f))
+    return conn
+
+
+def _insert(conn, run: dict) -> bool:
+    cur = conn.execute(
+        f"INSERT OR IGNORE INTO runs ({', '.join(RUN_COLUMNS)}) VALUES ({', '.join(['?'] * len(RUN_COLUMNS))})",
+        [run.get(c) for c in RUN_COLUMNS],
+    )
+    if cur.rowcount == 0:
+        return False  # run_id already recorded
+    conn.execute(
+        "INSERT INTO aggregates (model, mode, n, acc_sum) VALUES (?, ?, 1, ?) "
+        "ON CONFLICT(model, mode) DO UPDATE SET n = n + 1, acc_sum = acc_sum + excluded.acc_sum",
+        (run.get("model") or "", run.get("mode") or "", run["accuracy"]),
+    )
+    return True
+
+
+def _delete(conn, run_id: str):
+    row = conn.execute("SELECT model, mode, accuracy FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+    if row is None:
+        return
+    conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+    conn.execute(
+        "UPDATE aggregates SET n = n - 1, acc_sum = acc_sum - ? WHERE model = ? AND mode = ?",
+        (row[2], row[0] or "", row[1] or ""),
+    )
+    conn.execute("DELETE FROM aggregates WHERE n <= 0")
+
+
+def _replace_all(conn, runs):
+    with transaction(conn):
+        conn.execute("DELETE FROM runs")
+        conn.execute("DELETE FROM aggregates")
+        conn.execute("DELETE FROM backfill_manifest")
+        for r in runs:
+            _insert(conn, r)
+
+
+def load_index(path: str | None = None):
+    """All runs in insertion order, as [{run_id, model, mode, accuracy, <PERF_COLUMNS>}]."""
+    with closing(_connect(path)) as conn:
+        rows = conn.execute(f"SELECT {', '.join(RUN_COLUMNS)} FROM runs ORDER BY seq").fetchall()
+    return [dict(zip(RUN_COLUMNS, row)) for row in rows]
+
+def load_runs_since(seq: int = 0, path: str | None = None):
+    """Runs appended after `seq` (as load_index, plus their "seq"), oldest first; for incremental readers."""
+    cols = ["seq", *RUN_COLUMNS]
+    with closing(_connect(path)) as conn:
+        rows = conn.execute(f"SELECT {', '.join(cols)} FROM runs WHERE seq > ? ORDER BY seq", (seq,)).fetchall()
+    return [dict(zip(cols, row)) for row in rows]
+
+def save_index(runs, path: str | None = None):
+    """Replace the whole store with `runs` (bulk migration / backfill)."""
+    with closing(_connect(path)) as conn:
+        _replace_all(conn, runs)
+
+def add_run_entry(run_id:str, model:str, mode:str, acc:float, *, path: str | None = None, **perf):
+    """
+    Append one run atomically; per-(model, mode) aggregates are updated in the same transaction.
+    A run_id that is already recorded raises ValueError (nothing is written).
+    `perf` may carry any of PERF_COLUMNS (total_s, items_per_s, p50_latency_ms, eval_tokens, load_ms).
+    """
+    with closing(_connect(path)) as conn, transaction(conn):
+        if not _insert(conn, {"run_id": run_id, "model": model, "mode": mode, "accuracy": acc, **perf}):
+            raise ValueError(f"run {run_id} is already in the run store")
+
+def load_manifest(path: str | None = None):
+    """{report path: (size, mtime_ns)} for every file tools/backfill_index.py has processed."""
+    with closing(_connect(path)) as conn:
+        rows = conn.execute("SELECT path, size, mtime_ns FROM backfill_manifest").fetchall()
+    return {p: (size, mtime) for p, size, mtime in rows}
+
+def merge_runs(runs, manifest=(), replace: bool = False, path: str | None = None):
+    """
+    Upsert `runs` (a run_id seen before is replaced, aggregates adjusted) and
+    record `manifest` rows (path, size, mtime_ns, run_id or None), all in one
+    transaction: readers see either none or all of a backfill batch.
+    With `replace`, everything already in the store is dropped first.
+    """
+    with closing(_connect(path)) as conn, transaction(conn):
+        if replace:
+            for table in ("runs", "aggregates", "backfill_manifest"):
+                conn.execute(f"DELETE FROM {table}")
+        for r in runs:
+            _delete(conn, r["run_id"])
+            _insert(conn, r)
+        conn.executemany(
+            "INSERT OR REPLACE INTO backfill_manifest (path, size, mtime_ns, run_id) VALUES (?, ?, ?, ?)",
+            list(manifest),
+        )
+
+def put_metric_results(rows, path: str | None = None):
+    """Upsert re-scored metrics: rows of {run_id, metric, version, value, n, params, created}."""
+    cols = ["run_id", "metric", "version", "value", "n", "params", "created"]
+    with closing(_connect(path)) as conn, transaction(conn):
+        conn.executemany(
+            f"INSERT OR REPLACE INTO metric_results ({', '.join(cols)}) VALUES ({', '.join(['?'] * len(cols))})",
+            [[r.get(c) for c in cols] for r in rows],
+        )
+
+def get_metric_results(run_id: str | None = None, metric: str | None = None, path: str | None = None):
+    """Re-scored metrics, oldest first, optionally for one run and/or metric."""
+    cols = ["run_id", "metric", "version", "value", "n", "params", "created"]
+    where, args = [], []
+    for col, val in (("run_id", run_id), ("metric", metric)):
+        if val is not None:
+            where.append(f"{col} = ?")
+            args.append(val)
+    sql = f"SELECT {', '.join(cols)} FROM metric_results" + (f" WHERE {' AND '.join(where)}" if where else "") + " ORDER BY created"
+    with closing(_connect(path)) as conn:
+        rows = conn.execute(sql, args).fetchall()
+    return [dict(zip(cols, row)) for row in rows]
+
+def get_aggregates(path: str | None = None):
+    """[{model, mode, n, mean_accuracy}] from the incrementally maintained aggregates."""
+    with closing(_connect(path)) as conn:
+        rows = conn.execute("SELECT model, mode, n, acc_sum FROM aggregates ORDER BY model, mode").fetchall()
+    return [{"model": m, "mode": md, "n": n, "mean_accuracy": s / n} for m, md, n, s in rows]
+
+def store_version(path: str | None = None):
+    """
+    Cheap cache key for readers: (last seq issued, run count). Changes on every
+    append and every save_index, since AUTOINCREMENT never reuses a seq.
+    """
+    with closing(_connect(path)) as conn:
+        (seq,) = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence WHERE name = 'runs'").fetchone()
+        (n,) = conn.execute("SELECT COUNT(*) FROM runs").fetchone()
+    return seq, n
+
+def get_trend_summary(path: str | None = None):
+    with closing(_connect(path)) as conn:
+        n, acc_sum = conn.execute("SELECT COALESCE(SUM(n), 0), COALESCE(SUM(acc_sum), 0) FROM aggregates").fetchone()
+    if not n:
         return "No prior runs"
-    avg_acc = mean([r["accuracy"] for r in runs])
-    return f"{len(runs)} total runs, mean accuracy = {avg_acc:.2%}"
\ No newline at end of file
+    return f"{n} total runs, mean accuracy = {acc_sum / n:.2%}"
@@ -0,0 +1,73 @@
+import fcntl, json, os, zlib
+from itertools import islice
+
+STORE_ROOT = os.environ.get("AUTOEVAL_RECORD_STORE", "experiments/store")
+
+# Layout: {root}/{kind}/{YYYYMMDD}.jsonl.z   one zlib block of JSONL rows per run, appended
+#         {root}/{kind}/{YYYYMMDD}.idx       one JSON line per run: {run_id, offset, length, n}
+# kind is "records" or "benchmark"; the partition is the date prefix of the run_id.
+
+
+def _paths(run_id: str, kind: str, root: str):
+    part = os.path.join(root, kind, run_id[:8])
+    return part + ".jsonl.z", part + ".idx"
+
+
+def append_rows(run_id: str, kind: str, rows: list[dict], root: str = STORE_ROOT):
+    """Append one run's rows as a compressed block and record its offset."""
+    data_path, idx_path = _paths(run_id, kind, root)
+    os.makedirs(os.path.dirname(data_path), exist_ok=True)
+    blob = zlib.compress("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in rows).encode(), 6)
+    with open(data_path, "ab") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)  # serialise concurrent writers; the index line is written under the same lock
+        try:
+            offset = f.seek(0, os.SEEK_END)
+            f.write(blob)
+            f.flush()
+            with open(idx_path, "a") as idx:
+                idx.write(json.dumps({"run_id": run_id, "offset": offset, "length": len(blob), "n": len(rows)}) + "\n")
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _lookup(run_id: str, kind: str, root: str) -> dict | None:
+    _, idx_path = _paths(run_id, kind, root)
+    if not os.path.exists(idx_path):
+        return None
+    entry = None
+    with open(idx_path) as f:
+        for line in f:
+            e = json.loads(line)
+            if e["run_id"] == run_id:
+                entry = e  # last write wins
+    return entry
+
+
+def has_rows(run_id: str, kind: str, root: str = STORE_ROOT) -> bool:
+    return _lookup(run_id, kind, root) is not None
+
+
+def count_rows(run_id: str, kind: str, root: str = STORE_ROOT) -> int:
+    e = _lookup(run_id, kind, root)
+    return e["n"] if e else 0
+
+
+def read_rows(run_id: str, kind: str, start: int = 0, stop: int | None = None, root: str = STORE_ROOT) -> list[dict]:
+    """
+    Rows [start:stop] of one run. Only that run's block is read and only the
+    requested lines are parsed. Returns [] if the run isn't in the store.
+    """
+    e = _lookup(run_id, kind, root)
+    if e is None:
+        return []
+    data_path, _ = _paths(run_id, kind, root)
+    with open(data_path, "rb") as f:
+        f.seek(e["offset"])
+        text = zlib.decompress(f.read(e["length"])).decode()
+    return [json.loads(line) for line in islice(text.splitlines(), start, stop)]
+
+
+def export_json(run_id: str, kind: str, path: str, root: str = STORE_ROOT):
+    """Write one run's rows as the legacy pretty-printed `{run_id}_{kind}.json`."""
+    from core.io import write_json
+    write_json(path, read_rows(run_id, kind, root=root))
@@ -0,0 +1,118 @@
+import asyncio, hashlib, importlib, json, os, time
+
+from core.io import pool_map
+from core.memory import load_index, put_metric_results
+from core.records import read_rows, STORE_ROOT
+from core.scoring import DOMAIN_METRICS, METRICS, score_records
+
+# Offline re-scoring: archived records (record store, or legacy
+# {outdir}/{run_id}_records.json) are scored again with any registered metric
+# and the results stored per (run_id, metric, version) in the run store.
+# Label metrics run in a process pool; the "judge" metric re-runs
+# evaluate_reasoning, whose judge prompts are answered from the response
+# cache when they were graded before (only new prompts reach a model).
+
+POOL_MIN_RUNS = 32  # see core.io.pool_map
+_DOMAIN_ONLY = {m for m, _ in DOMAIN_METRICS.values()}  # metrics that only make sense for their own domain
+
+
+def load_records(run_id: str, outdir: str = "experiments", root: str = STORE_ROOT) -> list[dict]:
+    recs = read_rows(run_id, "records", root=root)
+    legacy = f"{outdir}/{run_id}_records.json"
+    if not recs and os.path.exists(legacy):
+        with open(legacy) as f:
+            recs = json.load(f)
+    return [r for r in recs if "error" not in r]
+
+
+def _domain(records: list[dict]) -> str:
+    return "reason" if records and "pred_text" in records[0] else "math"
+
+
+def metric_version(metric: str, opts: dict) -> str:
+    """Default version tag: the metric name plus a hash of its options."""
+    return f"{metric}@{hashlib.sha1(json.dumps(opts, sort_keys=True).encode()).hexdigest()[:8]}"
+
+
+def _score_run(args):
+    """One run through a label metric; runs in pool workers."""
+    run_id, metric, opts, outdir, root, plugins = args
+    for mod in plugins:  # custom metrics register on import (needed under the spawn start method)
+        importlib.import_module(mod)
+    records = load_records(run_id, outdir, root)
+    if not records:
+        return run_id, None, 0
+    domain = _domain(records)
+    if metric in _DOMAIN_ONLY and DOMAIN_METRICS[domain][0] != metric:
+        return run_id, None, 0  # e.g. yesno on math records
+    scores = score_records(records, domain, metric=metric, set_field=None, **opts)
+    return run_id, float(scores.mean()), len(records)
+
+
+async def _judge_runs(run_ids, judge_model, outdir, root, batch_size, concurrency):
+    from agents.evaluator_agent import evaluate_reasoning
+    from models.ollama_client import lifespan
+
+    out = []
+    async with lifespan():
+        for run_id in run_ids:
+            records = load_records(run_id, outdir, root)
+            if not records or _domain(records) != "reason":
+                out.append((run_id, None, 0))
+                continue
+            model = judge_model
+            if model is None and os.path.exists(f"{outdir}/{run_id}_report.json"):
+                with open(f"{outdir}/{run_id}_report.json") as f:
+                    model = (json.load(f).get("params") or {}).get("judge_model")
+            if model is None:
+                print(f"[skip] {run_id}: no judge model recorded; pass judge_model")
+                out.append((run_id, None, 0))
+                continue
+            m = await evaluate_reasoning(records, model, concurrency=concurrency, batch_size=batch_size)
+            out.append((run_id, m["judge_avg"], m["n"]))
+    return out
+
+
+def rescore(
+    metric: str,
+    *,
+    run_ids: list[str] | None = None,   # default: every run in the store (filtered by model/mode)
+    model: str | None = None,
+    mode: str | None = None,
+    version: str | None = None,         # default: metric_version(metric, opts)
+    outdir: str = "experiments",
+    root: str = STORE_ROOT,
+    workers: int | None = None,
+    plugins: tuple = (),                # modules that register extra metrics
+    judge_model: str | None = None,     # "judge" metric: default is each run's recorded judge
+    judge_batch_size: int = 1,
+    judge_concurrency: int = 4,
+    **opts,                             # metric options, e.g. rel_tol=1e-3 or pattern=...
+) -> list[dict]:
+    """Re-score archived runs with `metric` (a core.scoring metric or "judge"); returns the stored rows."""
+    for mod in plugins:
+        importlib.import_module(mod)
+    if metric != "judge" and metric not in METRICS:
+        raise ValueError(f"unknown metric {metric!r}; known: judge, {', '.join(sorted(METRICS))}")
+    if run_ids is None:
+        run_ids = [
+            r["run_id"] for r in load_index()
+            if (model is None or r["model"] == model) and (mode is None or r["mode"] == mode)
+        ]
+    spec = {**opts, "judge_model": judge_model} if metric == "judge" else opts
+    version = version or metric_version(metric, spec)
+
+    if metric == "judge":
+        results = asyncio.run(_judge_runs(run_ids, judge_model, outdir, root, judge_batch_size, judge_concurrency))
+    else:
+        jobs = [(rid, metric, opts, outdir, root, tuple(plugins)) for rid in run_ids]
+        results = pool_map(_score_run, jobs, POOL_MIN_RUNS, workers)
+
+    created = time.strftime("%Y-%m-%dT%H:%M:%S")
+    params = json.dumps(spec, sort_keys=True)
+    rows = [
+        {"run_id": rid, "metric": metric, "version": version, "value": value, "n": n, "params": params, "created": created}
+        for rid, value, n in results if value is not None
+    ]
+    put_metric_results(rows)
+    return rows
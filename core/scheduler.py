@@ -0,0 +1,31 @@
+import asyncio, random
+
+async def gather_bounded(fn, items, *, limit:int=4, retries:int=0, timeout:float|None=None, limiter=None,
+                         backoff:float=0.0, retry_if=None, return_exceptions:bool=False):
+    """
+    Run `await fn(item)` for every item with at most `limit` calls in flight.
+    Each call is retried up to `retries` times and bounded by `timeout` seconds;
+    `limiter` (a TokenBucket) is acquired before every attempt.
+    Between attempts it sleeps backoff * 2**attempt (with jitter); errors for
+    which `retry_if(exc)` is false are not retried. With return_exceptions the
+    final exception is returned in the item's slot instead of raised.
+    Results come back in input order.
+    """
+    sem = asyncio.Semaphore(max(1, limit))
+
+    async def _one(item):
+        async with sem:
+            for attempt in range(retries + 1):
+                if limiter is not None:
+                    await limiter.acquire()
+                try:
+                    return await asyncio.wait_for(fn(item), timeout)
+                except Exception as e:
+                    if attempt >= retries or (retry_if is not None and not retry_if(e)):
+                        if return_exceptions:
+                            return e
+                        raise
+                if backoff > 0:
+                    await asyncio.sleep(backoff * 2 ** attempt * (0.5 + random.random()))
+
+    return await asyncio.gather(*(_one(it) for it in items))
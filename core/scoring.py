@@ -1,12 +1,127 @@
-import re, statistics
+import math, re
+from collections import Counter
+import numpy as np
+
+# Reasoning replies end with "Final: Yes|No"; also the streaming stop pattern.
+FINAL_RE = re.compile(r"Final:\s*(Yes|No)\s*$", re.IGNORECASE | re.MULTILINE)
+
+_WS_RE = re.compile(r"\s+")
+_NUMBER = r"[-+]?(?:\d[\d,]*(?:\.\d+)?|\.\d+)(?:[eE][-+]?\d+)?"
+_NUMBER_RE = re.compile(_NUMBER)
+# An explicitly marked answer wins over the first number in the text.
+_MARKED_NUMBER_RE = re.compile(rf"(?:answer\s*(?:is|:)|final\s*:|=)\s*\**\s*({_NUMBER})", re.IGNORECASE)
+_TOKEN_RE = re.compile(r"\w+")
+# Streaming stop for math replies: a complete answer extract_number would pick,
+# i.e. a bare number alone on the first line or a marked answer ("= 42",
+# "answer is 1,049.") followed by whitespace. Anything else streams to the end.
+ANSWER_STOP_RE = re.compile(
+    rf"\A\s*{_NUMBER}[ \t]*(?=\n)|(?:answer\s*(?:is|:)|final\s*:|=)\s*\**\s*{_NUMBER}(?=[.,]?\s)", re.IGNORECASE
+)
 
 def normalize(s:str)->str:
-    return re.sub(r"\s+","",s.lower())
+    return _WS_RE.sub("", s.lower())
 
 def exact_match(pred:str, gold:str)->int:
     return 1 if normalize(pred)==normalize(gold) else 0
 
+# ---- extractors
+
+def extract_number(text: str) -> float:
+    """The answer number in `text` ("The answer is 42." -> 42.0); NaN if there is none."""
+    if _NUMBER_RE.fullmatch(text):  # bare number (golds, cut-off streamed answers): skip the searches
+        return float(text.replace(",", ""))
+    m = _MARKED_NUMBER_RE.search(text)
+    s = m.group(1) if m else (_NUMBER_RE.search(text) or [None])[0]
+    if s is None:
+        return math.nan
+    try:
+        return float(s.replace(",", ""))
+    except ValueError:
+        return math.nan
+
+def extract_yesno(text: str) -> str | None:
+    """"Yes"/"No" from the reply's "Final: ..." line, or None."""
+    m = FINAL_RE.search(text)
+    return m.group(1).capitalize() if m else None
+
+# ---- batch metrics: (preds, golds, **opts) -> float array of per-item scores in [0, 1]
+
+METRICS = {}
+
+def register_metric(name: str):
+    """Decorator: make a batch metric available to score_batch / score_records by name."""
+    def deco(fn):
+        METRICS[name] = fn
+        return fn
+    return deco
+
+@register_metric("exact")
+def exact_metric(preds, golds, **_):
+    return np.fromiter((normalize(p) == normalize(g) for p, g in zip(preds, golds)), float, len(preds))
+
+@register_metric("numeric")
+def numeric_metric(preds, golds, rel_tol: float = 1e-6, abs_tol: float = 1e-9, **_):
+    p = np.fromiter(map(extract_number, preds), float, len(preds))
+    g = np.fromiter(map(extract_number, golds), float, len(golds))
+    return np.isclose(p, g, rtol=rel_tol, atol=abs_tol).astype(float)  # NaN (no number) never matches
+
+@register_metric("yesno")
+def yesno_metric(preds, golds, **_):
+    labels = np.array([extract_yesno(p) or "" for p in preds], dtype=object)
+    gold = np.array([g.strip().capitalize() for g in golds], dtype=object)
+    return ((labels == gold) & (labels != "")).astype(float)
+
+@register_metric("f1")
+def f1_metric(preds, golds, **_):
+    """Token-level F1 (SQuAD style) on lowercased word tokens."""
+    out = np.zeros(len(preds))
+    for i, (p, g) in enumerate(zip(preds, golds)):
+        pt, gt = _TOKEN_RE.findall(p.lower()), _TOKEN_RE.findall(g.lower())
+        common = sum((Counter(pt) & Counter(gt)).values())
+        if common:
+            prec, rec = common / len(pt), common / len(gt)
+            out[i] = 2 * prec * rec / (prec + rec)
+    return out
+
+@register_metric("regex")
+def regex_metric(preds, golds, pattern: str | None = None, **_):
+    """1 if the pred matches `pattern` (or, without one, the gold used as a pattern)."""
+    if pattern is not None:
+        rx = re.compile(pattern, re.IGNORECASE)
+        return np.fromiter((rx.search(p) is not None for p in preds), float, len(preds))
+    return np.fromiter((re.search(g, p, re.IGNORECASE) is not None for p, g in zip(preds, golds)), float, len(preds))
+
+# Default metric per domain, and the record field holding the model's reply.
+DOMAIN_METRICS = {"math": ("numeric", "pred"), "reason": ("yesno", "pred_text")}
+
+def score_batch(preds, golds, metric: str = "exact", **opts) -> np.ndarray:
+    return METRICS[metric](list(preds), [str(g) for g in golds], **opts)
+
+def score_records(records, domain: str | None = None, *, metric: str | None = None, pred_key: str | None = None,
+                  set_field: str | None = "correct", **opts) -> np.ndarray:
+    """
+    Score a batch of records with `metric` (default: the domain's). Stores
+    each score as an int in record[set_field] unless set_field is None.
+    """
+    default_metric, default_key = DOMAIN_METRICS.get(domain, ("exact", "pred"))
+    metric, pred_key = metric or default_metric, pred_key or default_key
+    scores = score_batch((r[pred_key] for r in records), (r["gold"] for r in records), metric, **opts)
+    if set_field:
+        for r, s in zip(records, scores.tolist()):
+            r[set_field] = int(s) if s in (0.0, 1.0) else s
+    return scores
+
 def score_run(records):
     # records: [{id, gold, pred, correct(0/1)}]
     acc = sum(r["correct"] for r in records) / max(1,len(records))
-    return {"accuracy": acc, "n": len(records)}
\ No newline at end of file
+    return {"accuracy": acc, "n": len(records)}
+
+def wilson_interval(k:int, n:int, z:float=1.96):
+    """Wilson score interval for k successes out of n (z=1.96 -> 95%)."""
+    if n == 0:
+        return (0.0, 1.0)
+    p = k / n
+    denom = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return (max(0.0, center - half), min(1.0, center + half))
@@ -0,0 +1,28 @@
+import time
+from contextlib import contextmanager
+
+
+class StageClock:
+    """Wall-clock seconds per named stage of a round (dataset, generate, judge, persist)."""
+    def __init__(self):
+        self.stages: dict[str, float] = {}
+        self.t0 = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - t
+
+    def total(self) -> float:
+        return time.perf_counter() - self.t0
+
+
+def percentile(xs, q):
+    """Nearest-rank percentile (q in 0..100); None for an empty list."""
+    if not xs:
+        return None
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, max(0, round(q / 100 * len(xs) + 0.5) - 1))]
@@ -0,0 +1,116 @@
+import json, os
+import numpy as np
+from core.memory import load_runs_since, store_version
+
+# Trend analytics over the run store: per-(model, mode) accuracy series with
+# rolling mean and EWMA, computed with numpy and cached on disk so a re-render
+# only processes runs appended since the previous one.
+
+
+def rolling_mean(values, window: int, prev=()) -> np.ndarray:
+    """
+    Trailing mean over `window` points for each of `values`, continuing from
+    the series tail `prev` (expanding mean until `window` points exist).
+    """
+    values = np.asarray(values, dtype=float)
+    prev = np.asarray(prev, dtype=float)[len(prev) - (window - 1):] if window > 1 else np.empty(0)
+    x = np.concatenate([prev, values])
+    c = np.concatenate([[0.0], np.cumsum(x)])
+    end = np.arange(len(prev) + 1, len(x) + 1)
+    start = np.maximum(end - window, 0)
+    return (c[end] - c[start]) / (end - start)
+
+
+def ewma(values, alpha: float, start=None) -> np.ndarray:
+    """
+    y_t = alpha * x_t + (1 - alpha) * y_{t-1}, continuing from `start` (the
+    first value if None). Evaluated in closed form per block, with blocks
+    short enough that (1 - alpha) ** -block stays well inside float range.
+    """
+    values = np.asarray(values, dtype=float)
+    if alpha >= 1 or not len(values):
+        return values.copy()
+    beta = 1.0 - alpha
+    block = max(1, int(25 / -np.log(beta)))
+    y = values[0] if start is None else float(start)
+    out = np.empty_like(values)
+    for s in range(0, len(values), block):
+        xb = values[s:s + block]
+        p = beta ** np.arange(1, len(xb) + 1)
+        out[s:s + len(xb)] = p * y + alpha * p * np.cumsum(xb / p)
+        y = out[s + len(xb) - 1]
+    return out
+
+
+def group_runs(runs):
+    """{(model, mode): index array into `runs`}, indices in run order."""
+    keys = np.array([f"{r.get('model') or ''}\x1f{r.get('mode') or ''}" for r in runs])
+    if not len(keys):
+        return {}
+    uniq, inverse = np.unique(keys, return_inverse=True)
+    order = np.argsort(inverse, kind="stable")
+    bounds = np.cumsum(np.bincount(inverse))[:-1]
+    return {tuple(k.split("\x1f")): idx for k, idx in zip(uniq, np.split(order, bounds))}
+
+
+class TrendCache:
+    """
+    Per-group series {seq, accuracy, rolling, ewma} persisted as one .npz.
+    update() appends only runs newer than the cached store version and
+    returns the groups that changed; a store that shrank or was replaced
+    (save_index) is recomputed from scratch.
+    """
+
+    FIELDS = ("seq", "accuracy", "rolling", "ewma")
+
+    def __init__(self, path: str, window: int = 20, alpha: float = 0.1):
+        self.path, self.window, self.alpha = path, window, alpha
+        self.groups: dict[tuple, dict] = {}
+        self.version = (0, 0)
+        if os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        with np.load(self.path) as z:
+            meta = json.loads(str(z["meta"]))
+            if meta["window"] != self.window or meta["alpha"] != self.alpha:
+                return  # different parameters: recompute
+            self.version = tuple(meta["version"])
+            for i, key in enumerate(meta["groups"]):
+                self.groups[tuple(key)] = {f: z[f"{i}_{f}"] for f in self.FIELDS}
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        meta = {"window": self.window, "alpha": self.alpha, "version": list(self.version),
+                "groups": [list(k) for k in self.groups]}
+        arrays = {f"{i}_{f}": g[f] for i, g in enumerate(self.groups.values()) for f in self.FIELDS}
+        tmp = self.path + ".tmp.npz"
+        np.savez(tmp, meta=json.dumps(meta), **arrays)
+        os.replace(tmp, self.path)
+
+    def update(self, rebuild: bool = False) -> set:
+        version = store_version()
+        if version == self.version and not rebuild:
+            return set()
+        since = self.version[0]
+        runs = load_runs_since(since) if since and not rebuild else []
+        if rebuild or not since or self.version[1] + len(runs) != version[1]:
+            self.groups = {}
+            runs = load_runs_since(0)
+        self.version = version
+        if not runs:
+            return set()
+        seq = np.array([r["seq"] for r in runs], dtype=np.int64)
+        acc = np.array([r["accuracy"] for r in runs], dtype=float)
+        grouped = group_runs(runs)
+        for key, idx in grouped.items():
+            old = self.groups.get(key)
+            a = acc[idx]
+            new = {
+                "seq": seq[idx],
+                "accuracy": a,
+                "rolling": rolling_mean(a, self.window, old["accuracy"] if old else ()),
+                "ewma": ewma(a, self.alpha, old["ewma"][-1] if old else None),
+            }
+            self.groups[key] = {f: np.concatenate([old[f], new[f]]) for f in self.FIELDS} if old else new
+        return set(grouped)
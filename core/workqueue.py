@@ -0,0 +1,106 @@
+import json, os, socket, sqlite3, time
+from contextlib import closing
+
+from core.db import transaction
+
+# SQLite work queue shared by a coordinator and its workers (one host with
+# several worker processes, or the same file on a shared disk). A unit is
+# leased by one worker at a time; a lease that expires (worker died) makes the
+# unit available again, and a unit that keeps failing is marked failed.
+#
+# The database uses SQLite's rollback journal, not WAL: WAL keeps its index in
+# shared memory and only works for processes on one host. Across hosts the
+# queue is exactly as safe as the shared filesystem's byte-range locks; NFS
+# needs working lockd (NFSv4, or v3 without `nolock`), SMB/CIFS needs
+# `nobrl` off. Without them two workers can lease the same unit.
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS units (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    batch       TEXT NOT NULL,
+    payload     TEXT NOT NULL,
+    status      TEXT NOT NULL DEFAULT 'pending',   -- pending | leased | done | failed
+    worker      TEXT,
+    lease_until REAL,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    result      TEXT,
+    error       TEXT
+);
+CREATE INDEX IF NOT EXISTS units_status ON units(status, id);
+CREATE INDEX IF NOT EXISTS units_batch ON units(batch);
+"""
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class WorkQueue:
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=DELETE")
+        return conn
+
+    def put(self, batch: str, payloads: list[dict]) -> list[int]:
+        with closing(self._connect()) as conn, transaction(conn):
+            return [
+                conn.execute("INSERT INTO units (batch, payload) VALUES (?, ?)", (batch, json.dumps(p))).lastrowid
+                for p in payloads
+            ]
+
+    def lease(self, worker: str, lease_s: float = 600.0):
+        """Claim the oldest available unit: (unit_id, payload), or None if there is none."""
+        now = time.time()
+        with closing(self._connect()) as conn, transaction(conn):
+            row = conn.execute(
+                "SELECT id, payload FROM units WHERE status = 'pending' "
+                "OR (status = 'leased' AND lease_until < ?) ORDER BY id LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE units SET status = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1 WHERE id = ?",
+                    (worker, now + lease_s, row[0]),
+                )
+        return (row[0], json.loads(row[1])) if row else None
+
+    def complete(self, unit_id: int, result: dict):
+        with closing(self._connect()) as conn:
+            conn.execute("UPDATE units SET status = 'done', result = ? WHERE id = ?", (json.dumps(result), unit_id))
+
+    def fail(self, unit_id: int, error: str, max_attempts: int = 3):
+        """Give the unit back for another worker, or mark it failed after max_attempts leases."""
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE units SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "error = ?, lease_until = NULL WHERE id = ?",
+                (max_attempts, error, unit_id),
+            )
+
+    def finished(self, batch: str) -> dict[int, tuple]:
+        """{unit_id: (status, result or None, error or None)} for the batch's done/failed units."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT id, status, result, error FROM units WHERE batch = ? AND status IN ('done', 'failed')",
+                (batch,),
+            ).fetchall()
+        return {i: (status, json.loads(result) if result else None, error) for i, status, result, error in rows}
+
+    def leased(self, batch: str) -> int:
+        """Number of the batch's units some worker has leased at least once."""
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM units WHERE batch = ? AND attempts > 0", (batch,)).fetchone()[0]
+
+    def purge(self, batch: str):
+        with closing(self._connect()) as conn:
+            conn.execute("DELETE FROM units WHERE batch = ?", (batch,))
+
+    def stats(self) -> dict:
+        with closing(self._connect()) as conn:
+            return dict(conn.execute("SELECT status, COUNT(*) FROM units GROUP BY status").fetchall())
@@ -0,0 +1,149 @@
+# daemon.py
+"""
+Long-lived eval process on a local (Unix) socket. It keeps the interpreter,
+the imported pipeline, the pooled Ollama clients and the response cache warm
+across jobs, so schedulers that call the CLI many times pay start-up once:
+
+    python app.py serve --socket experiments/autoeval.sock   (or: python daemon.py --socket ...)
+    AUTOEVAL_DAEMON=experiments/autoeval.sock python app.py eval --n 12
+
+With AUTOEVAL_DAEMON set (and the socket present) eval/experiment/tournament
+are forwarded to the daemon and the CLI never imports the pipeline itself.
+Jobs run concurrently in the daemon's event loop, in the daemon's working
+directory and environment: a client whose cwd or CONTEXT variables differ
+(another OLLAMA_BASE_URL, governance file, store, ...) gets the job refused
+and runs it itself, as it does when no daemon answers. Protocol: one JSON line
+{"cmd", "kwargs", "cwd", "env"} per connection, answered by one line
+{"ok", "result" | "error"} (plus "refused": true for such a mismatch).
+"""
+from __future__ import annotations
+
+import json
+import os
+import socket
+from typing import Any, Dict
+
+# asyncio is imported where it is used: submit() runs in the CLI's forwarded
+# path (app.py), which must stay cheap to start (tools/bench_startup.py).
+
+JOBS = ("eval", "experiment", "tournament")
+
+# Read once per process by the pipeline; a job is only run for a client that agrees on them
+CONTEXT = ("OLLAMA_BASE_URL", "CANDIDATE_MODEL", "AUTOEVAL_GOVERNANCE", "AUTOEVAL_RUN_STORE",
+           "AUTOEVAL_RECORD_STORE", "AUTOEVAL_CACHE_PATH")
+
+
+class Refused(RuntimeError):
+    """The daemon runs in another directory/environment than the client; run the job locally."""
+
+
+def _context() -> Dict[str, Any]:
+    return {"cwd": os.getcwd(), "env": {k: os.environ.get(k) for k in CONTEXT}}
+
+
+def job_function(cmd: str):
+    """The orchestrator entry point behind a job name."""
+    import orchestrator  # heavy: httpx, yaml, numpy, agents
+
+    if cmd not in JOBS:
+        raise ValueError(f"unknown job {cmd!r}; expected one of {', '.join(JOBS)}")
+    return {"eval": orchestrator.run_round, "experiment": orchestrator.run_experiment,
+            "tournament": orchestrator.run_tournament}[cmd]
+
+
+async def run_job(cmd: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one job in this process: the report (eval) or summary (experiment, tournament)."""
+    return await job_function(cmd)(**kwargs)
+
+
+def submit(path: str, cmd: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Send a job to the daemon at `path` and wait for its result. Raises
+    ConnectionRefusedError/FileNotFoundError if no daemon listens there (e.g.
+    a stale socket file) and Refused if its cwd/environment differ from ours.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.connect(path)
+        s.sendall(json.dumps({"cmd": cmd, "kwargs": kwargs, **_context()}).encode() + b"\n")
+        with s.makefile("rb") as f:
+            reply = json.loads(f.readline() or b'{"ok": false, "error": "daemon closed the connection"}')
+    if reply.get("refused"):
+        raise Refused(reply["error"])
+    if not reply["ok"]:
+        raise RuntimeError(f"daemon job failed: {reply['error']}")
+    return reply["result"]
+
+
+def _mismatch(req: Dict[str, Any]) -> str:
+    """Why this daemon can't run `req` as its client would, or ''."""
+    ours = _context()
+    if req.get("cwd", ours["cwd"]) != ours["cwd"]:
+        return f"daemon runs in {ours['cwd']}, client in {req['cwd']}"
+    theirs = req.get("env") or {}
+    diff = [k for k in CONTEXT if k in theirs and theirs[k] != ours["env"][k]]
+    return f"daemon has a different {', '.join(diff)}" if diff else ""
+
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    try:
+        req = json.loads(await reader.readline())
+        if why := _mismatch(req):
+            print(f"[daemon] refused {req['cmd']}: {why}")
+            reply = {"ok": False, "refused": True, "error": why}
+        else:
+            print(f"[daemon] {req['cmd']} {req.get('kwargs') or {}}")
+            reply = {"ok": True, "result": await run_job(req["cmd"], req.get("kwargs") or {})}
+    except Exception as e:
+        reply = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+    try:
+        writer.write(json.dumps(reply, default=str).encode() + b"\n")
+        await writer.drain()
+    finally:
+        writer.close()
+
+
+def _claim(path: str):
+    """Remove a stale socket file at `path`; SystemExit if a daemon still listens there."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        try:
+            s.connect(path)
+        except FileNotFoundError:
+            return
+        except ConnectionRefusedError:
+            os.remove(path)  # left behind by a daemon that died
+            return
+    raise SystemExit(f"daemon already running on {path}")
+
+
+async def serve(path: str = "experiments/autoeval.sock"):
+    """Accept jobs on `path` until interrupted; the Ollama client pool stays open throughout."""
+    import asyncio
+
+    _claim(path)
+    import orchestrator  # noqa: F401  (import once, up front)
+    from models.ollama_client import lifespan
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    async with lifespan():
+        server = await asyncio.start_unix_server(_handle, path=path)
+        os.chmod(path, 0o600)
+        print(f"[daemon] listening on {path}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+if __name__ == "__main__":
+    import argparse
+    import asyncio
+
+    parser = argparse.ArgumentParser(description="AutoEval Lab eval daemon")
+    parser.add_argument("--socket", default="experiments/autoeval.sock", help="Unix socket to listen on")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.socket))
+    except KeyboardInterrupt:
+        pass
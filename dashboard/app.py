@@ -1,70 +1,127 @@
-import json, os, glob
+import json, os, sys
+import numpy as np
 import pandas as pd
 import streamlit as st
-import matplotlib.pyplot as plt
 
 st.set_page_config(page_title="AutoEval Lab", layout="wide")
 
 st.title("🧮 AutoEval Lab – Dashboard")
 
-# --- Load index (fast) ---
-INDEX_PATH = "experiments/index.json"
-if not os.path.exists(INDEX_PATH):
-    st.warning("No experiments/index.json found. Run a few evals or backfill first.")
-    st.stop()
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.memory import load_index, get_aggregates, store_version
+from core.records import read_rows, count_rows
+
+PAGE_SIZE = 100      # rows per page in the runs table and the records view
+MAX_POINTS = 1500    # chart points; longer histories are bucket-averaged
+
+# --- Cached data layer ---
+# Everything below is keyed on store_version(), which changes on every new run
+# (or backfill), so reruns triggered by widgets reuse the parsed data.
+
+@st.cache_data(show_spinner=False)
+def _runs_frame(version) -> pd.DataFrame:
+    return pd.DataFrame(load_index())
+
+@st.cache_data(show_spinner=False)
+def _aggregates(version) -> pd.DataFrame:
+    return pd.DataFrame(get_aggregates())
+
+@st.cache_data(show_spinner=False)
+def _report(run_id: str):
+    path = f"experiments/{run_id}_report.json"
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _records_page(run_id: str, page: int):
+    recs = read_rows(run_id, "records", page * PAGE_SIZE, (page + 1) * PAGE_SIZE)
+    records_path = f"experiments/{run_id}_records.json"
+    if not recs and os.path.exists(records_path):  # runs written before the record store
+        with open(records_path) as f:
+            recs = json.load(f)[page * PAGE_SIZE:(page + 1) * PAGE_SIZE]
+    return recs
 
-with open(INDEX_PATH) as f:
-    runs = json.load(f)
+def downsample(df: pd.DataFrame, max_points: int = MAX_POINTS) -> pd.DataFrame:
+    """Mean of consecutive buckets so at most `max_points` rows reach the browser."""
+    if len(df) <= max_points:
+        return df
+    bucket = np.arange(len(df)) * max_points // len(df)
+    return df.groupby(bucket).mean(numeric_only=True)
 
-if not runs:
-    st.warning("Index is empty. Run a few evals first.")
+version = store_version()
+df = _runs_frame(version)
+
+if df.empty:
+    st.warning("Run store is empty. Run a few evals or backfill first.")
     st.stop()
 
-df = pd.DataFrame(runs).sort_values("run_id")
-st.subheader("Runs Index")
-st.dataframe(df, use_container_width=True)
+# --- Aggregates (precomputed in the run store) ---
+agg = _aggregates(version)
+st.subheader("Per-model / per-mode summary")
+st.dataframe(agg, use_container_width=True, hide_index=True)
 
 # --- Filters ---
 col1, col2 = st.columns(2)
 with col1:
-    model = st.selectbox("Filter by model", ["(all)"] + sorted(df["model"].unique()))
+    model = st.selectbox("Filter by model", ["(all)"] + sorted(agg["model"].unique()))
 with col2:
-    mode = st.selectbox(
-    "Filter by mode/domain",
-    ["(all)"] + sorted(df.get("mode", "(unknown)").fillna("(unknown)").unique())
-    )
+    mode = st.selectbox("Filter by mode/domain", ["(all)"] + sorted(agg["mode"].unique()))
 
-fdf = df.copy()
+fdf = df
 if model != "(all)":
-    fdf = fdf[fdf["model"] == model]
+    fdf = fdf[fdf["model"].fillna("") == model]
 if mode != "(all)":
-    fdf = fdf[fdf["mode"] == mode]
+    fdf = fdf[fdf["mode"].fillna("") == mode]
+fdf = fdf.reset_index(drop=True)
 
 st.subheader("Accuracy Trend")
 if fdf.empty:
     st.info("No rows after filtering.")
 else:
-    fig, ax = plt.subplots()
-    ax.plot(range(1, len(fdf)+1), fdf["accuracy"], marker="o")
-    ax.set_title("Accuracy over runs")
-    ax.set_xlabel("Run # (filtered)")
-    ax.set_ylabel("Accuracy")
-    ax.grid(True)
-    st.pyplot(fig)
+    trend = downsample(fdf[["accuracy"]].assign(run=np.arange(1, len(fdf) + 1))).set_index("run")
+    if len(fdf) > MAX_POINTS:
+        st.caption(f"{len(fdf)} runs, averaged into {len(trend)} points")
+    st.line_chart(trend)
+
+    perf = fdf.dropna(subset=["items_per_s"])
+    if not perf.empty:
+        st.subheader("Latency & Throughput Trend")
+        perf = downsample(
+            perf[["items_per_s", "p50_latency_ms", "load_ms"]].assign(run=np.arange(1, len(perf) + 1))
+        ).set_index("run")
+        c1, c2 = st.columns(2)
+        with c1:
+            st.caption("Items / second")
+            st.line_chart(perf[["items_per_s"]])
+        with c2:
+            st.caption("Per-item p50 latency vs. model load (ms)")
+            st.line_chart(perf[["p50_latency_ms", "load_ms"]])
+
+# --- Runs (paginated, newest first) ---
+st.subheader("Runs Index")
+n_pages = max(1, -(-len(fdf) // PAGE_SIZE))
+page = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1) - 1
+newest = fdf.iloc[::-1]
+page_df = newest.iloc[page * PAGE_SIZE:(page + 1) * PAGE_SIZE]
+st.dataframe(page_df, use_container_width=True, hide_index=True)
 
 # --- Drill into a run ---
 st.subheader("Inspect a Run")
-choices = [r["run_id"] for r in runs]
-sel = st.selectbox("Run ID", choices[::-1])  # newest first
-report_path = f"experiments/{sel}_report.json"
-records_path = f"experiments/{sel}_records.json"
-
-if os.path.exists(report_path):
-    with open(report_path) as f:
-        rep = json.load(f)
+if page_df.empty:
+    st.stop()
+sel = st.selectbox("Run ID (current page)", page_df["run_id"].tolist())
+
+rep = _report(sel)
+if rep is not None:
     st.write("**Report:**", rep)
 
-if os.path.exists(records_path) and st.checkbox("Show records (first 50)"):
-    with open(records_path) as f:
-        recs = json.load(f)
-    st.dataframe(pd.DataFrame(recs[:50]), use_container_width=True)
\ No newline at end of file
+if st.checkbox("Show records"):
+    total = count_rows(sel, "records")
+    rec_pages = max(1, -(-total // PAGE_SIZE))
+    rec_page = st.number_input(f"Records page (of {rec_pages})", min_value=1, max_value=rec_pages, value=1) - 1
+    recs = _records_page(sel, rec_page)
+    if recs:
+        st.caption(f"{total or len(recs)} records in run")
+        st.dataframe(pd.DataFrame(recs), use_container_width=True)
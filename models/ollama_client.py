@@ -1,26 +1,396 @@
-import os, httpx
+import asyncio, json, os, re, time, httpx
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from functools import wraps
 
+from core.cache import ResponseCache, cache_key
+
+# One or more backends, comma-separated: "http://gpu1:11434,http://gpu2:11434"
 BASE = os.environ.get("OLLAMA_BASE_URL", "http://127.0.0.1:11434")
+BASES = [b.strip().rstrip("/") for b in BASE.split(",") if b.strip()]
+
+TIMEOUT = float(os.environ.get("OLLAMA_TIMEOUT_S", "120"))
+# Sent with every request so hot models stay loaded between rounds (Ollama's default is 5m).
+KEEP_ALIVE = os.environ.get("OLLAMA_KEEP_ALIVE", "30m")
+LIMITS = httpx.Limits(
+    max_connections=int(os.environ.get("OLLAMA_MAX_CONNECTIONS", "16")),
+    max_keepalive_connections=int(os.environ.get("OLLAMA_MAX_KEEPALIVE", "8")),
+    keepalive_expiry=float(os.environ.get("OLLAMA_KEEPALIVE_S", "30")),
+)
+
+try:  # HTTP/2 needs the optional `h2` package (pip install httpx[http2])
+    import h2  # noqa: F401
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+
+class _Backend:
+    """A long-lived client for one Ollama host plus its in-flight request count."""
+    def __init__(self, base: str):
+        self.base = base
+        self.outstanding = 0
+        self.client = httpx.AsyncClient(base_url=base, timeout=TIMEOUT, limits=LIMITS, http2=HTTP2)
+
+
+_backends: list[_Backend] = []
+_depth = 0
+
+# Response cache in front of chat(); AUTOEVAL_NO_CACHE=1 bypasses it.
+CACHE = ResponseCache()
+_inflight: dict[str, asyncio.Future] = {}
+
+
+class _Abandoned(Exception):
+    """Set on a shared in-flight call whose leader was cancelled; followers issue it themselves."""
+
+
+def cache_enabled() -> bool:
+    return os.environ.get("AUTOEVAL_NO_CACHE", "") not in {"1", "true", "yes"}
+
+
+# ---- usage accounting
+_usage: ContextVar[dict | None] = ContextVar("ollama_usage", default=None)
+RELOAD_MS = 100.0  # a load_duration above this means Ollama (re)loaded the model for the call
+
+
+def new_usage() -> dict:
+    return {"calls": 0, "cached": 0, "latency_s": 0.0, "prompt_tokens": 0, "eval_tokens": 0, "load_ms": 0.0, "reloads": 0,
+            "prefix_tokens_saved": 0}
+
+
+@contextmanager
+def track_usage():
+    """
+    Sum call counts, latency and Ollama token/duration counters for every chat()
+    made inside the block (including tasks started from it).
+    """
+    usage = new_usage()
+    token = _usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _usage.reset(token)
+
+
+def _account(stats: dict):
+    usage = _usage.get()
+    if usage is None:
+        return
+    usage["calls"] += 1
+    if stats.get("cached"):
+        usage["cached"] += 1
+        return
+    usage["latency_s"] += stats.get("latency_s") or 0.0
+    usage["prompt_tokens"] += stats.get("prompt_eval_count") or 0
+    usage["prefix_tokens_saved"] += stats.get("prefix_tokens") or 0
+    usage["eval_tokens"] += stats.get("eval_count") or stats.get("tokens") or 0
+    load = stats.get("load_ms") or 0.0
+    usage["load_ms"] += load
+    usage["reloads"] += int(load > RELOAD_MS)
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Worth retrying: connection/timeout problems, 429 and 5xx responses."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        code = exc.response.status_code
+        return code == 429 or code >= 500
+    return isinstance(exc, (httpx.TransportError, asyncio.TimeoutError))
+
+
+def _server_stats(data: dict) -> dict:
+    """Ollama's own counters from a final response/chunk (durations ns -> ms)."""
+    out = {k: data[k] for k in ("prompt_eval_count", "eval_count") if k in data}
+    for k in ("total_duration", "load_duration", "prompt_eval_duration", "eval_duration"):
+        if k in data:
+            out[k.replace("_duration", "_ms")] = data[k] / 1e6
+    return out
+
+
+# ---- backend selection
+_pinned: ContextVar[str | None] = ContextVar("ollama_pinned_backend", default=None)
+
+
+@contextmanager
+def pin_backend(base: str):
+    """Send every chat() made inside the block (and its tasks) to one backend."""
+    token = _pinned.set(base.rstrip("/"))
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+def pinned_backend() -> str | None:
+    """The backend pinned by pin_backend() for the current task, if any."""
+    return _pinned.get()
+
+
+def _pick() -> _Backend:
+    """The pinned backend if any, else least-outstanding-requests across the configured backends."""
+    global _backends
+    if not _backends:
+        _backends = [_Backend(b) for b in BASES]
+    pinned = _pinned.get()
+    if pinned is not None:
+        for b in _backends:
+            if b.base == pinned:
+                return b
+        raise ValueError(f"{pinned} is not one of OLLAMA_BASE_URL: {BASES}")
+    return min(_backends, key=lambda b: b.outstanding)
 
-async def chat(model: str, messages: list[dict], temperature: float = 0.2, stream: bool = False) -> str:
+
+async def aclose():
+    """Close every pooled client (they are recreated lazily on the next call)."""
+    global _backends
+    backends, _backends = _backends, []
+    for b in backends:
+        await b.client.aclose()
+
+
+@asynccontextmanager
+async def lifespan():
+    """
+    Keep the pooled clients open for the duration of a round/experiment.
+    Nested uses are fine; the pool and the response cache's database
+    connection are closed when the outermost one exits.
+    """
+    global _depth
+    _depth += 1
+    try:
+        yield
+    finally:
+        _depth -= 1
+        if _depth == 0:
+            await aclose()
+            CACHE.close()
+
+
+def pooled(fn):
+    """Decorator: run an async entry point (run_round, run_experiment) inside `lifespan()`."""
+    @wraps(fn)
+    async def wrapper(*args, **kwargs):
+        async with lifespan():
+            return await fn(*args, **kwargs)
+    return wrapper
+
+
+async def preload(model: str) -> dict:
+    """
+    Load `model` (an empty /api/chat request) on the pinned backend, or on every
+    backend, and keep it resident for KEEP_ALIVE. Returns summed load_ms/reloads.
+    """
+    pinned = _pinned.get()
+    _pick()  # make sure the pool exists
+    targets = [b for b in _backends if pinned is None or b.base == pinned]
+    total = {"load_ms": 0.0, "reloads": 0}
+    for b in targets:
+        t0 = time.perf_counter()
+        r = await b.client.post("/api/chat", json={"model": model, "messages": [], "keep_alive": KEEP_ALIVE})
+        r.raise_for_status()
+        stats = {"latency_s": time.perf_counter() - t0, **_server_stats(r.json())}
+        _account(stats)
+        total["load_ms"] += stats.get("load_ms") or 0.0
+        total["reloads"] += int((stats.get("load_ms") or 0.0) > RELOAD_MS)
+    return total
+
+
+async def warm_prefix(model: str, messages: list[dict]) -> int:
+    """
+    Evaluate `messages` (a shared prompt prefix) once, generating a single
+    token, on the pinned backend or every backend, so the server's KV cache
+    holds it for the requests that follow. Returns its size in prompt tokens,
+    or 0 if no backend could be warmed: warming is an optimization, so a
+    failure is reported and the requests that follow just evaluate the prefix.
+    """
+    pinned = _pinned.get()
+    _pick()
+    size = 0
+    for b in [b for b in _backends if pinned is None or b.base == pinned]:
+        t0 = time.perf_counter()
+        try:
+            r = await b.client.post("/api/chat", json={
+                "model": model, "messages": messages, "stream": False,
+                "options": {"num_predict": 1, "temperature": 0.0}, "keep_alive": KEEP_ALIVE,
+            })
+            r.raise_for_status()
+        except (httpx.HTTPError, asyncio.TimeoutError) as e:
+            print(f"[warn] could not warm the prompt prefix of {model} on {b.base}: {e!r}")
+            continue
+        stats = {"latency_s": time.perf_counter() - t0, **_server_stats(r.json())}
+        _account(stats)
+        size = max(size, stats.get("prompt_eval_count") or 0)
+    return size
+
+
+def _prefix_reused(prefix_tokens: int, messages: list[dict], stats: dict) -> int:
+    """
+    Estimated prefix tokens the server did not re-evaluate. Ollama counts only
+    the tokens it evaluated in prompt_eval_count, so the shortfall against the
+    full prompt (prefix + the last message, at ~4 characters per token) is
+    what its KV cache covered, capped at the prefix size. No counter (e.g. a
+    stream cut off before its final chunk), no claim.
+    """
+    evaluated = stats.get("prompt_eval_count")
+    if not prefix_tokens or evaluated is None:
+        return 0
+    full = prefix_tokens + -(-len(messages[-1].get("content") or "") // 4)
+    return max(0, min(prefix_tokens, full - evaluated))
+
+
+async def chat(
+    model: str,
+    messages: list[dict],
+    temperature: float = 0.2,
+    stream: bool = False,
+    cache: bool | None = None,
+    stop: re.Pattern | None = None,
+    stats: dict | None = None,
+    prefix_tokens: int = 0,
+) -> str:
     """
     Use the legacy Ollama endpoint (/api/chat) exclusively, since your server
     responds correctly there (per your curl test). This avoids 404s from /v1/*.
+    Deterministic (temperature 0) replies are served from / stored in the
+    response cache, and identical calls already in flight are shared; sampled
+    calls always reach the model unless `cache=True` opts them in. `cache=False`
+    or AUTOEVAL_NO_CACHE bypasses the cache.
+
+    stream=True reads the NDJSON chunks as they arrive; if `stop` is given the
+    read ends as soon as it has a complete match and the reply is cut there.
+    Timing and token counters go into `stats`: latency_s, cached, Ollama's
+    total/load/prompt_eval/eval (_ms, _count) and, when streaming, ttft_s,
+    tokens, tokens_per_s, cut_off. Calls are also summed into `track_usage()`.
+    `prefix_tokens` is the size of a warmed shared prefix these messages start
+    with (see models/prompts.py); how much of it the server actually reused
+    (an estimate, see _prefix_reused) is counted as prefix_tokens_saved.
     """
-    async with httpx.AsyncClient(timeout=120) as client:
-        payload = {
-            "model": model,
-            "messages": messages,
-            "stream": False,
-            "options": {"temperature": temperature},
-        }
-        r = await client.post(f"{BASE}/api/chat", json=payload)
-        r.raise_for_status()
-        data = r.json()
-        # Primary schema: {"message": {"content": "..."}}
-        msg = data.get("message") or {}
-        content = (msg.get("content") or "").strip()
-        if not content and "choices" in data:
-            # Some variants may still return OpenAI-like `choices`
-            content = data["choices"][0]["message"]["content"].strip()
-        return content
\ No newline at end of file
+    stats = stats if stats is not None else {}
+    content = await _chat(model, messages, temperature, stream, cache, stop, stats)
+    if not stats.get("cached"):
+        stats["prefix_tokens"] = _prefix_reused(prefix_tokens, messages, stats)
+    _account(stats)
+    return content
+
+
+async def _chat(model, messages, temperature, stream, cache, stop, stats) -> str:
+    options = {"temperature": temperature}
+
+    async def _call():
+        if stream:
+            return await _stream(model, messages, options, stop, stats)
+        return await _post(model, messages, options, stats)
+
+    if cache is None:
+        cache = temperature == 0  # a sampled reply is one draw; replaying it would make re-runs copies
+    if not (cache and cache_enabled()):
+        return await _call()
+
+    key = cache_key(model, messages, {**options, "stop": stop.pattern if stream and stop else None})
+    while key in _inflight:
+        try:
+            content = await asyncio.shield(_inflight[key])
+        except _Abandoned:
+            continue  # its leader was cancelled (not us): lead or follow the next attempt
+        CACHE.hits += 1
+        stats["cached"] = True
+        return content
+    hit = CACHE.get(key)
+    if hit is not None:
+        stats["cached"] = True
+        return hit
+
+    fut = asyncio.get_running_loop().create_future()
+    _inflight[key] = fut
+    try:
+        content = await _call()
+    except asyncio.CancelledError:
+        fut.set_exception(_Abandoned())  # followers did not ask to be cancelled
+        fut.exception()
+        raise
+    except Exception as e:
+        fut.set_exception(e)
+        fut.exception()  # mark retrieved when nobody else was waiting
+        raise
+    finally:
+        _inflight.pop(key, None)
+    fut.set_result(content)
+    if content:
+        CACHE.put(key, content)
+    return content
+
+
+async def _stream(model: str, messages: list[dict], options: dict, stop: re.Pattern | None, stats: dict) -> str:
+    backend = _pick()
+    payload = {
+        "model": model,
+        "messages": messages,
+        "stream": True,
+        "options": options,
+        "keep_alive": KEEP_ALIVE,
+    }
+    buf, tokens, cut_off = "", 0, False
+    t0 = time.perf_counter()
+    t_first = None
+    backend.outstanding += 1
+    try:
+        async with backend.client.stream("POST", "/api/chat", json=payload) as r:
+            r.raise_for_status()
+            async for line in r.aiter_lines():
+                if not line.strip():
+                    continue
+                chunk = json.loads(line)
+                piece = (chunk.get("message") or {}).get("content") or ""
+                if piece:
+                    if t_first is None:
+                        t_first = time.perf_counter()
+                    tokens += 1
+                    buf += piece
+                if chunk.get("done"):
+                    stats.update(_server_stats(chunk))
+                    break
+                if stop is not None:
+                    m = stop.search(buf)
+                    # a match touching the end of the buffer may still grow ("4" -> "42")
+                    if m and m.end() < len(buf):
+                        buf, cut_off = buf[:m.end()], True
+                        break  # leaving the context closes the connection; Ollama stops generating
+    finally:
+        backend.outstanding -= 1
+    t_end = time.perf_counter()
+    gen_s = (t_end - t_first) if t_first is not None else 0.0
+    stats.update(
+        latency_s=t_end - t0,
+        ttft_s=(t_first - t0) if t_first is not None else None,
+        tokens=tokens,
+        tokens_per_s=(tokens / gen_s) if gen_s > 0 else None,
+        cut_off=cut_off,
+    )
+    return buf.strip()
+
+
+async def _post(model: str, messages: list[dict], options: dict, stats: dict) -> str:
+    backend = _pick()
+    payload = {
+        "model": model,
+        "messages": messages,
+        "stream": False,
+        "options": options,
+        "keep_alive": KEEP_ALIVE,
+    }
+    t0 = time.perf_counter()
+    backend.outstanding += 1
+    try:
+        r = await backend.client.post("/api/chat", json=payload)
+    finally:
+        backend.outstanding -= 1
+    r.raise_for_status()
+    data = r.json()
+    stats.update(latency_s=time.perf_counter() - t0, **_server_stats(data))
+    # Primary schema: {"message": {"content": "..."}}
+    msg = data.get("message") or {}
+    content = (msg.get("content") or "").strip()
+    if not content and "choices" in data:
+        # Some variants may still return OpenAI-like `choices`
+        content = data["choices"][0]["message"]["content"].strip()
+    return content
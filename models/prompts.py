@@ -0,0 +1,60 @@
+from models.ollama_client import chat, warm_prefix
+
+# Prompt layer: every request kind starts with the same byte-identical system
+# message, and per-item text only ever comes after it. Ollama keeps the KV
+# cache of a loaded model's last prompt (for KEEP_ALIVE), so a request whose
+# leading tokens match skips re-evaluating them; this is the /api/chat
+# equivalent of passing `context` back to /api/generate.
+
+
+class PromptPrefix:
+    def __init__(self, name: str, system: str):
+        self.name = name
+        self.messages = [{"role": "system", "content": system}]
+        self._tokens: dict[str, int] = {}  # model -> measured prefix size (prompt tokens)
+
+    def build(self, user: str) -> list[dict]:
+        """Request messages: the shared prefix, then this item's user turn."""
+        return [*self.messages, {"role": "user", "content": user}]
+
+    async def warm(self, model: str) -> int:
+        """Evaluate the prefix once on `model` (and measure it); later requests reuse it."""
+        if not self._tokens.get(model):  # 0: warming failed, try again next time
+            self._tokens[model] = await warm_prefix(model, self.messages)
+        return self._tokens[model]
+
+    def tokens(self, model: str) -> int:
+        """Prefix size measured by warm(); 0 if it was never warmed for `model`."""
+        return self._tokens.get(model, 0)
+
+    async def chat(self, model: str, user: str, **kw) -> str:
+        """chat() with this prefix; prefix tokens the server reused are counted in track_usage()."""
+        return await chat(model, self.build(user), prefix_tokens=self.tokens(model), **kw)
+
+
+MATH = PromptPrefix("math", "Answer with only the final number.")
+
+REASON = PromptPrefix(
+    "reason",
+    "Provide brief reasoning and end with a final decision line "
+    "exactly as: 'Final: Yes' or 'Final: No'.\n\n"
+    "Answer Yes or No and explain in 2–3 sentences.\n"
+    "Put your final decision on a new last line exactly as: Final: Yes   or   Final: No",
+)
+
+_RUBRIC = (
+    "You are a strict evaluator.\n"
+    "Score the ASSISTANT'S explanation from 1.0 to 5.0 based on:\n"
+    "  (1) Correctness of final Yes/No vs GOLD label\n"
+    "  (2) Soundness and clarity of reasoning\n"
+    "  (3) Consistency with the gold rationale\n"
+)
+
+JUDGE = PromptPrefix("judge", "Return only a numeric score.\n\n" + _RUBRIC + "Output ONLY a number (e.g., 4.0).")
+
+JUDGE_BATCH = PromptPrefix(
+    "judge_batch",
+    "Return only the numbered scores.\n\n"
+    + _RUBRIC.replace("Score the ASSISTANT'S explanation", "Score EACH item's ASSISTANT explanation")
+    + "Output one line per item, as: <item number>: <score>",
+)
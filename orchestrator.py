@@ -1,11 +1,23 @@
 # orchestrator.py
 from __future__ import annotations
 
+import asyncio
+import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from statistics import NormalDist
 from typing import Optional, Dict, Any, List
 
-from core.io import write_json, timestamp
-from core.governance import load_rules, enforce_rate_limit
+from core.io import ArtifactWriter, write_json, write_text, new_run_id
+from core.records import append_rows, has_rows
+from core.workqueue import WorkQueue
+from core.checkpoint import Checkpoint, checkpoint_path, experiment_state_path, write_state, read_state
+from core.governance import load_rules, enforce_rate_limit, rate_limiter, schedule_params
+from core.scheduler import gather_bounded
+from core.scoring import ANSWER_STOP_RE, score_records, wilson_interval
+from core.timing import StageClock, percentile
+from core.events import emit, item_event
 from core.memory import add_run_entry, get_trend_summary
 
 from agents.dataset_agent import (
@@ -15,13 +27,40 @@ from agents.dataset_agent import (
 )
 from agents.analyst_agent import summarize_metrics
 from agents.evaluator_agent import evaluate as eval_math
-from agents.evaluator_agent import evaluate_reasoning
-from models.ollama_client import chat
+from agents.evaluator_agent import evaluate_reasoning, label_accuracy, FINAL_RE
+from models import prompts
+from models.ollama_client import preload, pinned_backend, pooled, track_usage, new_usage, pin_backend, BASES, CACHE
 
 
 # --------- Global config ---------
 CANDIDATE = os.environ.get("CANDIDATE_MODEL", "qwen2.5:0.5b-instruct")
 MODES_ORDER = ["single", "multi", "carry"]  # for math only
+HARDER_AT = 0.90   # accuracy at/above which math moves up a mode
+EASIER_BELOW = 0.60  # accuracy below which it moves down
+
+
+def build_items(domain: str, n_items: int, *, mode: str = "single", seed: int = 0):
+    """Dataset for one round; built once and shared when several models are compared."""
+    if domain == "math":
+        return make_simple_math(n_items, seed=seed, mode=mode)
+    if domain == "reason":
+        return make_reasoning(n_items, seed=seed)
+    raise ValueError(f"Unknown domain: {domain}")
+
+
+def _next_mode_candidates(current: str) -> List[str]:
+    """Every mode _suggest_next_mode can return from `current`."""
+    if current not in MODES_ORDER:
+        return ["single"]
+    i = MODES_ORDER.index(current)
+    return MODES_ORDER[max(0, i - 1): i + 2]
+
+
+def _prefetch_items(domain: str, n_items: int, modes: List[str], seed: int) -> Dict[str, Any]:
+    """Datasets for each possible next mode (runs in a worker thread while the current round infers)."""
+    if domain != "math":
+        return {None: build_items(domain, n_items, seed=seed)}
+    return {m: build_items(domain, n_items, mode=m, seed=seed) for m in modes}
 
 
 def _suggest_next_mode(current: str, acc: float) -> str:
@@ -29,13 +68,145 @@ def _suggest_next_mode(current: str, acc: float) -> str:
     if current not in MODES_ORDER:
         return "single"
     i = MODES_ORDER.index(current)
-    if acc >= 0.90 and i < len(MODES_ORDER) - 1:
+    if acc >= HARDER_AT and i < len(MODES_ORDER) - 1:
         return MODES_ORDER[i + 1]
-    if acc < 0.60 and i > 0:
+    if acc < EASIER_BELOW and i > 0:
         return MODES_ORDER[i - 1]
     return current
 
 
+def _z(rules: Dict[str, Any]) -> float:
+    """Two-sided z for the configured adaptive_confidence (default 95%)."""
+    return NormalDist().inv_cdf(0.5 + float(rules.get("adaptive_confidence", 0.95)) / 2)
+
+
+def _settled(domain: str, k: int, n: int, rules: Dict[str, Any]) -> bool:
+    """
+    Whether k/n correct already fixes the round's outcome at the configured confidence:
+    math - the Wilson interval lies wholly in one _suggest_next_mode band;
+    reason - the interval is narrower than adaptive_ci_width.
+    """
+    lo, hi = wilson_interval(k, n, _z(rules))
+    if domain == "math":
+        return lo >= HARDER_AT or hi < EASIER_BELOW or (lo >= EASIER_BELOW and hi < HARDER_AT)
+    return hi - lo <= float(rules.get("adaptive_ci_width", 0.2))
+
+
+async def answer_item(domain: str, model: str, it, *, mode: str = "single", stream: bool = False) -> Dict[str, Any]:
+    """Ask the candidate one item; returns its record (shared by rounds and distributed workers)."""
+    gen: Dict[str, Any] = {}
+    if domain == "math":
+        pred = await prompts.MATH.chat(model, it.prompt, stream=stream, stop=ANSWER_STOP_RE, stats=gen)
+        return {
+            "id": it.id,
+            "prompt": it.prompt,
+            "gold": it.answer,
+            "pred": pred,
+            "mode": (it.meta or {}).get("mode", mode),
+            "gen": gen,
+        }
+    pred_text = await prompts.REASON.chat(model, it.prompt, temperature=0.2, stream=stream, stop=FINAL_RE, stats=gen)
+    return {
+        "id": it.id,
+        "prompt": it.prompt,
+        "gold": it.answer,  # Yes/No
+        "gold_rationale": (it.meta or {}).get("rationale", ""),
+        "pred_text": pred_text,
+        "gen": gen,
+    }
+
+
+def error_record(it, exc: BaseException) -> Dict[str, Any]:
+    """Record for an item that could not be answered (kept in the round, excluded from scoring)."""
+    return {"id": it.id, "prompt": it.prompt, "gold": it.answer, "error": f"{type(exc).__name__}: {exc}", "gen": {}}
+
+
+async def _generate(run, items, done: Dict[str, Any], checkpoint: Checkpoint,
+                    domain: str, sched: Dict[str, Any], rules: Dict[str, Any], adaptive: bool, run_id: str = ""):
+    """
+    Answer `items` in order, skipping ids already in `done` (resume).
+    `run(todo)` answers a list of items (locally, or through the work queue),
+    checkpointing each record as it completes, and returns a record or an
+    exception per item; an item that still failed becomes an error_record
+    instead of failing the round. With `adaptive`, items go in waves of
+    max_concurrency and sampling stops once the decision is _settled (after
+    adaptive_min_items scored items).
+    """
+    min_items = int(rules.get("adaptive_min_items", 8))
+    step = max(1, sched["limit"]) if adaptive else max(1, len(items))
+    records: List[Dict[str, Any]] = []
+    for start in range(0, len(items), step):
+        chunk = list(items[start: start + step])
+        todo = [it for it in chunk if it.id not in done]
+        fresh = dict(zip((it.id for it in todo), await run(todo)))
+        for it in chunk:
+            rec = done.get(it.id) or fresh[it.id]
+            if isinstance(rec, Exception):
+                rec = error_record(it, rec)
+                checkpoint.append(rec)
+                item_event(run_id, rec)
+            records.append(rec)
+        if adaptive:
+            scored = [r for r in records if "error" not in r]
+            k = int(score_records(scored, domain, set_field=None).sum())
+            if len(scored) >= min_items and _settled(domain, k, len(scored), rules):
+                break
+    return records
+
+
+async def _dispatch(queue: WorkQueue, unit: Dict[str, Any], todo, checkpoint: Checkpoint,
+                    usage: Dict[str, Any], rules: Dict[str, Any]):
+    """
+    Coordinator side of distributed mode: shard `todo` into work units of
+    work_unit_size items, wait for workers (see worker.py) to finish them, and
+    checkpoint each unit's records as it arrives. Returns a record or an
+    exception per item, like gather_bounded(return_exceptions=True).
+    Workers' per-stage usage counters are added into `usage`. Raises if no
+    worker leases any unit within work_lease_s (none is running); the
+    checkpoint keeps whatever arrived, so the round can be resumed.
+    """
+    size = max(1, int(rules.get("work_unit_size", 4)))
+    give_up_at = time.monotonic() + float(rules.get("work_lease_s", 600))
+    batch = f"{unit['run_id']}:{new_run_id()}"  # unique per wave / resume
+    shards = [todo[i:i + size] for i in range(0, len(todo), size)]
+    ids = queue.put(batch, [{**unit, "items": [it.__dict__ for it in shard]} for shard in shards])
+    by_unit = dict(zip(ids, shards))
+    out: Dict[str, Any] = {}
+    note_at = time.monotonic() + 30
+    try:
+        while len(out) < len(todo):
+            for uid, (status, result, error) in queue.finished(batch).items():
+                shard = by_unit.pop(uid, None)
+                if shard is None:
+                    continue  # collected on an earlier poll
+                if status == "done":
+                    for stage, counters in result["usage"].items():
+                        total = usage.setdefault(stage, new_usage())
+                        for k, v in counters.items():
+                            total[k] = total.get(k, 0) + v
+                    for rec in result["records"]:
+                        checkpoint.append(rec)
+                        item_event(unit["run_id"], rec)
+                        out[rec["id"]] = rec
+                else:
+                    for it in shard:
+                        out[it.id] = RuntimeError(f"work unit failed: {error}")
+            if len(out) < len(todo):
+                await asyncio.sleep(0.2)
+                if time.monotonic() > note_at:
+                    print(f"Waiting for workers on {queue.path} ({len(by_unit)} unit(s) outstanding)")
+                    note_at += 30
+                if give_up_at is not None and time.monotonic() > give_up_at:
+                    if not queue.leased(batch):
+                        raise RuntimeError(f"no worker took a work unit from {queue.path} within "
+                                           f"{rules.get('work_lease_s', 600)}s; start `app.py worker --queue {queue.path}`")
+                    give_up_at = None  # workers are there; expired leases are re-leased, not given up on
+    finally:
+        queue.purge(batch)
+    return [out[it.id] for it in todo]
+
+
+@pooled
 async def run_round(
     n_items: int = 10,
     outdir: str = "experiments",
@@ -44,128 +215,328 @@ async def run_round(
     mode: str = "single",          # only used for domain="math"
     judge_model: Optional[str] = None,
     seed: int = 0,
+    model: Optional[str] = None,   # candidate; defaults to $CANDIDATE_MODEL
+    items=None,                    # prebuilt dataset (see build_items); built from domain/mode/seed if None
+    resume: Optional[str] = None,  # run_id of an interrupted round: reuse its answers, ask only the rest
+    run_store: Optional[str] = None,  # run store file (core.memory); default $AUTOEVAL_RUN_STORE
 ) -> Dict[str, Any]:
     """
     One evaluation round:
       - builds a dataset
-      - queries local model via Ollama
+      - queries local model via Ollama (bounded concurrency, see config/governance.yaml)
       - scores (exact-match for math, LLM-as-judge for reasoning)
-      - writes JSON/MD artifacts
-      - appends to experiments/index.json
+      - appends benchmark/records to the columnar store, writes JSON/MD reports
+      - appends to the run store (core.memory)
+    Per-stage wall time and per-stage Ollama usage land in report["timing"].
+    Answers are checkpointed as they arrive (experiments/checkpoints/<run_id>.jsonl)
+    until the round is persisted, so a crashed round can be resumed.
     """
+    if resume and not Checkpoint(checkpoint_path(outdir, resume)).exists():
+        # without this the round would start fresh under the old id and overwrite its reports
+        raise ValueError(f"nothing to resume: no checkpoint for {resume} in {outdir}/checkpoints "
+                         "(already finished, or a wrong run_id?)")
+    rnd = await _start_round(
+        n_items, outdir, domain=domain, mode=mode, judge_model=judge_model, seed=seed, model=model, items=items,
+        run_id=resume, run_store=run_store,
+    )
+    await _judge_round(rnd)
+    # off the event loop: tournaments run rounds on several backends at once
+    report = await asyncio.to_thread(_finish_round, rnd)
+    emit("round_done", run_id=rnd["run_id"], metrics=report["metrics"])
+    return report
+
 
+async def _start_round(
+    n_items: int,
+    outdir: str,
+    *,
+    domain: str,
+    mode: str,
+    judge_model: Optional[str],
+    seed: int,
+    model: Optional[str],
+    items,
+    run_id: Optional[str] = None,
+    run_store: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Candidate half of a round: governance, dataset, generation and label-level
+    scoring. Returns the round state for _judge_round / _finish_round; its
+    "metrics"["accuracy"] is already final (the judge only adds judge_avg).
+    If `run_id` has a checkpoint, the round resumes from it: its saved
+    parameters win and only unanswered (or failed) items are asked again.
+    """
     os.makedirs(outdir, exist_ok=True)
 
+    checkpoint = Checkpoint(checkpoint_path(outdir, run_id)) if run_id else None
+    done: Dict[str, Any] = {}
+    if checkpoint is not None and checkpoint.exists():
+        meta, answered = checkpoint.load()
+        domain, mode, seed, n_items = meta["domain"], meta["mode"], meta["seed"], meta["n_items"]
+        model, judge_model = meta["model"], meta["judge_model"]
+        done = {i: r for i, r in answered.items() if "error" not in r}
+        print(f"Resuming {run_id}: {len(done)} item(s) already answered")
+
     # ---- Governance checks
     rules = load_rules()
+    if items is not None:
+        n_items = len(items)
     enforce_rate_limit(n_items, rules)
 
-    run_id = timestamp()
-    bench_path = f"{outdir}/{run_id}_benchmark.json"
+    model = model or os.environ.get("CANDIDATE_MODEL", CANDIDATE)
+    run_id = run_id or new_run_id(model)
+    checkpoint = Checkpoint(checkpoint_path(outdir, run_id))
+    checkpoint.start({
+        "run_id": run_id, "model": model, "domain": domain, "mode": mode,
+        "seed": seed, "n_items": n_items, "judge_model": judge_model,
+    })
+    emit("round_start", run_id=run_id, model=model, domain=domain, mode=mode, n_items=n_items, resumed=len(done))
+    clock = StageClock()
+    usage: Dict[str, Dict[str, Any]] = {}
 
-    # ---- Build dataset
-    if domain == "math":
-        items = make_simple_math(n_items, seed=seed, mode=mode)
-    elif domain == "reason":
-        items = make_reasoning(n_items, seed=seed)
-    else:
-        raise ValueError(f"Unknown domain: {domain}")
-    save_benchmark(items, bench_path)
+    # ---- Build dataset (persisted with the rest of the round in _finish_round)
+    with clock.stage("dataset"):
+        if items is None:
+            items = build_items(domain, n_items, mode=mode, seed=seed)
 
     # ---- Generate predictions
-    records: List[Dict[str, Any]] = []
-    if domain == "math":
-        for it in items:
-            msgs = [
-                {"role": "system", "content": "Answer with only the final number."},
-                {"role": "user", "content": it.prompt},
-            ]
-            pred = await chat(CANDIDATE, msgs)
-            records.append(
-                {
-                    "id": it.id,
-                    "prompt": it.prompt,
-                    "gold": it.answer,
-                    "pred": pred,
-                    "mode": getattr(it, "meta", {}).get("mode", mode),
-                }
+    cache_before = CACHE.stats()
+    sched = schedule_params(rules, rate_limiter(rules, pinned_backend() or "*"))  # limiter shared with concurrent rounds
+    stream = bool(rules.get("stream_answers", False))
+    adaptive = bool(rules.get("adaptive_sampling", False))
+
+    queue_path = rules.get("work_queue")
+    if not judge_model and domain == "reason":
+        judge_model = model  # default to candidate model as judge
+
+    async def answer(it):
+        rec = await answer_item(domain, model, it, mode=mode, stream=stream)
+        checkpoint.append(rec)
+        item_event(run_id, rec)
+        return rec
+
+    async def run_local(todo):
+        return await gather_bounded(answer, todo, return_exceptions=True, **sched)
+
+    async def run_distributed(todo):
+        unit = {
+            "run_id": run_id, "domain": domain, "mode": mode, "model": model, "stream": stream,
+            "judge_model": judge_model if domain == "reason" else None,
+            "judge_batch_size": int(rules.get("judge_batch_size", 1)),
+        }
+        return await _dispatch(WorkQueue(queue_path), unit, todo, checkpoint, usage, rules)
+
+    async def generate():
+        try:
+            return await _generate(
+                run_distributed if queue_path else run_local, items, done, checkpoint, domain, sched, rules, adaptive,
+                run_id=run_id,
             )
-        metrics = eval_math(records)
+        finally:
+            checkpoint.close()
+
+    if not queue_path:  # workers load the model on their own hosts
+        with clock.stage("preload"), track_usage() as usage["preload"]:
+            await preload(model)
+            await (prompts.MATH if domain == "math" else prompts.REASON).warm(model)
+    if domain == "math":
+        with clock.stage("generate"), track_usage() as usage["generate"]:
+            records: List[Dict[str, Any]] = await generate()
+        scored = [r for r in records if "error" not in r]
+        with clock.stage("score"):
+            metrics = eval_math(scored)
         suggested = _suggest_next_mode(mode, metrics["accuracy"])
     else:  # reasoning
-        for it in items:
-            msgs = [
-                {
-                    "role": "system",
-                    "content": (
-                        "Provide brief reasoning and end with a final decision line "
-                        "exactly as: 'Final: Yes' or 'Final: No'."
-                    ),
-                },
-                {"role": "user", "content": it.prompt},
-            ]
-            pred_text = await chat(CANDIDATE, msgs, temperature=0.2)
-            records.append(
-                {
-                    "id": it.id,
-                    "prompt": it.prompt,
-                    "gold": it.answer,  # Yes/No
-                    "gold_rationale": getattr(it, "meta", {}).get("rationale", ""),
-                    "pred_text": pred_text,
-                }
-            )
-        if not judge_model:
-            judge_model = CANDIDATE  # default to candidate model as judge
-        metrics = await evaluate_reasoning(records, judge_model)
+        with clock.stage("generate"), track_usage() as usage["generate"]:
+            records = await generate()
+        scored = [r for r in records if "error" not in r]
+        with clock.stage("score"):
+            metrics = {"accuracy": label_accuracy(scored), "n": len(scored)}
         suggested = None  # not applicable for reasoning
 
+    k = sum(r["correct"] for r in scored)
+    metrics["failed"] = len(records) - len(scored)
+    sampling = {
+        "adaptive": adaptive,
+        "items_used": len(records),
+        "budget": len(items),
+        "stopped_early": len(records) < len(items),
+        "confidence": float(rules.get("adaptive_confidence", 0.95)),
+    }
+    items = items[: len(records)]  # only what was actually asked is persisted
+
+    rnd = {
+        "ci": list(wilson_interval(k, len(scored), _z(rules))),
+        "sampling": sampling,
+        "run_id": run_id, "model": model, "domain": domain, "mode": mode, "seed": seed,
+        "n_items": n_items, "judge_model": judge_model, "outdir": outdir, "run_store": run_store, "rules": rules,
+        "sched": sched, "clock": clock, "usage": usage, "cache_before": cache_before,
+        "items": items, "records": records, "scored": scored, "metrics": metrics, "suggested": suggested,
+        "checkpoint": checkpoint,
+    }
+    emit("scored", run_id=run_id, accuracy=metrics["accuracy"], n=len(scored), failed=metrics["failed"], ci=rnd["ci"])
+    _mark_done(rnd)
+    return rnd
+
+
+def _mark_done(rnd: Dict[str, Any]):
+    """
+    Snapshot compute time and cache counters, so a deferred _finish_round reports the round itself.
+    Judging may happen long after the candidate stages (overlap/deferred), so only the
+    judge stages' own time is added to the candidate half's wall time.
+    """
+    clock = rnd["clock"]
+    candidate_s = rnd.setdefault("candidate_s", clock.total())
+    rnd["elapsed_s"] = candidate_s + clock.stages.get("judge_preload", 0.0) + clock.stages.get("judge", 0.0)
+    rnd["cache_after"] = CACHE.stats()
+
+
+async def _judge_round(rnd: Dict[str, Any]):
+    """LLM-as-judge grading for a reasoning round (no-op for math)."""
+    if rnd["domain"] != "reason":
+        return
+    clock, usage, sched, judge_model = rnd["clock"], rnd["usage"], rnd["sched"], rnd["judge_model"]
+    scored = rnd["scored"]
+    if scored and all("judge" in r for r in scored):  # graded by distributed workers
+        rnd["metrics"] = {
+            "accuracy": label_accuracy(scored),
+            "judge_avg": sum(r["judge"] for r in scored) / len(scored),
+            "n": len(scored),
+            "failed": len(rnd["records"]) - len(scored),
+        }
+        _mark_done(rnd)
+        return
+    batch_size = int(rnd["rules"].get("judge_batch_size", 1))
+    with clock.stage("judge_preload"), track_usage() as usage["judge_preload"]:
+        if judge_model != rnd["model"]:
+            await preload(judge_model)
+        await (prompts.JUDGE_BATCH if batch_size > 1 else prompts.JUDGE).warm(judge_model)
+    with clock.stage("judge"), track_usage() as usage["judge"]:
+        rnd["metrics"] = await evaluate_reasoning(
+            rnd["scored"],
+            judge_model,
+            concurrency=sched["limit"],
+            batch_size=batch_size,
+            limiter=sched["limiter"],
+        )
+        rnd["metrics"]["failed"] = len(rnd["records"]) - len(rnd["scored"])
+    emit("judged", run_id=rnd["run_id"], judge_avg=rnd["metrics"].get("judge_avg"))
+    _mark_done(rnd)
+
+
+def _finish_round(rnd: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Persist benchmark, records, reports and the run-store entry; returns the report.
+    Only does disk I/O, so pipelined experiments run it on a background writer thread.
+    """
+    run_id, model, domain, mode = rnd["run_id"], rnd["model"], rnd["domain"], rnd["mode"]
+    outdir, clock, usage, records = rnd["outdir"], rnd["clock"], rnd["usage"], rnd["records"]
+    metrics, suggested = {**rnd["metrics"], "ci": rnd["ci"]}, rnd["suggested"]
+
+    cache_after = rnd["cache_after"]
+    cache_hits = cache_after["hits"] - rnd["cache_before"]["hits"]
+    cache_misses = cache_after["misses"] - rnd["cache_before"]["misses"]
+
     # ---- Persist artifacts
+    bench_path = f"{outdir}/{run_id}_benchmark.json"
     records_path = f"{outdir}/{run_id}_records.json"
     report_path = f"{outdir}/{run_id}_report.json"
     md_path = f"{outdir}/{run_id}_report.md"
 
-    report: Dict[str, Any] = {
-        "run_id": run_id,
-        "model": CANDIDATE,
-        "domain": domain,
-        "mode": (mode if domain == "math" else None),
-        "metrics": metrics,
-        "sample": records[:3],
-        "params": {
-            "n_items": n_items,
-            "seed": seed,
-            "judge_model": judge_model if domain == "reason" else None,
-        },
-    }
+    # JSON/Markdown artifacts are encoded and written on a background thread while the
+    # store is appended; commit() makes them durable and visible together at the end.
+    with ArtifactWriter() as out:
+        store_root = f"{outdir}/store"
+        legacy_json = bool(rnd["rules"].get("legacy_json", False))
+        with clock.stage("persist"):
+            # has_rows: a resumed round may have been persisted up to a crash
+            if not has_rows(run_id, "benchmark", root=store_root):
+                append_rows(run_id, "benchmark", [it.__dict__ for it in rnd["items"]], root=store_root)
+            if not has_rows(run_id, "records", root=store_root):
+                append_rows(run_id, "records", records, root=store_root)
+            if legacy_json:
+                save_benchmark(rnd["items"], bench_path, out=out)
+                out.write_json(records_path, records)
 
-    write_json(records_path, records)
-    write_json(report_path, report)
+        latencies = [r["gen"]["latency_s"] for r in records if r["gen"].get("latency_s") is not None]
+        total_s = rnd["elapsed_s"] + clock.stages["persist"]
+        timing: Dict[str, Any] = {
+            "total_s": total_s,
+            "stages_s": clock.stages,
+            "items_per_s": len(records) / total_s if total_s > 0 else None,
+            "latency_ms": {
+                "p50": percentile(latencies, 50) * 1000 if latencies else None,
+                "p95": percentile(latencies, 95) * 1000 if latencies else None,
+            },
+            # time Ollama spent (re)loading models during this round
+            "swaps": {
+                "reloads": sum(u["reloads"] for u in usage.values()),
+                "load_ms": sum(u["load_ms"] for u in usage.values()),
+            },
+            "usage": usage,
+        }
 
-    md = (
-        f"# AutoEval Lab Report ({run_id})\n\n"
-        f"**Model:** {CANDIDATE}\n\n"
-        f"**Domain:** {domain}\n"
-        f"{f'**Mode:** {mode}\\n' if domain == 'math' else ''}"
-        f"**Metrics:** {metrics}\n\n"
-        f"{summarize_metrics(metrics)}\n"
-    )
-    if suggested:
-        md += f"**Next suggested mode:** {suggested}\n"
-    with open(md_path, "w") as f:
-        f.write(md)
+        report: Dict[str, Any] = {
+            "run_id": run_id,
+            "model": model,
+            "domain": domain,
+            "mode": (mode if domain == "math" else None),
+            "metrics": metrics,
+            "sample": records[:3],
+            "params": {
+                "n_items": rnd["n_items"],
+                "seed": rnd["seed"],
+                "judge_model": rnd["judge_model"] if domain == "reason" else None,
+            },
+            "cache": {"hits": cache_hits, "misses": cache_misses},
+            "sampling": rnd["sampling"],
+            "timing": timing,
+        }
+
+        out.write_json(report_path, report)
+
+        mode_line = f"**Mode:** {mode}\n" if domain == "math" else ""
+        md = (
+            f"# AutoEval Lab Report ({run_id})\n\n"
+            f"**Model:** {model}\n\n"
+            f"**Domain:** {domain}\n"
+            f"{mode_line}"
+            f"**Metrics:** {metrics}\n\n"
+            f"{summarize_metrics(metrics)}\n"
+            f"**{rnd['sampling']['confidence']:.0%} CI:** [{rnd['ci'][0]:.2%}, {rnd['ci'][1]:.2%}]"
+            + (f" (adaptive: {len(records)}/{rnd['sampling']['budget']} items)" if rnd["sampling"]["adaptive"] else "")
+            + "\n\n"
+            f"**Timing:** {total_s:.2f}s total | "
+            + " | ".join(f"{k} {v:.2f}s" for k, v in clock.stages.items())
+            + f" | model loads {timing['swaps']['reloads']} ({timing['swaps']['load_ms'] / 1000:.2f}s)"
+            + "\n\n"
+        )
+        if suggested:
+            md += f"**Next suggested mode:** {suggested}\n"
+        out.write_text(md_path, md)
 
     # ---- Update experiment memory (for plots)
     try:
-        add_run_entry(run_id, CANDIDATE, (mode if domain == "math" else domain), metrics["accuracy"])
-        print("Trend:", get_trend_summary())
+        add_run_entry(
+            run_id, model, (mode if domain == "math" else domain), metrics["accuracy"],
+            total_s=total_s,
+            items_per_s=timing["items_per_s"],
+            p50_latency_ms=timing["latency_ms"]["p50"],
+            eval_tokens=sum(u["eval_tokens"] for u in usage.values()),
+            load_ms=timing["swaps"]["load_ms"],
+            path=rnd["run_store"],
+        )
+        print("Trend:", get_trend_summary(rnd["run_store"]))
     except Exception as e:
-        print(f"[warn] failed to update experiments/index.json: {e}")
+        print(f"[warn] failed to update the run store: {e}")
+    rnd["checkpoint"].remove()  # round is complete; nothing left to resume
 
     # Attach convenience fields to return value
     report["suggested_next_mode"] = suggested
     return report
 
 
+@pooled
 async def run_experiment(
     rounds: int = 5,
     *,
@@ -176,62 +547,284 @@ async def run_experiment(
     domain: str = "math",          # "math" | "reason"
     judge_model: Optional[str] = None,
     seed: int = 0,
+    model: Optional[str] = None,
+    resume: Optional[str] = None,  # exp_id of an interrupted experiment
+    run_store: Optional[str] = None,  # run store file (core.memory); default $AUTOEVAL_RUN_STORE
 ) -> Dict[str, Any]:
     """
     Multi-round autonomous loop with early stopping if accuracy gains plateau.
+    Rounds are pipelined: the next round's dataset (for each mode it may move
+    to) is built during inference, and persistence runs on a writer thread.
+
+    Reasoning rounds are scheduled by model affinity: the plateau decision
+    only needs label accuracy, so judging is taken off the critical path.
+    With `judge_coresident: true` (candidate and judge fit in VRAM together)
+    round r is judged while round r+1 generates; otherwise every round's
+    judging is deferred to one batch at the end, so the judge is loaded once.
+
+    Progress is saved to experiments/checkpoints/exp-<exp_id>.json after every
+    round; `resume=exp_id` picks up where it stopped, finishing rounds that were
+    never persisted and resuming the interrupted one from its item checkpoint.
     """
-    mode = start_mode
-    best_acc = -1.0
-    history: List[Dict[str, Any]] = []
-
-    for r in range(1, rounds + 1):
-        print(f"\n=== ROUND {r}/{rounds} | domain={domain} | mode={mode if domain=='math' else '-'} ===")
-        rep = await run_round(
-            n_items=n_items,
-            outdir=outdir,
-            domain=domain,
-            mode=mode,
-            judge_model=judge_model,
-            seed=seed + r,  # vary the dataset slightly per round
-        )
+    model = model or os.environ.get("CANDIDATE_MODEL", CANDIDATE)
+    exp_id = resume or new_run_id("exp")
+    state_path = experiment_state_path(outdir, exp_id)
+    params = {
+        "rounds": rounds, "start_mode": start_mode, "n_items": n_items, "plateau_delta": plateau_delta,
+        "domain": domain, "judge_model": judge_model, "seed": seed, "model": model,
+    }
+    state = {"params": params, "mode": start_mode, "best_acc": -1.0, "history": [], "next_round": 1, "current": None}
+    if resume:
+        if not os.path.exists(state_path):
+            raise ValueError(f"nothing to resume: no experiment state for {resume} in {outdir}/checkpoints "
+                             "(already finished, or a wrong exp_id?)")
+        state = read_state(state_path)
+        params = state["params"]
+        rounds, start_mode, n_items = params["rounds"], params["start_mode"], params["n_items"]
+        plateau_delta, domain, judge_model = params["plateau_delta"], params["domain"], params["judge_model"]
+        seed, model = params["seed"], params["model"]
+        print(f"Resuming experiment {exp_id} at round {state['next_round']}")
 
-        acc = rep["metrics"]["accuracy"]
-        history.append(
-            {
-                "round": r,
-                "run_id": rep.get("run_id", ""),
-                "domain": domain,
-                "mode": (mode if domain == "math" else None),
-                "accuracy": acc,
-            }
-        )
+    mode = state["mode"]
+    best_acc = state["best_acc"]
+    history: List[Dict[str, Any]] = state["history"]
+    reports: Dict[str, Dict[str, Any]] = {}
 
-        # Decide next difficulty (math only)
-        if domain == "math":
-            mode = rep.get("suggested_next_mode", mode)
+    def _save_state(**kw):
+        state.update(kw, mode=mode, best_acc=best_acc, history=history)
+        write_state(state_path, state)
 
-        # Early stopping on plateau
-        improvement = max(0.0, acc - (best_acc if best_acc >= 0 else 0.0))
-        if acc > best_acc:
-            best_acc = acc
+    rules = load_rules()
+    adaptive = bool(rules.get("adaptive_sampling", False))
+    coresident = bool(rules.get("judge_coresident", True))
+    overlap = domain == "reason" and coresident
+    deferred = domain == "reason" and not coresident
+    judging: List[asyncio.Task] = []
+    waiting: List[Dict[str, Any]] = []
+
+    # Pipelining: datasets for every possible next mode are built while the
+    # current round infers, and artifacts/index updates go to a single
+    # background writer thread (in order), so the model never waits on disk.
+    loop = asyncio.get_running_loop()
+    writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="autoeval-writer")
+    writes: List[tuple] = []  # (run_id, future of _finish_round)
+
+    def _persisted(fut):
+        if not fut.cancelled() and fut.exception() is None:
+            emit("round_done", run_id=fut.result()["run_id"], metrics=fut.result()["metrics"])
+
+    def _persist(rnd):
+        fut = loop.run_in_executor(writer, _finish_round, rnd)
+        fut.add_done_callback(_persisted)
+        writes.append((rnd["run_id"], fut))
 
-        print(f"Round {r} accuracy: {acc:.2%} | best: {best_acc:.2%} | improvement: {improvement:.2%}")
-        if r > 1 and improvement < plateau_delta:
-            print(f"Early stop: improvement < {plateau_delta:.2%}")
-            break
+    async def _judge_and_persist(rnd):
+        await _judge_round(rnd)
+        _persist(rnd)
+
+    def _schedule(rnd):
+        if overlap:
+            judging.append(asyncio.create_task(_judge_and_persist(rnd)))
+        elif deferred:
+            waiting.append(rnd)
+        else:
+            _persist(rnd)
+
+    prefetched: Dict[Any, Any] = {}
+    try:
+        # Rounds decided before a crash: finish the ones that were never
+        # persisted (their item checkpoint is still there), reuse the rest.
+        for h in history:
+            if Checkpoint(checkpoint_path(outdir, h["run_id"])).exists():
+                rnd = await _start_round(
+                    n_items, outdir, domain=domain, mode=h["mode"] or mode, judge_model=judge_model,
+                    seed=seed + h["round"], model=model, items=None, run_id=h["run_id"], run_store=run_store,
+                )
+                if not (overlap or deferred):
+                    await _judge_round(rnd)
+                _schedule(rnd)
+            else:
+                with open(f"{outdir}/{h['run_id']}_report.json") as f:
+                    reports[h["run_id"]] = json.load(f)
+
+        for r in range(state["next_round"] or rounds + 1, rounds + 1):
+            print(f"\n=== ROUND {r}/{rounds} | domain={domain} | mode={mode if domain=='math' else '-'} ===")
+            items = prefetched.get(mode if domain == "math" else None)
+            prefetch = asyncio.ensure_future(asyncio.to_thread(
+                _prefetch_items, domain, n_items, _next_mode_candidates(mode), seed + r + 1
+            )) if r < rounds else None
+            run_id = state["current"] or new_run_id(model)
+            _save_state(next_round=r, current=run_id)
+            rnd = await _start_round(
+                n_items,
+                outdir,
+                domain=domain,
+                mode=mode,
+                judge_model=judge_model,
+                seed=seed + r,  # vary the dataset slightly per round
+                model=model,
+                items=items,
+                run_id=run_id,
+                run_store=run_store,
+            )
+            if not (overlap or deferred):
+                await _judge_round(rnd)
+            _schedule(rnd)
+
+            acc = rnd["metrics"]["accuracy"]
+            history.append(
+                {
+                    "round": r,
+                    "run_id": rnd["run_id"],
+                    "domain": domain,
+                    "mode": (mode if domain == "math" else None),
+                    "accuracy": acc,
+                    "ci": rnd["ci"],
+                    "items_used": rnd["sampling"]["items_used"],
+                    "failed": rnd["metrics"]["failed"],
+                }
+            )
+
+            # Decide next difficulty (math only)
+            if domain == "math":
+                mode = rnd["suggested"] or mode
+
+            # Early stopping on plateau. With adaptive sampling the check uses
+            # the interval: stop only once even its upper bound gains < plateau_delta.
+            prev_best = best_acc if best_acc >= 0 else 0.0
+            improvement = max(0.0, acc - prev_best)
+            if adaptive:
+                improvement = max(0.0, rnd["ci"][1] - prev_best)
+            if acc > best_acc:
+                best_acc = acc
+
+            print(f"Round {r} accuracy: {acc:.2%} (CI {rnd['ci'][0]:.2%}-{rnd['ci'][1]:.2%}) | best: {best_acc:.2%} | improvement: {improvement:.2%}")
+            if r > 1 and improvement < plateau_delta:
+                print(f"Early stop: improvement < {plateau_delta:.2%}")
+                _save_state(next_round=None, current=None)
+                if prefetch is not None:
+                    prefetch.cancel()
+                break
+            _save_state(next_round=(r + 1 if r < rounds else None), current=None)
+            prefetched = await prefetch if prefetch is not None else {}
+
+        if judging:
+            await asyncio.gather(*judging)
+        for rnd in waiting:
+            await _judge_and_persist(rnd)
+        for (run_id, _), rep in zip(writes, await asyncio.gather(*(f for _, f in writes))):
+            reports[run_id] = rep
+    finally:
+        writer.shutdown(wait=True)
+
+    for h in history:
+        rep = reports[h["run_id"]]
+        if "judge_avg" in rep["metrics"]:
+            h["judge_avg"] = rep["metrics"]["judge_avg"]
 
     # Write experiment summary
     summary = {
+        "exp_id": exp_id,
         "rounds_requested": rounds,
         "rounds_run": len(history),
         "domain": domain,
         "start_mode": (start_mode if domain == "math" else None),
         "final_mode": (history[-1]["mode"] if domain == "math" else None),
         "best_accuracy": best_acc,
+        "judge_schedule": ("overlap" if overlap else "defer" if deferred else None),
+        "swaps": {
+            "reloads": sum(rep["timing"]["swaps"]["reloads"] for rep in reports.values()),
+            "load_ms": sum(rep["timing"]["swaps"]["load_ms"] for rep in reports.values()),
+        },
         "history": history,
     }
-    exp_id = timestamp()
     write_json(f"{outdir}/{exp_id}_experiment_summary.json", summary)
+    os.remove(state_path)
     print("\n=== EXPERIMENT SUMMARY ===")
     print(summary)
-    return summary
\ No newline at end of file
+    return summary
+
+
+@pooled
+async def run_tournament(
+    models: List[str],
+    *,
+    domain: str = "math",          # "math" | "reason"
+    mode: str = "single",          # fixed difficulty (math only), same for every model
+    n_items: int = 12,
+    rounds: int = 1,
+    outdir: str = "experiments",
+    judge_model: Optional[str] = None,
+    seed: int = 0,
+    run_store: Optional[str] = None,  # run store file (core.memory); default $AUTOEVAL_RUN_STORE
+) -> Dict[str, Any]:
+    """
+    Evaluate several candidate models on identical datasets (built once per round).
+    Models are assigned round-robin to the OLLAMA_BASE_URL backends; each backend
+    works through its models one at a time so only one is resident in VRAM,
+    while different backends run concurrently.
+    """
+    datasets = [build_items(domain, n_items, mode=mode, seed=seed + r) for r in range(1, rounds + 1)]
+    queues: Dict[str, List[str]] = {b: [] for b in BASES}
+    for i, m in enumerate(models):
+        queues[BASES[i % len(BASES)]].append(m)
+    reports: Dict[str, List[Dict[str, Any]]] = {m: [] for m in models}
+
+    async def _drain(base: str, queue: List[str]):
+        with pin_backend(base):
+            for m in queue:
+                for r, items in enumerate(datasets, 1):
+                    print(f"\n=== TOURNAMENT | {m} @ {base} | round {r}/{rounds} ===")
+                    reports[m].append(await run_round(
+                        outdir=outdir,
+                        domain=domain,
+                        mode=mode,
+                        judge_model=judge_model,
+                        seed=seed + r,
+                        model=m,
+                        items=items,
+                        run_store=run_store,
+                    ))
+
+    await asyncio.gather(*(_drain(b, q) for b, q in queues.items() if q))
+
+    standings = []
+    for m, reps in reports.items():
+        accs = [rep["metrics"]["accuracy"] for rep in reps]
+        judges = [rep["metrics"]["judge_avg"] for rep in reps if "judge_avg" in rep["metrics"]]
+        speeds = [rep["timing"]["items_per_s"] for rep in reps if rep["timing"]["items_per_s"]]
+        standings.append({
+            "model": m,
+            "accuracy": sum(accs) / len(accs),
+            "judge_avg": (sum(judges) / len(judges)) if judges else None,
+            "items_per_s": (sum(speeds) / len(speeds)) if speeds else None,
+            "run_ids": [rep["run_id"] for rep in reps],
+        })
+    standings.sort(key=lambda s: (s["accuracy"], s["judge_avg"] or 0.0), reverse=True)
+
+    tid = new_run_id("tournament")
+    summary = {
+        "tournament_id": tid,
+        "domain": domain,
+        "mode": (mode if domain == "math" else None),
+        "n_items": n_items,
+        "rounds": rounds,
+        "judge_model": judge_model if domain == "reason" else None,
+        "backends": {b: q for b, q in queues.items() if q},
+        "standings": standings,
+    }
+    write_json(f"{outdir}/{tid}_tournament.json", summary)
+
+    md = f"# AutoEval Lab Tournament ({tid})\n\n**Domain:** {domain}\n"
+    md += f"**Mode:** {mode}\n" if domain == "math" else ""
+    md += f"**Items:** {n_items} x {rounds} round(s), identical for every model\n\n"
+    md += "| # | Model | Accuracy | Judge avg | Items/s |\n|---|-------|----------|-----------|---------|\n"
+    for i, s in enumerate(standings, 1):
+        judge = f"{s['judge_avg']:.2f}" if s["judge_avg"] is not None else "-"
+        speed = f"{s['items_per_s']:.2f}" if s["items_per_s"] is not None else "-"
+        md += f"| {i} | {s['model']} | {s['accuracy']:.2%} | {judge} | {speed} |\n"
+    write_text(f"{outdir}/{tid}_tournament.md", md)
+
+    print("\n=== TOURNAMENT STANDINGS ===")
+    print(md)
+    return summary
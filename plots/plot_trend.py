@@ -1,30 +1,83 @@
-import matplotlib.pyplot as plt
-from core.memory import load_index
+"""
+Accuracy trend plots from the run store (headless).
 
+    python -m plots.plot_trend                  # only re-render what changed
+    python -m plots.plot_trend --full --window 50 --alpha 0.05
 
-def plot_accuracy_trend():
-    runs = load_index()
-    if not runs:
+Writes experiments/accuracy_trend.png (rolling mean of every model/mode
+group on one chart) and experiments/plots/trend_<model>_<mode>.png (raw
+accuracy, rolling mean and EWMA). Series are cached in
+experiments/plots/trend_cache.npz, so a rerun only processes new runs and
+only redraws groups that received them.
+"""
+import argparse, os, re
+from core.trends import TrendCache
+
+
+def _slug(s: str) -> str:
+    return re.sub(r"[^A-Za-z0-9.]+", "-", s).strip("-") or "none"
+
+
+def plot_accuracy_trend(outdir: str = "experiments", window: int = 20, alpha: float = 0.1, full: bool = False):
+    plots_dir = f"{outdir}/plots"
+    overview_path = f"{outdir}/accuracy_trend.png"
+    cache = TrendCache(f"{plots_dir}/trend_cache.npz", window, alpha)
+    changed = cache.update(rebuild=full)
+    if not cache.groups:
         print("No data to plot.")
         return
-    xs = list(range(1, len(runs) + 1))
-    ys = [r["accuracy"] for r in runs]
-    plt.plot(xs, ys, marker="o")
-    plt.title("AutoEval Accuracy Trend")
-    plt.xlabel("Run #")
-    plt.ylabel("Accuracy")
-    plt.grid(True)
-    out_path = "experiments/accuracy_trend.png"
-    plt.savefig(out_path)
-    print(f"Saved plot to {out_path} ({len(runs)} runs).")
-    # Show only if an interactive backend is available
-    try:
-        plt.show()
-    except Exception:
-        pass
-    finally:
-        plt.close()
+    if not changed and os.path.exists(overview_path):
+        print(f"Plots up to date ({sum(len(g['seq']) for g in cache.groups.values())} runs).")
+        return
+    os.makedirs(plots_dir, exist_ok=True)
+    import matplotlib  # only once there is something to draw (the up-to-date check above stays fast)
+    matplotlib.use("Agg")  # batch rendering; never opens a window
+    import matplotlib.pyplot as plt
+
+    # One figure, reused for every changed group.
+    fig, ax = plt.subplots(figsize=(8, 4))
+    for key in sorted(changed):
+        g = cache.groups[key]
+        x = range(1, len(g["seq"]) + 1)
+        ax.clear()
+        ax.scatter(x, g["accuracy"], s=6, alpha=0.3, label="run", rasterized=True)
+        ax.plot(x, g["rolling"], label=f"rolling mean ({window})")
+        ax.plot(x, g["ewma"], linestyle="--", label=f"EWMA (alpha={alpha})")
+        ax.set_title(f"{key[0] or '?'} / {key[1] or '?'}")
+        ax.set_xlabel("Run #")
+        ax.set_ylabel("Accuracy")
+        ax.set_ylim(-0.02, 1.02)
+        ax.grid(True)
+        ax.legend(loc="lower right", fontsize=8)
+        fig.savefig(f"{plots_dir}/trend_{_slug(key[0])}_{_slug(key[1])}.png")
+    plt.close(fig)
+
+    fig, ax = plt.subplots(figsize=(10, 5))
+    for key, g in sorted(cache.groups.items()):
+        ax.plot(g["seq"], g["rolling"], label=f"{key[0] or '?'} / {key[1] or '?'}")
+    ax.set_title(f"AutoEval Accuracy Trend (rolling mean, {window} runs)")
+    ax.set_xlabel("Run # (store order)")
+    ax.set_ylabel("Accuracy")
+    ax.set_ylim(-0.02, 1.02)
+    ax.grid(True)
+    ax.legend(fontsize=7, ncol=2)
+    fig.savefig(overview_path)
+    plt.close(fig)
+
+    cache.save()
+    n = sum(len(g["seq"]) for g in cache.groups.values())
+    print(f"Saved plot to {overview_path} ({n} runs, {len(changed)} of {len(cache.groups)} groups redrawn).")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Render accuracy trend plots from the run store")
+    p.add_argument("--outdir", default="experiments")
+    p.add_argument("--window", type=int, default=20, help="rolling-mean window (runs)")
+    p.add_argument("--alpha", type=float, default=0.1, help="EWMA smoothing factor")
+    p.add_argument("--full", action="store_true", help="recompute every series instead of only new runs")
+    a = p.parse_args()
+    plot_accuracy_trend(a.outdir, a.window, a.alpha, a.full)
 
 
 if __name__ == "__main__":
-    plot_accuracy_trend()
\ No newline at end of file
+    main()
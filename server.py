@@ -0,0 +1,453 @@
+# server.py
+"""
+Eval job service: one long-running process that several teams share, so they
+reuse its warm Ollama connections, loaded prompt prefixes and response cache.
+Jobs (eval / experiment / tournament, the same arguments as run_round /
+run_experiment / run_tournament) are queued by priority and started while
+the models they use are under their concurrency limit.
+
+    python app.py server --port 8765            (or: python server.py --port 8765)
+
+It is a plain ASGI app, served by uvicorn when installed (pip install uvicorn)
+and by a small built-in HTTP/1.1 server otherwise. API (JSON):
+
+    POST   /jobs                {"cmd": "eval", "kwargs": {"n_items": 12, "model": "..."}, "priority": 0}
+    GET    /jobs                all jobs, newest first (?status=queued|running|done|failed|cancelled)
+    GET    /jobs/{id}           one job, with its result once done
+    GET    /jobs/{id}/events    NDJSON progress stream: queued, started, round_start, item, scored,
+                                judged, round_done, then done | failed | cancelled (replayed from the start)
+    DELETE /jobs/{id}           cancel (a cancelled round keeps its checkpoint and can be resumed)
+    GET    /runs                run store entries (?model=&mode=&limit=)
+    GET    /runs/{run_id}       report plus re-scored metrics
+    GET    /runs/{run_id}/records?start=0&stop=100
+    GET    /aggregates          per-(model, mode) aggregates
+    GET    /health              queue sizes and response-cache counters
+
+Limits come from config/governance.yaml: server_max_jobs (jobs running at
+once), server_model_concurrency (jobs per model) and server_model_limits
+(per-model overrides).
+
+Every job writes under the server's --outdir (jobs can't choose their own),
+and the run store behind /runs and /aggregates is $AUTOEVAL_RUN_STORE, else
+<outdir>/runs.sqlite, the same store the jobs' rounds are recorded in.
+"""
+from __future__ import annotations
+
+import asyncio
+import inspect
+import json
+import os
+import re
+import time
+from contextlib import AsyncExitStack
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs
+
+from core import events
+from core.checkpoint import Checkpoint, checkpoint_path, experiment_state_path, read_state
+from core.governance import load_rules
+from core.io import dumps, new_run_id
+from core.memory import load_index, get_aggregates, get_metric_results
+from core.records import read_rows
+from daemon import job_function
+from models.ollama_client import CACHE, lifespan
+from orchestrator import CANDIDATE
+
+KEEP_FINISHED = 1000  # finished jobs (with their events) kept for GET /jobs
+FINAL = ("done", "failed", "cancelled")
+
+
+class Job:
+    def __init__(self, seq: int, cmd: str, kwargs: Dict[str, Any], priority: int, models: List[str]):
+        self.id = new_run_id("job")
+        self.seq = seq
+        self.cmd, self.kwargs, self.priority, self.models = cmd, kwargs, priority, models
+        self.status = "queued"
+        self.created, self.started, self.finished = time.time(), None, None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.events: List[Dict[str, Any]] = []
+        self.task: Optional[asyncio.Task] = None
+        self._new = asyncio.Event()
+
+    def add(self, event: Dict[str, Any]):
+        self.events.append(event)
+        self._new.set()
+        self._new = asyncio.Event()
+
+    def note(self, kind: str, **data):
+        self.add({"event": kind, "t": time.time(), "job": self.id, **data})
+
+    async def stream(self):
+        """Every event so far, then new ones as they arrive, until the job finishes."""
+        i = 0
+        while True:
+            new = self._new
+            while i < len(self.events):
+                yield self.events[i]
+                i += 1
+            if self.status in FINAL:
+                return
+            await new.wait()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id, "cmd": self.cmd, "kwargs": self.kwargs, "priority": self.priority,
+            "models": self.models, "status": self.status, "error": self.error,
+            "created": self.created, "started": self.started, "finished": self.finished,
+            "run_ids": [e["run_id"] for e in self.events if e["event"] == "round_start"],
+            "events": len(self.events),
+        }
+
+
+class JobService:
+    """Priority queue of jobs with a global and a per-model limit on running jobs."""
+    def __init__(self, max_jobs: int = 4, model_concurrency: int = 1, model_limits: Optional[Dict[str, int]] = None,
+                 outdir: str = "experiments", run_store: Optional[str] = None):
+        self.outdir = outdir
+        # default: next to the reports /runs links to
+        self.run_store = run_store or os.environ.get("AUTOEVAL_RUN_STORE") or f"{outdir}/runs.sqlite"
+        self.max_jobs = max_jobs
+        self.model_concurrency = model_concurrency
+        self.model_limits = dict(model_limits or {})
+        self.jobs: Dict[str, Job] = {}
+        self._queued: List[Job] = []
+        self._busy: Dict[str, int] = {}
+        self._running = 0
+        self._seq = 0
+        self._wake = asyncio.Event()
+        self._stack: Optional[AsyncExitStack] = None
+
+    @classmethod
+    def from_rules(cls, rules: Dict[str, Any], outdir: str = "experiments",
+                   run_store: Optional[str] = None) -> "JobService":
+        return cls(
+            max_jobs=int(rules.get("server_max_jobs", 4)),
+            model_concurrency=int(rules.get("server_model_concurrency", 1)),
+            model_limits=rules.get("server_model_limits") or {},
+            outdir=outdir,
+            run_store=run_store,
+        )
+
+    async def start(self):
+        """Open the shared Ollama client pool and start dispatching."""
+        self._stack = AsyncExitStack()
+        await self._stack.enter_async_context(lifespan())
+        dispatcher = asyncio.create_task(self._dispatch())
+        self._stack.push_async_callback(self._cancel, dispatcher)
+
+    async def stop(self):
+        """Cancel running jobs (their rounds stay resumable) and close the client pool."""
+        tasks = [j.task for j in self.jobs.values() if j.task is not None and not j.task.done()]
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._stack.aclose()
+
+    @staticmethod
+    async def _cancel(task: asyncio.Task):
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    def submit(self, cmd: str, kwargs: Dict[str, Any], priority: int = 0) -> Job:
+        """Queue a job; raises ValueError/TypeError for an unknown job or bad arguments."""
+        fn = job_function(cmd)
+        for k in ("outdir", "run_store"):
+            if k in kwargs:
+                raise ValueError(f"{k} is set by the server, not per job")
+        kwargs = {**kwargs, "outdir": self.outdir, "run_store": self.run_store}
+        inspect.signature(fn).bind(**kwargs)  # reject bad arguments now, not when the job starts
+        models = self._models(cmd, kwargs)
+        self._seq += 1
+        job = Job(self._seq, cmd, kwargs, int(priority), models)
+        self.jobs[job.id] = job
+        self._queued.append(job)
+        job.note("queued", position=len(self._queued))
+        self._prune()
+        self._wake.set()
+        return job
+
+    def _models(self, cmd: str, kwargs: Dict[str, Any]) -> List[str]:
+        """
+        The models a job will call, for the per-model limits. A resumed round
+        or experiment runs with its saved parameters, so its models come from
+        the checkpoint / experiment state rather than the request.
+        """
+        if cmd == "tournament":
+            models = list(kwargs.get("models") or [])
+            return list(dict.fromkeys(models + ([kwargs["judge_model"]] if kwargs.get("judge_model") else [])))
+        params = kwargs
+        if kwargs.get("resume"):
+            path = (checkpoint_path if cmd == "eval" else experiment_state_path)(self.outdir, kwargs["resume"])
+            if not os.path.exists(path):
+                raise ValueError(f"nothing to resume: no {'checkpoint' if cmd == 'eval' else 'experiment state'} "
+                                 f"for {kwargs['resume']} in {self.outdir}/checkpoints")
+            params = Checkpoint(path).load()[0] if cmd == "eval" else read_state(path)["params"]
+        models = [params.get("model") or os.environ.get("CANDIDATE_MODEL", CANDIDATE)]
+        if params.get("judge_model"):
+            models.append(params["judge_model"])
+        return list(dict.fromkeys(models))
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        job = self.jobs.get(job_id)
+        if job is None or job.status in FINAL:
+            return job
+        if job.status == "queued":
+            self._queued.remove(job)
+            self._finish(job, "cancelled")
+        else:
+            job.task.cancel()  # _execute records the cancellation
+        return job
+
+    def _limit(self, model: str) -> int:
+        return int(self.model_limits.get(model, self.model_concurrency))
+
+    async def _dispatch(self):
+        while True:
+            self._wake.clear()
+            # highest priority first (FIFO within a priority); a job whose models are
+            # busy waits without holding back jobs for other models
+            for job in sorted(self._queued, key=lambda j: (-j.priority, j.seq)):
+                if self._running >= self.max_jobs:
+                    break
+                if all(self._busy.get(m, 0) < self._limit(m) for m in job.models):
+                    self._queued.remove(job)
+                    self._start(job)
+            await self._wake.wait()
+
+    def _start(self, job: Job):
+        self._running += 1
+        for m in job.models:
+            self._busy[m] = self._busy.get(m, 0) + 1
+        job.status, job.started = "running", time.time()
+        job.note("started")
+        job.task = asyncio.create_task(self._execute(job))
+
+    async def _execute(self, job: Job):
+        loop = asyncio.get_running_loop()
+        try:
+            # call_soon_threadsafe: rounds also emit from their persistence threads
+            with events.listen(lambda ev: loop.call_soon_threadsafe(job.add, {**ev, "job": job.id})):
+                job.result = await job_function(job.cmd)(**job.kwargs)
+            status = "done"
+        except asyncio.CancelledError:
+            status = "cancelled"
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            status = "failed"
+        finally:
+            self._running -= 1
+            for m in job.models:
+                self._busy[m] -= 1
+            self._wake.set()
+        await asyncio.sleep(0)  # let events queued from other threads land before the final one
+        self._finish(job, status)
+
+    def _finish(self, job: Job, status: str):
+        job.status, job.finished = status, time.time()
+        job.note(status, error=job.error)
+
+    def _prune(self):
+        finished = [j for j in self.jobs.values() if j.status in FINAL]
+        for job in finished[: max(0, len(finished) - KEEP_FINISHED)]:
+            del self.jobs[job.id]
+
+    def health(self) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        for job in self.jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {"jobs": counts, "busy_models": {m: n for m, n in self._busy.items() if n}, "cache": CACHE.stats()}
+
+
+# ---- ASGI app
+def create_app(service: JobService):
+    """ASGI application over `service`; reports, records and runs are read from its outdir and run store."""
+    outdir, store = service.outdir, service.run_store
+
+    async def get_runs(q):
+        runs = await asyncio.to_thread(load_index, store)
+        runs = [r for r in runs if all(r.get(k) == q[k] for k in ("model", "mode") if k in q)]
+        return 200, runs[-int(q.get("limit", 100)):][::-1]
+
+    async def get_run(run_id):
+        path = f"{outdir}/{run_id}_report.json"
+        if not os.path.exists(path):
+            return 404, {"error": f"no report for run {run_id}"}
+        with open(path) as f:
+            report = json.load(f)
+        return 200, {**report, "rescored": await asyncio.to_thread(get_metric_results, run_id, None, store)}
+
+    async def get_records(run_id, q):
+        start, stop = int(q.get("start", 0)), int(q.get("stop", 100))
+        return 200, await asyncio.to_thread(read_rows, run_id, "records", start, stop, f"{outdir}/store")
+
+    async def post_job(body):
+        try:
+            req = json.loads(body or b"{}")
+            job = service.submit(req.get("cmd", "eval"), req.get("kwargs") or {}, req.get("priority", 0))
+        except (ValueError, TypeError) as e:
+            return 400, {"error": f"{type(e).__name__}: {e}"}
+        return 202, job.summary()
+
+    def get_job(job_id):
+        job = service.jobs.get(job_id)
+        if job is None:
+            return 404, {"error": f"no job {job_id}"}
+        return 200, {**job.summary(), "result": job.result}
+
+    async def route(method, path, q, body):
+        if path == "/jobs" and method == "POST":
+            return await post_job(body)
+        if path == "/jobs" and method == "GET":
+            jobs = [j.summary() for j in service.jobs.values() if q.get("status", j.status) == j.status]
+            return 200, jobs[::-1]
+        if m := re.fullmatch(r"/jobs/([^/]+)", path):
+            if method == "DELETE":
+                job = service.cancel(m.group(1))
+                return (404, {"error": f"no job {m.group(1)}"}) if job is None else (200, job.summary())
+            return get_job(m.group(1))
+        if path == "/runs":
+            return await get_runs(q)
+        if m := re.fullmatch(r"/runs/([^/]+)/records", path):
+            return await get_records(m.group(1), q)
+        if m := re.fullmatch(r"/runs/([^/]+)", path):
+            return await get_run(m.group(1))
+        if path == "/aggregates":
+            return 200, await asyncio.to_thread(get_aggregates, store)
+        if path == "/health":
+            return 200, service.health()
+        return 404, {"error": f"no route {method} {path}"}
+
+    async def respond(send, status, obj):
+        body = dumps(obj, indent=False)
+        await send({"type": "http.response.start", "status": status,
+                    "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]})
+        await send({"type": "http.response.body", "body": body})
+
+    async def stream_events(send, job):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/x-ndjson")]})
+        try:
+            async for ev in job.stream():
+                await send({"type": "http.response.body", "body": dumps(ev, indent=False) + b"\n", "more_body": True})
+            await send({"type": "http.response.body", "body": b""})
+        except OSError:
+            pass  # client went away
+
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                msg = await receive()
+                if msg["type"] == "lifespan.startup":
+                    await service.start()
+                    await send({"type": "lifespan.startup.complete"})
+                elif msg["type"] == "lifespan.shutdown":
+                    await service.stop()
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+        body, more = b"", True
+        while more:
+            msg = await receive()
+            body += msg.get("body", b"")
+            more = msg.get("more_body", False)
+        method, path = scope["method"], scope["path"].rstrip("/") or "/"
+        q = {k: v[-1] for k, v in parse_qs(scope.get("query_string", b"").decode()).items()}
+        if method == "GET" and (m := re.fullmatch(r"/jobs/([^/]+)/events", path)):
+            job = service.jobs.get(m.group(1))
+            if job is None:
+                return await respond(send, 404, {"error": f"no job {m.group(1)}"})
+            return await stream_events(send, job)
+        try:
+            status, obj = await route(method, path, q, body)
+        except Exception as e:
+            status, obj = 500, {"error": f"{type(e).__name__}: {e}"}
+        await respond(send, status, obj)
+
+    return app
+
+
+# ---- built-in HTTP/1.1 server (when uvicorn isn't installed): one request per connection
+_REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}
+
+
+async def _serve_builtin(app, host: str, port: int):
+    async def handle(reader, writer):
+        try:
+            method, target, _ = (await reader.readline()).decode().split(" ", 2)
+            headers = []
+            while (h := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                k, _, v = h.decode().partition(":")
+                headers.append((k.strip().lower().encode(), v.strip().encode()))
+            body = await reader.readexactly(int(dict(headers).get(b"content-length", b"0")))
+        except (ValueError, ConnectionError, asyncio.IncompleteReadError):
+            writer.close()
+            return
+        path, _, query = target.partition("?")
+        scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+                 "path": path, "raw_path": path.encode(), "query_string": query.encode(), "headers": headers}
+        received = False
+
+        async def receive():
+            nonlocal received
+            if not received:
+                received = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await reader.read()  # EOF: the client hung up
+            return {"type": "http.disconnect"}
+
+        async def send(msg):
+            if msg["type"] == "http.response.start":
+                head = [f"HTTP/1.1 {msg['status']} {_REASONS.get(msg['status'], '')}"]
+                head += [f"{k.decode()}: {v.decode()}" for k, v in msg.get("headers", []) if k != b"content-length"]
+                head += ["Transfer-Encoding: chunked", "Connection: close"]
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode())
+            else:
+                data = msg.get("body", b"")
+                if data:
+                    writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+                if not msg.get("more_body"):
+                    writer.write(b"0\r\n\r\n")
+                await writer.drain()
+
+        try:
+            await app(scope, receive, send)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    async with server:
+        await server.serve_forever()
+
+
+async def serve(host: str = "127.0.0.1", port: int = 8765, outdir: str = "experiments"):
+    service = JobService.from_rules(load_rules(), outdir)
+    app = create_app(service)
+    print(f"[server] eval job service on http://{host}:{port}")
+    try:
+        import uvicorn
+    except ImportError:
+        await service.start()
+        try:
+            await _serve_builtin(app, host, port)
+        finally:
+            await service.stop()
+        return
+    await uvicorn.Server(uvicorn.Config(app, host=host, port=port, lifespan="on", log_level="warning")).serve()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="AutoEval Lab eval job server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--outdir", default="experiments", help="where jobs write reports, checkpoints and the record store (and, "
+                        "unless AUTOEVAL_RUN_STORE is set, the run store)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.outdir))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,38 @@
+import os, sys
+
+# Tests import the repo's top-level modules (core, orchestrator, ...) as the CLI does.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from core.cache import ResponseCache
+from models import ollama_client
+from tools.bench_pipeline import _start_server
+
+
+@pytest.fixture(scope="session")
+def mock_server():
+    """tools/mock_ollama.py on its own thread, for the whole session."""
+    return _start_server(latency="fixed:0.05", token_delay=0.0, seed=0)
+
+
+@pytest.fixture
+def ollama(mock_server, monkeypatch, tmp_path):
+    """Point models.ollama_client at the mock server, with an empty response cache."""
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"))
+    monkeypatch.setattr(ollama_client, "BASES", [mock_server.url])
+    monkeypatch.setattr(ollama_client, "_backends", [])
+    monkeypatch.setattr(ollama_client, "CACHE", cache)
+    monkeypatch.delenv("AUTOEVAL_NO_CACHE", raising=False)
+    yield mock_server
+    cache.close()
+
+
+@pytest.fixture
+def run_store(tmp_path, monkeypatch):
+    """An empty run store (core.memory) under tmp_path."""
+    from core import memory
+
+    monkeypatch.setattr(memory, "STORE_PATH", str(tmp_path / "runs.sqlite"))
+    monkeypatch.setattr(memory, "INDEX_PATH", str(tmp_path / "index.json"))
+    return memory.STORE_PATH
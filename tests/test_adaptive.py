@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+
+import orchestrator
+from agents.dataset_agent import make_simple_math
+from core.checkpoint import Checkpoint
+
+
+@pytest.mark.parametrize("k, n, settled", [
+    (60, 60, True),    # wholly above HARDER_AT
+    (0, 30, True),     # wholly below EASIER_BELOW
+    (8, 10, False),    # straddles a band edge
+    (3, 4, False),     # too few items to tell
+])
+def test_settled_math(k, n, settled):
+    assert orchestrator._settled("math", k, n, {}) is settled
+
+
+def test_settled_reason_uses_ci_width():
+    assert not orchestrator._settled("reason", 5, 10, {"adaptive_ci_width": 0.2})
+    assert orchestrator._settled("reason", 500, 1000, {"adaptive_ci_width": 0.2})
+    assert orchestrator._settled("reason", 5, 10, {"adaptive_ci_width": 0.9})
+
+
+def _answer_wrong(asked):
+    async def run(todo):
+        asked.extend(it.id for it in todo)
+        return [{"id": it.id, "gold": it.answer, "pred": "nope", "gen": {}} for it in todo]
+    return run
+
+
+@pytest.mark.parametrize("adaptive, answered", [(True, 4), (False, 12)])
+def test_generate_stops_once_settled(tmp_path, adaptive, answered):
+    asked = []
+    records = asyncio.run(orchestrator._generate(
+        _answer_wrong(asked), make_simple_math(12), {}, Checkpoint(str(tmp_path / "c.jsonl")), "math",
+        {"limit": 2}, {"adaptive_min_items": 4}, adaptive,
+    ))
+    # all wrong: after 4 items the interval is wholly below EASIER_BELOW
+    assert len(records) == len(asked) == answered
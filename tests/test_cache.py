@@ -0,0 +1,62 @@
+import asyncio
+
+from core.cache import ResponseCache, cache_key
+from models import ollama_client
+from models.ollama_client import chat, lifespan
+
+MSGS = [{"role": "user", "content": "2 + 2 = ?"}]
+
+
+def test_cache_key_ignores_option_order_and_outer_whitespace():
+    a = cache_key("m", [{"role": "user", "content": " hi "}], {"temperature": 0, "top_k": 1})
+    b = cache_key("m", [{"role": "user", "content": "hi"}], {"top_k": 1, "temperature": 0})
+    assert a == b
+    assert a != cache_key("other", [{"role": "user", "content": "hi"}], {"top_k": 1, "temperature": 0})
+
+
+def test_lru_eviction(tmp_path):
+    cache = ResponseCache(str(tmp_path / "c.sqlite"), max_mb=2.5 / 1024)  # 2.5 KiB
+    for k in ("a", "b"):
+        cache.put(k, "x" * 1024)
+    assert cache.get("a") is not None  # a is now more recent than b
+    cache.put("c", "x" * 1024)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["hits"] == 3 and cache.stats()["misses"] == 1
+    cache.close()
+
+
+def test_identical_calls_in_flight_share_one_request(ollama):
+    async def main():
+        async with lifespan():
+            before = ollama.requests
+            replies = await asyncio.gather(*(chat("m", MSGS, temperature=0) for _ in range(5)))
+            again = await chat("m", MSGS, temperature=0)
+            return replies, again, ollama.requests - before
+
+    replies, again, requests = asyncio.run(main())
+    assert len(set(replies)) == 1 and again == replies[0]
+    assert requests == 1
+    assert ollama_client.CACHE.stats()["hits"] == 5  # 4 followers + 1 from disk
+
+
+def test_sampled_calls_are_not_cached(ollama):
+    async def main():
+        async with lifespan():
+            before = ollama.requests
+            await chat("m", MSGS, temperature=0.7)
+            await chat("m", MSGS, temperature=0.7)
+            await chat("m", MSGS, temperature=0.7, cache=True)
+            await chat("m", MSGS, temperature=0.7, cache=True)
+            return ollama.requests - before
+
+    assert asyncio.run(main()) == 3
+
+
+def test_lifespan_closes_the_cache_connection(ollama):
+    async def main():
+        async with lifespan():
+            await chat("m", MSGS, temperature=0)
+            assert ollama_client.CACHE._db is not None
+    asyncio.run(main())
+    assert ollama_client.CACHE._db is None
@@ -0,0 +1,78 @@
+import asyncio, os
+
+import pytest
+
+import orchestrator
+from core.checkpoint import Checkpoint
+
+
+def test_records_are_readable_as_they_arrive_and_fsynced_in_batches(tmp_path, monkeypatch):
+    synced = []
+    fsync = os.fsync
+    monkeypatch.setattr(os, "fsync", lambda fd: (synced.append(fd), fsync(fd)))
+    cp = Checkpoint(str(tmp_path / "r.jsonl"), fsync_every=4, fsync_s=60)
+    cp.start({"run_id": "r"})
+    for i in range(6):
+        cp.append({"id": str(i)})
+    meta, done = cp.load()  # flushed, not yet closed
+    assert meta == {"run_id": "r"} and sorted(done) == [str(i) for i in range(6)]
+    assert len(synced) == 1
+    cp.close()
+    assert len(synced) == 2
+    cp.append({"id": "6"})  # reopens
+    cp.remove()
+    assert not cp.exists()
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    cp = Checkpoint(str(tmp_path / "r.jsonl"))
+    cp.start({"run_id": "r"})
+    cp.append({"id": "1"})
+    cp.close()
+    with open(cp.path, "a") as f:
+        f.write('{"record": {"id": "2", "pr')
+    assert list(cp.load()[1]) == ["1"]
+
+
+def test_resume_round_without_checkpoint_raises(tmp_path):
+    with pytest.raises(ValueError, match="nothing to resume"):
+        asyncio.run(orchestrator.run_round(2, str(tmp_path), resume="20240101-000000-missing"))
+    assert not list(tmp_path.glob("*_report.json"))
+
+
+def test_resume_experiment_without_state_raises(tmp_path):
+    with pytest.raises(ValueError, match="nothing to resume"):
+        asyncio.run(orchestrator.run_experiment(outdir=str(tmp_path), resume="20240101-000000-missing"))
+
+
+@pytest.mark.usefixtures("ollama", "run_store")
+def test_resumed_round_only_asks_unanswered_items(tmp_path, monkeypatch):
+    asked = []
+    answer_item = orchestrator.answer_item
+
+    async def interrupted(domain, model, it, **kw):
+        asked.append(it.id)
+        if len(asked) == 3:
+            await asyncio.sleep(3600)  # hangs until the round is interrupted
+        return await answer_item(domain, model, it, **kw)
+
+    async def interrupt_round():
+        task = asyncio.ensure_future(orchestrator.run_round(5, str(tmp_path)))
+        while len(asked) < 3:  # one at a time: the first two are checkpointed
+            await asyncio.sleep(0.01)
+        task.cancel()  # as Ctrl-C does under asyncio.run
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    monkeypatch.setattr(orchestrator, "answer_item", interrupted)
+    monkeypatch.setattr(orchestrator, "load_rules", lambda: {"max_concurrency": 1, "max_items_per_round": 12})
+    asyncio.run(interrupt_round())
+    (cp,) = (tmp_path / "checkpoints").glob("*.jsonl")
+    run_id = cp.name.removesuffix(".jsonl")
+    assert len(Checkpoint(str(cp)).load()[1]) == 2
+
+    monkeypatch.setattr(orchestrator, "answer_item", answer_item)
+    report = asyncio.run(orchestrator.run_round(5, str(tmp_path), resume=run_id))
+    assert report["run_id"] == run_id and report["metrics"]["n"] == 5
+    assert report["timing"]["usage"]["generate"]["calls"] == 3
+    assert not cp.exists()
@@ -0,0 +1,69 @@
+import asyncio, json, os, socket
+
+import pytest
+
+import app
+import daemon
+
+
+pytestmark = pytest.mark.usefixtures("ollama", "run_store")
+
+
+def _stale_socket(path):
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    s.bind(path)
+    s.close()  # the file stays, nobody listens
+
+
+def _request(path, req):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.connect(path)
+        s.sendall(json.dumps(req).encode() + b"\n")
+        with s.makefile("rb") as f:
+            return json.loads(f.readline())
+
+
+async def _with_daemon(path, client):
+    """Run `client(path)` in a thread against a daemon serving `path`."""
+    task = asyncio.ensure_future(daemon.serve(path))
+    while not task.done() and (not os.path.exists(path) or os.stat(path).st_mode & 0o077):
+        await asyncio.sleep(0.01)  # listening once chmod'ed to 0600
+    try:
+        return await asyncio.to_thread(client, path)
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+def test_daemon_replaces_a_stale_socket_and_runs_jobs(tmp_path):
+    path = str(tmp_path / "d.sock")
+    _stale_socket(path)
+
+    def client(path):
+        report = daemon.submit(path, "eval", {"n_items": 2, "outdir": str(tmp_path)})
+        refused = _request(path, {"cmd": "eval", "kwargs": {}, "cwd": "/elsewhere"})
+        with pytest.raises(SystemExit, match="already running"):
+            asyncio.run(daemon.serve(path))
+        return report, refused
+
+    report, refused = asyncio.run(_with_daemon(path, client))
+    assert report["metrics"]["n"] == 2
+    assert (tmp_path / f"{report['run_id']}_report.json").exists()
+    assert refused["refused"] and "daemon runs in" in refused["error"]
+    assert not os.path.exists(path)  # removed on shutdown
+
+
+def test_refused_jobs_run_in_the_cli(tmp_path, monkeypatch, capsys):
+    path = str(tmp_path / "d.sock")
+    monkeypatch.setenv("AUTOEVAL_DAEMON", path)
+
+    _stale_socket(path)
+    report = app._run("eval", n_items=2, outdir=str(tmp_path))
+    assert report["metrics"]["n"] == 2
+    assert "no daemon listening" in capsys.readouterr().out
+
+    monkeypatch.setattr(daemon, "_mismatch", lambda req: "daemon runs in /elsewhere")
+    os.remove(path)
+    report = asyncio.run(_with_daemon(path, lambda p: app._run("eval", n_items=2, outdir=str(tmp_path))))
+    assert report["metrics"]["n"] == 2
+    assert "can't take this job (daemon runs in /elsewhere" in capsys.readouterr().out
@@ -0,0 +1,33 @@
+import pytest
+
+from agents.dataset_agent import ItemBatch, make_reasoning, make_simple_math
+
+
+@pytest.mark.parametrize("mode", ["single", "multi", "negatives", "carry"])
+def test_math_answers_match_prompts(mode):
+    for it in make_simple_math(50, seed=3, mode=mode):
+        expr = it.prompt.removesuffix(" = ?")
+        assert int(it.answer) == eval(expr)  # digits and +/- only
+        assert it.meta == {"mode": mode}
+
+
+def test_same_seed_same_items():
+    assert [it.prompt for it in make_simple_math(20, seed=1)] == [it.prompt for it in make_simple_math(20, seed=1)]
+    assert [it.prompt for it in make_reasoning(20, seed=1)] != [it.prompt for it in make_reasoning(20, seed=2)]
+
+
+def test_slices_keep_ids():
+    items = make_reasoning(10, seed=0)
+    assert [it.id for it in items[3:6]] == ["reason-3", "reason-4", "reason-5"]
+    assert [it.id for it in items[3:6][1:]] == ["reason-4", "reason-5"]
+    assert items[-1].id == "reason-9"
+    assert items[8:2].columns["template"].size == 0
+    with pytest.raises(ValueError):
+        items[::2]
+    with pytest.raises(IndexError):
+        items[10]
+
+
+def test_item_batch_is_abstract():
+    with pytest.raises(TypeError):
+        ItemBatch({"a": []})
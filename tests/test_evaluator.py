@@ -0,0 +1,51 @@
+import asyncio
+
+from agents import evaluator_agent
+from models import prompts
+
+
+class CountingLimiter:
+    def __init__(self):
+        self.acquired = 0
+
+    async def acquire(self):
+        self.acquired += 1
+
+
+def _records(n):
+    return [{"id": str(i), "gold": "Yes", "gold_rationale": "r", "pred_text": f"because {i}\nFinal: Yes"}
+            for i in range(n)]
+
+
+def _run(monkeypatch, batch_reply, n, batch_size):
+    calls = {"batch": 0, "single": 0}
+
+    async def batch_chat(model, user, **kw):
+        calls["batch"] += 1
+        return batch_reply
+
+    async def single_chat(model, user, **kw):
+        calls["single"] += 1
+        return "4"
+
+    monkeypatch.setattr(prompts.JUDGE_BATCH, "chat", batch_chat)
+    monkeypatch.setattr(prompts.JUDGE, "chat", single_chat)
+    records, limiter = _records(n), CountingLimiter()
+    metrics = asyncio.run(evaluator_agent.evaluate_reasoning(records, "judge", batch_size=batch_size, limiter=limiter))
+    return records, metrics, calls, limiter.acquired
+
+
+def test_packed_replies_grade_each_record(monkeypatch):
+    records, metrics, calls, acquired = _run(monkeypatch, "1: 5\n2: 3", n=4, batch_size=2)
+    assert [r["judge"] for r in records] == [5.0, 3.0, 5.0, 3.0]
+    assert metrics == {"accuracy": 1.0, "judge_avg": 4.0, "n": 4}
+    assert calls == {"batch": 2, "single": 0}
+    assert acquired == 2
+
+
+def test_unparsable_packed_reply_falls_back_one_token_per_item(monkeypatch):
+    records, _, calls, acquired = _run(monkeypatch, "all good!", n=5, batch_size=2)
+    assert [r["judge"] for r in records] == [4.0] * 5
+    # two packed calls fail; their 4 records plus the odd last one are graded individually
+    assert calls == {"batch": 2, "single": 5}
+    assert acquired == 2 + 5
@@ -0,0 +1,55 @@
+import asyncio, json, re, subprocess, sys
+
+import pytest
+
+import orchestrator
+from core.io import ArtifactWriter, new_run_id
+
+
+def test_run_ids_are_unique_and_filename_safe():
+    ids = [new_run_id("qwen2.5:0.5b-instruct") for _ in range(200)]
+    assert len(set(ids)) == len(ids)
+    assert all(re.fullmatch(r"\d{8}-\d{6}-qwen2\.5-0\.5b-instruct-[0-9a-f]{6}(-\d+)?", i) for i in ids)
+
+
+def test_run_ids_differ_across_processes():
+    code = "from core.io import new_run_id; print(new_run_id('m'))"
+    ids = {subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+           for _ in range(3)}
+    assert len(ids) == 3
+
+
+def test_artifact_writer_commits_on_clean_exit(tmp_path):
+    report, md = tmp_path / "r_report.json", tmp_path / "sub" / "r.md"
+    report.write_text("old")
+    with ArtifactWriter() as out:
+        out.write_json(str(report), {"accuracy": 0.5, "note": "é", "nan": float("nan")})
+        out.write_text(str(md), "# r\n")
+        out._pool.submit(lambda: None).result()  # temp files written, not yet committed
+        assert report.read_text() == "old" and not md.exists()
+    assert json.loads(report.read_text()) == {"accuracy": 0.5, "note": "é", "nan": None}
+    assert md.read_text() == "# r\n"
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_artifact_writer_discards_everything_on_error(tmp_path):
+    report, md = tmp_path / "r_report.json", tmp_path / "r.md"
+    report.write_text("old")
+    with pytest.raises(RuntimeError):
+        with ArtifactWriter() as out:
+            out.write_json(str(report), {"accuracy": 1.0})
+            out.write_text(str(md), "new")
+            raise RuntimeError("round failed")
+    assert report.read_text() == "old" and not md.exists()
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+@pytest.mark.usefixtures("ollama", "run_store")
+def test_experiments_started_together_keep_separate_state(tmp_path):
+    async def main():
+        return await asyncio.gather(*(orchestrator.run_experiment(rounds=1, n_items=2, outdir=str(tmp_path))
+                                      for _ in range(2)))
+
+    a, b = asyncio.run(main())
+    assert a["exp_id"] != b["exp_id"]
+    assert len(list(tmp_path.glob("*_experiment_summary.json"))) == 2
@@ -0,0 +1,55 @@
+import sqlite3
+
+import pytest
+
+from core import memory
+
+
+pytestmark = pytest.mark.usefixtures("run_store")
+
+
+def test_append_and_aggregates():
+    memory.add_run_entry("r1", "m", "single", 1.0, total_s=2.5)
+    memory.add_run_entry("r2", "m", "single", 0.5)
+    memory.add_run_entry("r3", "m", "multi", 0.0)
+    runs = memory.load_index()
+    assert [r["run_id"] for r in runs] == ["r1", "r2", "r3"]
+    assert runs[0]["total_s"] == 2.5
+    assert memory.get_aggregates() == [
+        {"model": "m", "mode": "multi", "n": 1, "mean_accuracy": 0.0},
+        {"model": "m", "mode": "single", "n": 2, "mean_accuracy": 0.75},
+    ]
+    assert [r["run_id"] for r in memory.load_runs_since(1)] == ["r2", "r3"]
+
+
+def test_duplicate_run_is_rejected_without_changing_the_store():
+    memory.add_run_entry("r1", "m", "single", 1.0)
+    version = memory.store_version()
+    with pytest.raises(ValueError, match="already in the run store"):
+        memory.add_run_entry("r1", "m", "single", 0.0)
+    assert memory.store_version() == version
+    assert memory.get_aggregates()[0]["n"] == 1
+
+
+def test_merge_runs_replaces_and_adjusts_aggregates():
+    memory.add_run_entry("r1", "m", "single", 1.0)
+    memory.merge_runs([{"run_id": "r1", "model": "m", "mode": "single", "accuracy": 0.0}],
+                      manifest=[("experiments/r1_report.json", 10, 1, "r1")])
+    assert memory.get_aggregates() == [{"model": "m", "mode": "single", "n": 1, "mean_accuracy": 0.0}]
+    assert memory.load_manifest() == {"experiments/r1_report.json": (10, 1)}
+
+
+def test_failed_transaction_rolls_back(monkeypatch):
+    memory.add_run_entry("r1", "m", "single", 1.0)
+    insert = memory._insert
+
+    def failing_insert(conn, run):
+        if run["run_id"] == "boom":
+            raise sqlite3.OperationalError("disk I/O error")
+        return insert(conn, run)
+
+    monkeypatch.setattr(memory, "_insert", failing_insert)
+    with pytest.raises(sqlite3.OperationalError):
+        memory.save_index([{"run_id": "r2", "model": "m", "mode": "single", "accuracy": 1.0}, {"run_id": "boom"}])
+    assert [r["run_id"] for r in memory.load_index()] == ["r1"]
+    assert memory.get_aggregates()[0]["n"] == 1
@@ -0,0 +1,35 @@
+import json
+
+from core.records import append_rows, count_rows, export_json, has_rows, read_rows
+
+
+def test_runs_share_a_partition_and_read_back_by_offset(tmp_path):
+    root = str(tmp_path)
+    a = [{"id": f"a{i}", "pred": "é" * i} for i in range(5)]
+    b = [{"id": f"b{i}"} for i in range(3)]
+    append_rows("20240101-000000-a", "records", a, root=root)
+    append_rows("20240101-000001-b", "records", b, root=root)
+    assert len(list((tmp_path / "records").glob("*.jsonl.z"))) == 1
+    assert read_rows("20240101-000000-a", "records", root=root) == a
+    assert read_rows("20240101-000001-b", "records", root=root) == b
+    assert read_rows("20240101-000000-a", "records", 1, 3, root=root) == a[1:3]
+    assert count_rows("20240101-000001-b", "records", root=root) == 3
+
+
+def test_missing_run(tmp_path):
+    assert not has_rows("20240101-000000-x", "records", root=str(tmp_path))
+    assert read_rows("20240101-000000-x", "records", root=str(tmp_path)) == []
+
+
+def test_rewritten_run_reads_its_last_block(tmp_path):
+    append_rows("20240101-000000-a", "benchmark", [{"id": "old"}], root=str(tmp_path))
+    append_rows("20240101-000000-a", "benchmark", [{"id": "new"}, {"id": "new2"}], root=str(tmp_path))
+    assert [r["id"] for r in read_rows("20240101-000000-a", "benchmark", root=str(tmp_path))] == ["new", "new2"]
+
+
+def test_export_json(tmp_path):
+    rows = [{"id": "1", "gold": 2}]
+    append_rows("20240101-000000-a", "records", rows, root=str(tmp_path))
+    out = tmp_path / "r.json"
+    export_json("20240101-000000-a", "records", str(out), root=str(tmp_path))
+    assert json.loads(out.read_text()) == rows
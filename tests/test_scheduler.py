@@ -0,0 +1,78 @@
+import asyncio, time
+
+import pytest
+
+from core.governance import TokenBucket, rate_limiter
+from core.scheduler import gather_bounded
+
+
+def test_token_bucket_allows_burst_then_rate():
+    async def main():
+        bucket = TokenBucket(600, burst=2)  # 10 per second
+        t0 = time.monotonic()
+        for _ in range(2):
+            await bucket.acquire()
+        burst_s = time.monotonic() - t0
+        for _ in range(3):
+            await bucket.acquire()
+        return burst_s, time.monotonic() - t0
+
+    burst_s, total_s = asyncio.run(main())
+    assert burst_s < 0.05
+    assert total_s == pytest.approx(0.3, abs=0.1)
+
+
+def test_token_bucket_without_rate_never_waits():
+    async def main():
+        bucket = TokenBucket(None)
+        t0 = time.monotonic()
+        for _ in range(1000):
+            await bucket.acquire()
+        return time.monotonic() - t0
+
+    assert asyncio.run(main()) < 0.1
+
+
+def test_rate_limiter_is_shared_per_loop_and_backend():
+    rules = {"rate_limit_per_min": 60, "max_concurrency": 4}
+
+    async def main():
+        return rate_limiter(rules), rate_limiter(rules), rate_limiter(rules, "http://gpu-1:11434")
+
+    a, b, other = asyncio.run(main())
+    assert a is b
+    assert other is not a
+    assert asyncio.run(main())[0] is not a  # a new loop gets its own buckets
+
+
+def test_gather_bounded_limits_concurrency_and_keeps_order():
+    running = peak = 0
+
+    async def fn(x):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01 * (5 - x))
+        running -= 1
+        return x * 10
+
+    assert asyncio.run(gather_bounded(fn, range(5), limit=2)) == [0, 10, 20, 30, 40]
+    assert peak == 2
+
+
+def test_gather_bounded_retries_transient_errors_only():
+    calls = {}
+
+    async def fn(x):
+        calls[x] = calls.get(x, 0) + 1
+        if x == "flaky" and calls[x] < 3:
+            raise ConnectionError("try again")
+        if x == "bad":
+            raise ValueError("permanent")
+        return x
+
+    out = asyncio.run(gather_bounded(fn, ["ok", "flaky", "bad"], retries=2, return_exceptions=True,
+                                     retry_if=lambda e: isinstance(e, ConnectionError)))
+    assert out[:2] == ["ok", "flaky"]
+    assert isinstance(out[2], ValueError)
+    assert calls == {"ok": 1, "flaky": 3, "bad": 1}
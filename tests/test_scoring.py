@@ -0,0 +1,92 @@
+import math
+
+import pytest
+
+from core.scoring import (ANSWER_STOP_RE, extract_number, extract_yesno, score_batch, score_records,
+                          wilson_interval)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("42", 42.0),
+    ("1,049", 1049.0),
+    ("-3.5", -3.5),
+    ("The answer is 42.", 42.0),
+    ("12 + 30 = 42", 42.0),
+    ("Step 1: 7 apples. Final: 9", 9.0),
+    ("answer: **1,200**", 1200.0),
+    ("about 3 or 4", 3.0),
+    ("1e3", 1000.0),
+])
+def test_extract_number(text, expected):
+    assert extract_number(text) == expected
+
+
+def test_extract_number_without_a_number_is_nan():
+    assert math.isnan(extract_number("no idea"))
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Because of X.\nFinal: Yes", "Yes"),
+    ("reasoning\nfinal: no", "No"),
+    ("Final: Yes\nmore text", "Yes"),
+    ("I think yes.", None),
+])
+def test_extract_yesno(text, expected):
+    assert extract_yesno(text) == expected
+
+
+@pytest.mark.parametrize("reply, cut", [
+    ("42\n\nExplanation: 40 + 2", "42"),
+    ("1,049\n", "1,049"),
+    ("The answer is 1,049. Done", "The answer is 1,049"),
+    ("answer: 3.25 ok", "answer: 3.25"),
+    ("12 + 30 = 42\nso", "12 + 30 = 42"),
+    ("First 3 apples, then 4 more", None),   # no complete answer yet: stream to the end
+    ("42", None),                            # the number may still be growing
+])
+def test_answer_stop_cut(reply, cut):
+    m = ANSWER_STOP_RE.search(reply)
+    assert (reply[:m.end()] if m else None) == cut
+
+
+@pytest.mark.parametrize("reply", [
+    "42\n\nExplanation: 40 + 2",
+    "The answer is 1,049. Done",
+    "12 + 30 = 42\nso 42 it is",
+    "answer: 3.25 ok, or 4",
+])
+def test_answer_stop_cut_keeps_the_extracted_answer(reply):
+    """Stopping the stream at the match never changes what extract_number picks."""
+    m = ANSWER_STOP_RE.search(reply)
+    assert extract_number(reply[:m.end()]) == extract_number(reply)
+
+
+def test_metrics():
+    assert score_batch(["42", " 4 2", "41"], ["42", "42", "42"], "exact").tolist() == [1.0, 1.0, 0.0]
+    assert score_batch(["The answer is 1,049.", "none"], ["1049", "1"], "numeric").tolist() == [1.0, 0.0]
+    assert score_batch(["x\nFinal: No", "x\nFinal: Yes", "x"], ["no", "no", "no"], "yesno").tolist() == [1.0, 0.0, 0.0]
+    assert score_batch(["the cat sat"], ["the cat"], "f1")[0] == pytest.approx(0.8)
+    assert score_batch(["Result: 7"], [""], "regex", pattern=r"result:\s*\d").tolist() == [1.0]
+
+
+def test_score_records_sets_correct():
+    records = [{"pred": "7", "gold": 7}, {"pred": "8", "gold": 7}]
+    assert score_records(records, "math").tolist() == [1.0, 0.0]
+    assert [r["correct"] for r in records] == [1, 0]
+
+
+@pytest.mark.parametrize("k, n", [(0, 1), (0, 10), (3, 10), (10, 10), (50, 100), (1, 1000)])
+def test_wilson_interval_bounds(k, n):
+    lo, hi = wilson_interval(k, n)
+    assert 0.0 <= lo <= k / n <= hi <= 1.0
+    assert lo < hi
+
+
+def test_wilson_interval_edges():
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+    assert wilson_interval(0, 10)[0] == 0.0
+    assert wilson_interval(10, 10)[1] == 1.0
+    assert wilson_interval(5, 10, z=2.58)[1] - wilson_interval(5, 10, z=2.58)[0] > \
+        wilson_interval(5, 10)[1] - wilson_interval(5, 10)[0]
+    # more samples, narrower interval
+    assert wilson_interval(50, 100)[1] - wilson_interval(50, 100)[0] < wilson_interval(5, 10)[1] - wilson_interval(5, 10)[0]
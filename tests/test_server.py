@@ -0,0 +1,78 @@
+import asyncio, json
+
+import pytest
+
+from core import memory
+from core.checkpoint import Checkpoint, checkpoint_path
+from server import JobService, create_app
+
+
+async def _call(app, method, path, body=None, query=b""):
+    """One request through the ASGI app: (status, decoded JSON body)."""
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": json.dumps(body).encode() if body is not None else b"", "more_body": False}
+
+    async def send(msg):
+        sent.append(msg)
+
+    await app({"type": "http", "method": method, "path": path, "query_string": query}, receive, send)
+    return sent[0]["status"], json.loads(b"".join(m.get("body", b"") for m in sent[1:]))
+
+
+def test_jobs_cannot_choose_where_they_write(tmp_path):
+    async def main():
+        app = create_app(JobService(outdir=str(tmp_path)))
+        return [await _call(app, "POST", "/jobs", body)
+                for body in ({"kwargs": {"outdir": "/tmp"}}, {"kwargs": {"run_store": "/tmp/x.sqlite"}},
+                             {"cmd": "train"}, {"kwargs": {"n_itemz": 2}})]
+
+    (s1, b1), (s2, b2), (s3, _), (s4, _) = asyncio.run(main())
+    assert (s1, s2, s3, s4) == (400, 400, 400, 400)
+    assert "outdir is set by the server" in b1["error"] and "run_store is set by the server" in b2["error"]
+
+
+def test_resumed_jobs_are_limited_by_their_checkpointed_models(tmp_path):
+    cp = Checkpoint(checkpoint_path(str(tmp_path), "r1"))
+    (tmp_path / "checkpoints").mkdir()
+    cp.start({"run_id": "r1", "model": "saved-model", "judge_model": "saved-judge", "domain": "reason"})
+
+    async def main():
+        service = JobService(outdir=str(tmp_path))
+        job = service.submit("eval", {"resume": "r1", "model": "ignored"})
+        with pytest.raises(ValueError, match="nothing to resume"):
+            service.submit("eval", {"resume": "r2"})
+        return job
+
+    assert asyncio.run(main()).models == ["saved-model", "saved-judge"]
+
+
+@pytest.mark.usefixtures("ollama", "run_store")
+def test_job_runs_and_lands_in_the_servers_run_store(tmp_path):
+    out = tmp_path / "out"
+
+    async def main():
+        service = JobService(outdir=str(out))
+        app = create_app(service)
+        await service.start()
+        try:
+            status, job = await _call(app, "POST", "/jobs", {"cmd": "eval", "kwargs": {"n_items": 2}})
+            assert status == 202
+            events = [ev["event"] async for ev in service.jobs[job["id"]].stream()]
+            assert events[0] == "queued" and events[-1] == "done"
+            _, job = await _call(app, "GET", f"/jobs/{job['id']}")
+            _, runs = await _call(app, "GET", "/runs")
+            _, report = await _call(app, "GET", f"/runs/{job['run_ids'][0]}")
+            _, aggregates = await _call(app, "GET", "/aggregates")
+            return job, runs, report, aggregates
+        finally:
+            await service.stop()
+
+    job, runs, report, aggregates = asyncio.run(main())
+    assert job["status"] == "done" and job["result"]["metrics"]["n"] == 2
+    assert [r["run_id"] for r in runs] == job["run_ids"]
+    assert report["run_id"] == job["run_ids"][0] and report["rescored"] == []
+    assert aggregates[0]["n"] == 1
+    assert memory.load_index(str(out / "runs.sqlite")) == runs
+    assert memory.load_index() == []  # the process-wide default store is untouched
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from core import memory
+from core.trends import TrendCache, ewma, rolling_mean
+
+
+pytestmark = pytest.mark.usefixtures("run_store")
+
+
+def _add(start, n):
+    rng = np.random.default_rng(start)
+    for i in range(start, start + n):
+        memory.add_run_entry(f"r{i}", f"m{i % 2}", ("single", "multi")[i % 3 == 0], float(rng.random()))
+
+
+def _assert_same(a: TrendCache, b: TrendCache):
+    assert a.groups.keys() == b.groups.keys()
+    for key, g in a.groups.items():
+        for f in TrendCache.FIELDS:
+            np.testing.assert_allclose(g[f], b.groups[key][f], err_msg=f"{key} {f}")
+
+
+def test_rolling_mean_and_ewma_continue_from_the_tail():
+    x = np.random.default_rng(0).random(300)
+    naive = [x[max(0, i - 9):i + 1].mean() for i in range(len(x))]
+    np.testing.assert_allclose(rolling_mean(x, 10), naive)
+    np.testing.assert_allclose(rolling_mean(x[120:], 10, prev=x[:120]), naive[120:])
+    y, naive = x[0], []
+    for v in x:
+        y = 0.05 * v + 0.95 * y
+        naive.append(y)
+    np.testing.assert_allclose(ewma(x, 0.05), naive)
+    np.testing.assert_allclose(ewma(x[120:], 0.05, start=naive[119]), naive[120:])
+
+
+def test_incremental_updates_match_a_full_rebuild(tmp_path):
+    path = str(tmp_path / "trend_cache.npz")
+    _add(0, 40)
+    cache = TrendCache(path, window=5, alpha=0.2)
+    assert cache.update() == {("m0", "single"), ("m0", "multi"), ("m1", "single"), ("m1", "multi")}
+    cache.save()
+    assert TrendCache(path, window=5, alpha=0.2).update() == set()  # nothing new
+
+    _add(40, 7)
+    cache = TrendCache(path, window=5, alpha=0.2)  # reloaded from disk
+    assert cache.update()
+    cache.save()
+    _add(47, 1)
+    assert cache.update() == {("m1", "single")}
+
+    full = TrendCache(str(tmp_path / "other.npz"), window=5, alpha=0.2)
+    full.update(rebuild=True)
+    _assert_same(cache, full)
+    assert sum(len(g["seq"]) for g in cache.groups.values()) == 48
+
+
+def test_replaced_store_is_recomputed(tmp_path):
+    _add(0, 10)
+    cache = TrendCache(str(tmp_path / "trend_cache.npz"), window=3, alpha=0.5)
+    cache.update()
+    memory.save_index([r for r in memory.load_index() if r["model"] == "m0"])
+    cache.update()
+    assert {k[0] for k in cache.groups} == {"m0"}
+    full = TrendCache(str(tmp_path / "other.npz"), window=3, alpha=0.5)
+    full.update()
+    _assert_same(cache, full)
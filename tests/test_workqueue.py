@@ -0,0 +1,46 @@
+import time
+
+import pytest
+
+from core.workqueue import WorkQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return WorkQueue(str(tmp_path / "queue.sqlite"))
+
+
+def test_lease_in_order_and_complete(queue):
+    ids = queue.put("b1", [{"n": 1}, {"n": 2}])
+    assert queue.lease("w1") == (ids[0], {"n": 1})
+    assert queue.lease("w2") == (ids[1], {"n": 2})
+    assert queue.lease("w3") is None
+    assert queue.leased("b1") == 2
+    queue.complete(ids[0], {"ok": True})
+    assert queue.finished("b1") == {ids[0]: ("done", {"ok": True}, None)}
+
+
+def test_expired_lease_is_leased_again(queue):
+    (uid,) = queue.put("b1", [{"n": 1}])
+    assert queue.lease("w1", lease_s=0.05)[0] == uid
+    assert queue.lease("w2") is None
+    time.sleep(0.1)
+    assert queue.lease("w2")[0] == uid
+
+
+def test_fail_retries_then_gives_up(queue):
+    (uid,) = queue.put("b1", [{"n": 1}])
+    for attempt in range(1, 4):
+        assert queue.lease("w1")[0] == uid
+        queue.fail(uid, f"boom {attempt}", max_attempts=3)
+    assert queue.lease("w1") is None
+    assert queue.finished("b1") == {uid: ("failed", None, "boom 3")}
+
+
+def test_batches_are_separate(queue):
+    queue.put("b1", [{"n": 1}])
+    (uid,) = queue.put("b2", [{"n": 2}])
+    assert queue.leased("b2") == 0
+    queue.purge("b1")
+    assert queue.lease("w1")[0] == uid
+    assert queue.stats() == {"leased": 1}
@@ -1,32 +1,100 @@
-import json, glob, os
-from statistics import mean
+"""
+Index experiments/*_report.json into the run store.
+
+    python tools/backfill_index.py                 # only new or changed reports
+    python tools/backfill_index.py --full          # rebuild the store from every report
+    python tools/backfill_index.py --watch 10      # keep indexing (e.g. reports synced from other hosts)
+
+Processed files are tracked in the store's backfill manifest (path, size,
+mtime), so a rerun parses only what changed. Large batches are parsed in a
+process pool; each batch is merged into the store in one transaction.
+"""
+import argparse, glob, json, os, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.io import pool_map
+from core.memory import load_manifest, merge_runs, STORE_PATH
+
+POOL_MIN_FILES = 64  # see core.io.pool_map
 
-INDEX_PATH = "experiments/index.json"
 
 def load(path):
     with open(path) as f:
         return json.load(f)
 
-def main():
-    runs = []
-    for p in sorted(glob.glob("experiments/*_report.json")):
+def parse_report(path):
+    """(path, run entry or None, error or None); runs in pool workers."""
+    try:
+        rep = load(path)
+        rid = rep.get("run_id") or os.path.basename(path).split("_report.json")[0]
+        model = rep.get("model", "unknown")
+        domain = rep.get("domain", "math")
+        mode = rep.get("mode") if domain == "math" else domain
+        acc = rep.get("metrics", {}).get("accuracy", None)
+        if acc is None:
+            return path, None, None
+        timing = rep.get("timing") or {}
+        usage = (timing.get("usage") or {}).values()
+        return path, {
+            "run_id": rid, "model": model, "mode": mode, "accuracy": acc,
+            "total_s": timing.get("total_s"),
+            "items_per_s": timing.get("items_per_s"),
+            "p50_latency_ms": (timing.get("latency_ms") or {}).get("p50"),
+            "eval_tokens": sum(u.get("eval_tokens", 0) for u in usage) if usage else None,
+            "load_ms": sum(u.get("load_ms", 0.0) for u in usage) if usage else None,
+        }, None
+    except Exception as e:
+        return path, None, str(e)
+
+def pending(pattern: str, manifest: dict):
+    """{path: (size, mtime_ns)} for reports that are new or changed since the manifest."""
+    out = {}
+    for p in glob.glob(pattern):
         try:
-            rep = load(p)
-            rid = rep.get("run_id") or os.path.basename(p).split("_report.json")[0]
-            model = rep.get("model", "unknown")
-            domain = rep.get("domain", "math")
-            mode = rep.get("mode") if domain == "math" else domain
-            acc = rep.get("metrics", {}).get("accuracy", None)
-            if acc is None:
-                continue
-            runs.append({"run_id": rid, "model": model, "mode": mode, "accuracy": acc})
-        except Exception as e:
-            print(f"[skip] {p}: {e}")
-
-    os.makedirs(os.path.dirname(INDEX_PATH), exist_ok=True)
-    with open(INDEX_PATH, "w") as f:
-        json.dump(runs, f, indent=2)
-    print(f"Wrote {len(runs)} runs to {INDEX_PATH}")
+            st = os.stat(p)
+        except FileNotFoundError:
+            continue  # removed between glob and stat
+        sig = (st.st_size, st.st_mtime_ns)
+        if manifest.get(p) != sig:
+            out[p] = sig
+    return out
+
+def backfill(pattern: str, workers: int | None = None, full: bool = False) -> int:
+    """Index new/changed reports matching `pattern`; returns the number of runs merged."""
+    todo = pending(pattern, {} if full else load_manifest())
+    if not todo and not full:
+        return 0
+    paths = sorted(todo)
+    parsed = pool_map(parse_report, paths, POOL_MIN_FILES, workers, chunksize=32)
+
+    runs, manifest = [], []
+    for path, run, err in parsed:
+        if err:
+            print(f"[skip] {path}: {err}")
+        if run is not None:
+            runs.append(run)
+        manifest.append((path, *todo[path], run["run_id"] if run else None))
+    merge_runs(runs, manifest, replace=full)
+    return len(runs)
+
+def main():
+    p = argparse.ArgumentParser(description="Index run reports into the run store")
+    p.add_argument("--pattern", default="experiments/*_report.json")
+    p.add_argument("--workers", type=int, default=None, help="parser processes (default: CPU count)")
+    p.add_argument("--full", action="store_true", help="rebuild the store from scratch")
+    p.add_argument("--watch", type=float, default=0, help="poll every N seconds until interrupted")
+    args = p.parse_args()
+
+    n = backfill(args.pattern, args.workers, args.full)
+    print(f"Merged {n} runs into {STORE_PATH}")
+    try:
+        while args.watch > 0:
+            time.sleep(args.watch)
+            n = backfill(args.pattern, args.workers)
+            if n:
+                print(f"Merged {n} runs into {STORE_PATH}")
+    except KeyboardInterrupt:
+        pass
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
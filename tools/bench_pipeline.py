@@ -0,0 +1,199 @@
+"""
+Offline throughput benchmark for run_round, against tools/mock_ollama.py.
+
+    python tools/bench_pipeline.py --sizes 12,48,192 --concurrency 1,4,16 --out bench.json
+    python tools/bench_pipeline.py --baseline bench.json      # compare against an earlier run
+
+Every (domain, size, concurrency) case runs in a scratch directory with its own
+governance.yaml, so the real experiments/ folder and run store are untouched.
+Results are written as JSON (stable keys, one entry per case) for diffing.
+"""
+import argparse, asyncio, contextlib, io, json, os, platform, resource, subprocess, sys, tempfile, threading, time, tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from tools.mock_ollama import MockOllama
+from core.timing import percentile as pct
+
+
+def _git_rev():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except Exception:
+        return None
+
+def _start_server(**kw) -> MockOllama:
+    """Run the mock server on its own event loop in a daemon thread."""
+    ready = threading.Event()
+    holder = {}
+
+    def _run():
+        loop = asyncio.new_event_loop()
+        holder["srv"] = loop.run_until_complete(MockOllama(**kw).start())
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=_run, daemon=True).start()
+    ready.wait()
+    return holder["srv"]
+
+
+def _write_rules(path, base, **overrides):
+    import yaml
+    rules = dict(base)
+    rules.update(overrides)
+    with open(path, "w") as f:
+        yaml.safe_dump(rules, f)
+
+
+async def _run_case(orch, prompts, domain, n, trace_mem):
+    cand_lat, judge_lat = [], []
+    judge_time = [0.0]
+
+    def timed(fn, sink):
+        async def wrapper(*a, **kw):
+            t = time.perf_counter()
+            try:
+                return await fn(*a, **kw)
+            finally:
+                sink.append(time.perf_counter() - t)
+        return wrapper
+
+    evaluate_reasoning = orch.evaluate_reasoning
+    sinks = {prompts.MATH: cand_lat, prompts.REASON: cand_lat, prompts.JUDGE: judge_lat, prompts.JUDGE_BATCH: judge_lat}
+
+    async def timed_judge(*a, **kw):
+        t = time.perf_counter()
+        try:
+            return await evaluate_reasoning(*a, **kw)
+        finally:
+            judge_time[0] += time.perf_counter() - t
+
+    for p, sink in sinks.items():
+        p.chat = timed(p.chat, sink)  # instance attribute shadows PromptPrefix.chat
+    orch.evaluate_reasoning = timed_judge
+    if trace_mem:
+        tracemalloc.start()
+    err = None
+    t0 = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            rep = await orch.run_round(n_items=n, domain=domain, outdir="experiments")
+    except Exception as e:
+        rep, err = None, f"{type(e).__name__}: {e}"
+    wall = time.perf_counter() - t0
+    py_peak = tracemalloc.get_traced_memory()[1] if trace_mem else None
+    if trace_mem:
+        tracemalloc.stop()
+    for p in sinks:
+        del p.chat
+    orch.evaluate_reasoning = evaluate_reasoning
+
+    ms = lambda xs, q: (round(pct(xs, q) * 1000, 2) if xs else None)
+    return {
+        "domain": domain,
+        "n_items": n,
+        "wall_s": round(wall, 4),
+        "items_per_s": round(n / wall, 2) if rep else None,
+        "candidate_calls": len(cand_lat),
+        "candidate_latency_ms": {"p50": ms(cand_lat, 50), "p95": ms(cand_lat, 95), "p99": ms(cand_lat, 99)},
+        "judge_calls": len(judge_lat),
+        "judge_latency_ms": {"p50": ms(judge_lat, 50), "p95": ms(judge_lat, 95), "p99": ms(judge_lat, 99)},
+        "judge_s": round(judge_time[0], 4),
+        "judge_share": round(judge_time[0] / wall, 4) if wall else None,
+        "accuracy": rep["metrics"]["accuracy"] if rep else None,
+        "prompt_tokens": sum(u["prompt_tokens"] for u in rep["timing"]["usage"].values()) if rep else None,
+        "prefix_tokens_saved": sum(u["prefix_tokens_saved"] for u in rep["timing"]["usage"].values()) if rep else None,
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "py_peak_mb": round(py_peak / 2**20, 2) if py_peak is not None else None,
+        "error": err,
+    }
+
+
+def run(args) -> dict:
+    import yaml
+    with open(os.path.join(ROOT, "config", "governance.yaml")) as f:
+        base = yaml.safe_load(f) or {}
+
+    srv = _start_server(latency=args.latency, token_delay=args.token_delay, error_rate=args.error_rate, seed=args.seed,
+                        prompt_token_delay=args.prompt_token_delay)
+    scratch = tempfile.mkdtemp(prefix="autoeval-bench-")
+    rules_path = os.path.join(scratch, "governance.yaml")
+    os.environ.update(OLLAMA_BASE_URL=srv.url, AUTOEVAL_NO_CACHE="1", AUTOEVAL_GOVERNANCE=rules_path)
+    os.chdir(scratch)  # all artifact paths are relative to the cwd
+
+    import orchestrator as orch
+    from models import prompts
+
+    sizes = [int(x) for x in args.sizes.split(",")]
+    results = []
+    for domain in args.domains.split(","):
+        for c in [int(x) for x in args.concurrency.split(",")]:
+            for n in sizes:
+                _write_rules(
+                    rules_path, base,
+                    max_items_per_round=max(sizes), rate_limit_per_min=0, max_concurrency=c,
+                    stream_answers=args.stream, judge_batch_size=args.judge_batch, item_retries=args.retries,
+                )
+                res = asyncio.run(_run_case(orch, prompts, domain, n, args.tracemalloc))
+                res["concurrency"] = c
+                results.append(res)
+                print(f"{domain:6s} n={n:<5d} c={c:<3d} {res['items_per_s'] or 0:8.2f} items/s  "
+                      f"p95={res['candidate_latency_ms']['p95']}ms  judge_share={res['judge_share']}"
+                      + (f"  ERROR {res['error']}" if res["error"] else ""), file=sys.stderr)
+
+    return {
+        "meta": {
+            "git_rev": _git_rev(),
+            "python": platform.python_version(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "args": vars(args),
+            "server": {"requests": srv.requests, "errors": srv.errors},
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict):
+    key = lambda r: (r["domain"], r["n_items"], r["concurrency"])
+    old = {key(r): r for r in baseline["results"]}
+    for r in current["results"]:
+        b = old.get(key(r))
+        if b and b.get("items_per_s") and r.get("items_per_s"):
+            print(f"{r['domain']:6s} n={r['n_items']:<5d} c={r['concurrency']:<3d} "
+                  f"{b['items_per_s']:8.2f} -> {r['items_per_s']:8.2f} items/s ({r['items_per_s'] / b['items_per_s']:.2f}x)")
+
+
+def main():
+    p = argparse.ArgumentParser(description="AutoEval Lab pipeline benchmark (offline, mock Ollama)")
+    p.add_argument("--domains", default="math,reason")
+    p.add_argument("--sizes", default="12,48,192")
+    p.add_argument("--concurrency", default="1,4,16")
+    p.add_argument("--latency", default="lognormal:0.05:0.5", help="fixed:S | uniform:LO:HI | lognormal:MEDIAN:SIGMA")
+    p.add_argument("--token-delay", type=float, default=0.002)
+    p.add_argument("--prompt-token-delay", type=float, default=0.0, help="mock seconds per uncached prompt token")
+    p.add_argument("--error-rate", type=float, default=0.0)
+    p.add_argument("--retries", type=int, default=2)
+    p.add_argument("--stream", action=argparse.BooleanOptionalAction, default=True)
+    p.add_argument("--judge-batch", type=int, default=1)
+    p.add_argument("--tracemalloc", action="store_true", help="also report peak Python heap per case (slower)")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--out", default="", help="write JSON results here (default: stdout)")
+    p.add_argument("--baseline", default="", help="earlier results JSON to compare items/s against")
+    args = p.parse_args()
+
+    out = os.path.abspath(args.out) if args.out else ""
+    baseline = os.path.abspath(args.baseline) if args.baseline else ""
+    results = run(args)
+    text = json.dumps(results, indent=2)
+    if out:
+        with open(out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if baseline:
+        with open(baseline) as f:
+            compare(results, json.load(f))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Cold-start guard for the CLI: schedulers run `python app.py ...` many times,
+so starting it must stay cheap, above all when the job goes to the daemon.
+
+    python tools/bench_startup.py                       # median start-up of a forwarded `app.py eval`
+    python tools/bench_startup.py --budget-ms 50 --out startup.json
+    python tools/bench_startup.py --baseline startup.json
+    python tools/bench_startup.py --cmd "rescore --help" --no-daemon
+
+Each sample is a fresh interpreter running `python app.py <cmd>` end to end
+(one extra run under -X importtime lists what it imports). By default
+AUTOEVAL_DAEMON points at a stub daemon started here that answers every job
+at once, so the sample is the CLI's own cost. The budget applies to the overhead over a bare `python -c pass`. Exits non-zero
+if the median overhead exceeds --budget-ms or if the command pulls in any
+module from HEAVY.
+"""
+import argparse, json, os, shlex, socket, statistics, subprocess, sys, tempfile, threading, time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Only imported once a command runs here (never when the job goes to the daemon)
+HEAVY = ("asyncio", "orchestrator", "httpx", "yaml", "numpy", "typer", "pandas", "matplotlib", "streamlit")
+
+# Enough of a report / summary for app.py's printing
+STUB_RESULT = {"metrics": {}, "suggested_next_mode": None}
+
+
+def _stub_daemon(path: str):
+    """Answer every job on `path` with STUB_RESULT (same protocol as daemon.py), in a thread."""
+    srv = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    srv.bind(path)
+    srv.listen(8)
+
+    def loop():
+        while True:
+            try:
+                conn, _ = srv.accept()
+            except OSError:
+                return  # closed
+            with conn, conn.makefile("rb") as f:
+                f.readline()
+                conn.sendall(json.dumps({"ok": True, "result": STUB_RESULT}).encode() + b"\n")
+
+    threading.Thread(target=loop, daemon=True).start()
+    return srv
+
+
+def _wall_ms(argv: list[str], env: dict) -> float:
+    t0 = time.perf_counter()
+    subprocess.run(argv, cwd=ROOT, env=env, capture_output=True, check=True)
+    return (time.perf_counter() - t0) * 1000
+
+
+def _heavy(argv: list[str], env: dict) -> list[str]:
+    """Modules from HEAVY that `argv` (a python command line) imports."""
+    p = subprocess.run([argv[0], "-X", "importtime", *argv[1:]], cwd=ROOT, env=env,
+                       capture_output=True, text=True, check=True)
+    loaded = set()
+    for line in p.stderr.splitlines():
+        parts = [x.strip() for x in line.removeprefix("import time:").split("|")]
+        if len(parts) == 3:
+            loaded.add(parts[2].split(".")[0])
+    return [m for m in HEAVY if m in loaded]
+
+
+def run(args) -> dict:
+    env = dict(os.environ)
+    env.pop("AUTOEVAL_DAEMON", None)
+    srv = None
+    if not args.no_daemon:
+        path = os.path.join(tempfile.mkdtemp(prefix="autoeval-bench-"), "stub.sock")
+        srv = _stub_daemon(path)
+        env["AUTOEVAL_DAEMON"] = path
+    cmd = [sys.executable, "app.py", *shlex.split(args.cmd)]
+    try:
+        heavy = _heavy(cmd, env)
+        times, bare = [], []
+        for _ in range(args.repeat):
+            times.append(_wall_ms(cmd, env))
+            bare.append(_wall_ms([sys.executable, "-c", "pass"], env))
+    finally:
+        if srv is not None:
+            srv.close()
+    median, python = statistics.median(times), statistics.median(bare)
+    return {
+        "cmd": f"app.py {args.cmd}",
+        "daemon": not args.no_daemon,
+        "repeat": args.repeat,
+        "median_ms": round(median, 2),
+        "min_ms": round(min(times), 2),
+        "max_ms": round(max(times), 2),
+        "python_ms": round(python, 2),
+        "overhead_ms": round(median - python, 2),
+        "heavy_imports": heavy,
+    }
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--cmd", default="eval --n 1", help="arguments after `app.py`")
+    p.add_argument("--no-daemon", action="store_true", help="don't start a stub daemon (time the command run here)")
+    p.add_argument("--repeat", type=int, default=15)
+    p.add_argument("--budget-ms", type=float, default=50.0, help="fail if the median overhead over `python -c pass` is above this")
+    p.add_argument("--out", default="", help="write JSON results here (default: stdout)")
+    p.add_argument("--baseline", default="", help="earlier results JSON to compare against")
+    args = p.parse_args()
+
+    res = run(args)
+    text = json.dumps(res, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.baseline:
+        with open(args.baseline) as f:
+            base = json.load(f)
+        print(f"overhead {base['overhead_ms']:.1f} ms -> {res['overhead_ms']:.1f} ms "
+              f"({res['overhead_ms'] / base['overhead_ms']:.2f}x)", file=sys.stderr)
+
+    failures = []
+    if res["heavy_imports"]:
+        failures.append(f"`{res['cmd']}` loads {', '.join(res['heavy_imports'])}")
+    if res["overhead_ms"] > args.budget_ms:
+        failures.append(f"median start-up overhead {res['overhead_ms']:.1f} ms > budget {args.budget_ms:.1f} ms")
+    for msg in failures:
+        print(f"FAIL: {msg}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Stand-in for Ollama's /api/chat, for offline benchmarks.
+
+    python tools/mock_ollama.py --port 11434 --latency lognormal:0.05:0.5 --error-rate 0.01
+
+Replies are plausible for every prompt the pipeline sends: math answers
+(followed by rambling, to exercise streaming cut-off), reasoning with a
+"Final: Yes/No" line, and single or numbered judge scores. With --load-s,
+only --vram-models models stay resident; touching another one costs a load
+(reported as load_duration), like a small-VRAM Ollama host. Like Ollama's
+KV cache, the leading prompt tokens shared with the model's previous request
+are not re-evaluated: prompt_eval_count only counts the rest, and
+--prompt-token-delay is charged per evaluated token.
+"""
+import argparse, asyncio, json, random, re, time
+from collections import OrderedDict
+
+MATH_RE = re.compile(r"^(-?\d+(?:\s*[+-]\s*-?\d+)+)\s*=\s*\?", re.MULTILINE)
+
+
+def parse_latency(spec: str):
+    """'fixed:S' | 'uniform:LO:HI' | 'lognormal:MEDIAN:SIGMA' (seconds) -> sampler(rng)."""
+    kind, *args = spec.split(":")
+    a = [float(x) for x in args]
+    if kind == "fixed":
+        return lambda rng: a[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(a[0], a[1])
+    if kind == "lognormal":
+        import math
+        return lambda rng: rng.lognormvariate(math.log(a[0]), a[1])
+    raise ValueError(f"unknown latency spec: {spec}")
+
+
+class MockOllama:
+    def __init__(self, host="127.0.0.1", port=0, latency="lognormal:0.05:0.5", token_delay=0.002,
+                 error_rate=0.0, accuracy=0.8, seed=0, load_s=0.0, vram_models=2, prompt_token_delay=0.0):
+        self.host, self.port = host, port
+        self.latency = parse_latency(latency)
+        self.token_delay = token_delay
+        self.error_rate = error_rate
+        self.accuracy = accuracy
+        self.rng = random.Random(seed)
+        self.load_s = load_s
+        self.vram_models = vram_models
+        self.prompt_token_delay = prompt_token_delay
+        self.resident: OrderedDict[str, None] = OrderedDict()
+        self.kv: dict[str, list[str]] = {}  # model -> tokens of its last prompt
+        self.loads = 0
+        self.requests = 0
+        self.errors = 0
+        self._server = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    # ---- reply content
+    def reply(self, messages: list[dict]) -> str:
+        system = " ".join(m.get("content", "") for m in messages if m.get("role") == "system")
+        user = (messages[-1].get("content") or "") if messages else ""
+        if "numbered scores" in system:
+            n = user.count("### ITEM")
+            return "\n".join(f"{i}: {self.rng.choice([3.0, 4.0, 4.5, 5.0])}" for i in range(1, n + 1))
+        if "numeric score" in system:
+            return str(self.rng.choice([3.0, 4.0, 4.5, 5.0]))
+        m = MATH_RE.search(user)
+        if m:
+            ans = eval(m.group(1))  # operands and +/- only, matched above
+            if self.rng.random() >= self.accuracy:
+                ans += self.rng.choice([-1, 1])
+            return f"{ans}\n\nExplanation: adding and subtracting the terms from left to right gives {ans}."
+        label = "Yes" if self.rng.random() < 0.7 else "No"
+        return f"The premises determine the conclusion directly, so the answer is {label.lower()}.\nFinal: {label}"
+
+    # ---- HTTP/1.1 (keep-alive, fixed-length and chunked responses)
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                headers = {}
+                while (h := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    k, _, v = h.decode().partition(":")
+                    headers[k.strip().lower()] = v.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                await self._respond(json.loads(body or b"{}"), writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # client hung up (e.g. streaming cut-off)
+        finally:
+            writer.close()
+
+    def _evaluate(self, model: str, messages: list[dict]) -> int:
+        """Prompt tokens not covered by the cached prefix of the model's previous prompt."""
+        tokens = " ".join(f"<{m.get('role')}> {m.get('content') or ''}" for m in messages).split()
+        last = self.kv.get(model, [])
+        common = 0
+        for a, b in zip(tokens, last):
+            if a != b:
+                break
+            common += 1
+        self.kv[model] = tokens
+        return len(tokens) - common
+
+    async def _load(self, model: str) -> float:
+        """LRU residency; returns seconds spent loading `model` (0 if already resident)."""
+        if model in self.resident:
+            self.resident.move_to_end(model)
+            return 0.0
+        self.resident[model] = None
+        self.kv.pop(model, None)
+        while len(self.resident) > self.vram_models:
+            evicted, _ = self.resident.popitem(last=False)
+            self.kv.pop(evicted, None)
+        self.loads += 1
+        await asyncio.sleep(self.load_s)
+        return self.load_s
+
+    async def _respond(self, req: dict, writer):
+        self.requests += 1
+        t0 = time.perf_counter()
+        model = req.get("model", "mock")
+        load_s = await self._load(model)
+        if not req.get("messages"):  # preload request
+            body = json.dumps({"model": model, "done": True, "done_reason": "load",
+                               "load_duration": int(load_s * 1e9)}).encode()
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                         b"Content-Length: %d\r\n\r\n%s" % (len(body), body))
+            await writer.drain()
+            return
+        prompt_tokens = self._evaluate(model, req["messages"])
+        await asyncio.sleep(self.latency(self.rng) + prompt_tokens * self.prompt_token_delay)
+        if self.rng.random() < self.error_rate:
+            self.errors += 1
+            body = b'{"error": "mock failure"}'
+            writer.write(b"HTTP/1.1 500 Internal Server Error\r\nContent-Type: application/json\r\n"
+                         b"Content-Length: %d\r\n\r\n%s" % (len(body), body))
+            await writer.drain()
+            return
+        text = self.reply(req.get("messages") or [])
+        if (req.get("options") or {}).get("num_predict"):
+            text = " ".join(text.split()[: req["options"]["num_predict"]])
+        if not req.get("stream"):
+            body = json.dumps({"model": model, "message": {"role": "assistant", "content": text}, "done": True,
+                               **self._counters(t0, prompt_tokens, len(text.split()), load_s)}).encode()
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                         b"Content-Length: %d\r\n\r\n%s" % (len(body), body))
+            await writer.drain()
+            return
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nTransfer-Encoding: chunked\r\n\r\n")
+        tokens = re.findall(r"\S+\s*|\s+", text)
+        for tok in tokens:
+            await asyncio.sleep(self.token_delay)
+            self._chunk(writer, {"model": model, "message": {"role": "assistant", "content": tok}, "done": False})
+            await writer.drain()
+        self._chunk(writer, {"model": model, "done": True, **self._counters(t0, prompt_tokens, len(tokens), load_s)})
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    @staticmethod
+    def _counters(t0, prompt_tokens, eval_tokens, load_s=0.0):
+        """Ollama-style timing/token fields (durations in ns)."""
+        total = int((time.perf_counter() - t0) * 1e9)
+        load = int(load_s * 1e9)
+        return {"total_duration": total, "load_duration": load, "prompt_eval_count": prompt_tokens,
+                "eval_count": eval_tokens, "eval_duration": total - load}
+
+    @staticmethod
+    def _chunk(writer, obj):
+        data = (json.dumps(obj) + "\n").encode()
+        writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+
+
+async def _serve(args):
+    srv = await MockOllama(args.host, args.port, args.latency, args.token_delay, args.error_rate, args.accuracy,
+                           args.seed, args.load_s, args.vram_models, args.prompt_token_delay).start()
+    print(f"mock ollama listening on {srv.url}")
+    await asyncio.Event().wait()
+
+def main():
+    p = argparse.ArgumentParser(description="Mock Ollama /api/chat server")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=11434)
+    p.add_argument("--latency", default="lognormal:0.05:0.5", help="fixed:S | uniform:LO:HI | lognormal:MEDIAN:SIGMA")
+    p.add_argument("--token-delay", type=float, default=0.002, help="seconds between streamed chunks")
+    p.add_argument("--error-rate", type=float, default=0.0)
+    p.add_argument("--accuracy", type=float, default=0.8, help="fraction of correct math answers")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--load-s", type=float, default=0.0, help="seconds to load a model that isn't resident")
+    p.add_argument("--vram-models", type=int, default=2, help="models that fit in VRAM at once")
+    p.add_argument("--prompt-token-delay", type=float, default=0.0, help="seconds per evaluated (uncached) prompt token")
+    try:
+        asyncio.run(_serve(p.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# worker.py
+"""
+Distributed worker: pulls work units from the coordinator's queue and runs
+the candidate (and, for reasoning, judge) stages against this host's Ollama
+(OLLAMA_BASE_URL). Start one per inference box, or several on one machine:
+
+    python app.py worker --queue /shared/autoeval/queue.sqlite   (or: python worker.py --queue ...)
+
+The coordinator is any eval/experiment/tournament run whose governance.yaml
+sets `work_queue` to the same file.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+from core.governance import load_rules, rate_limiter, schedule_params
+from core.scheduler import gather_bounded
+from core.workqueue import WorkQueue, worker_name
+from agents.dataset_agent import Item
+from agents.evaluator_agent import evaluate_reasoning
+from models import prompts
+from models.ollama_client import preload, pooled, track_usage
+from orchestrator import answer_item, error_record
+
+
+async def run_unit(unit: Dict[str, Any], rules: Dict[str, Any], *, name: str, limiter=None) -> Dict[str, Any]:
+    """Answer (and judge) one unit's items; returns {"records", "usage"} for the coordinator."""
+    items = [Item(**d) for d in unit["items"]]
+    sched = schedule_params(rules, limiter)
+    usage: Dict[str, Dict[str, Any]] = {}
+
+    async def answer(it):
+        return await answer_item(unit["domain"], unit["model"], it, mode=unit["mode"], stream=unit["stream"])
+
+    with track_usage() as usage["generate"]:
+        results = await gather_bounded(answer, items, return_exceptions=True, **sched)
+    records = [error_record(it, r) if isinstance(r, Exception) else r for it, r in zip(items, results)]
+    for r in records:
+        r["gen"]["worker"] = name
+
+    scored = [r for r in records if "error" not in r]
+    if unit.get("judge_model") and scored:
+        with track_usage() as usage["judge"]:
+            await evaluate_reasoning(
+                scored, unit["judge_model"], concurrency=sched["limit"],
+                batch_size=unit.get("judge_batch_size", 1), limiter=limiter,
+            )
+    return {"records": records, "usage": usage}
+
+
+@pooled
+async def run_worker(
+    queue_path: str,
+    *,
+    name: Optional[str] = None,
+    poll_s: float = 0.5,
+    lease_s: Optional[float] = None,      # default: work_lease_s from config/governance.yaml
+    idle_exit_s: Optional[float] = None,   # stop after this long without work (None: run forever)
+) -> int:
+    """Process units until interrupted (or idle for idle_exit_s); returns the number of units done."""
+    queue = WorkQueue(queue_path)
+    name = name or worker_name()
+    rules = load_rules()
+    lease_s = lease_s or float(rules.get("work_lease_s", 600))
+    limiter = rate_limiter(rules)
+    loaded: set = set()
+    done = 0
+    idle_since = time.monotonic()
+    print(f"[{name}] polling {queue_path}")
+    while True:
+        leased = queue.lease(name, lease_s)
+        if leased is None:
+            if idle_exit_s is not None and time.monotonic() - idle_since > idle_exit_s:
+                return done
+            await asyncio.sleep(poll_s)
+            continue
+        unit_id, unit = leased
+        try:
+            for m in (unit["model"], unit.get("judge_model")):
+                if m and m not in loaded:
+                    await preload(m)
+                    loaded.add(m)
+            await (prompts.MATH if unit["domain"] == "math" else prompts.REASON).warm(unit["model"])
+            if unit.get("judge_model"):
+                judge_prefix = prompts.JUDGE_BATCH if unit.get("judge_batch_size", 1) > 1 else prompts.JUDGE
+                await judge_prefix.warm(unit["judge_model"])
+            result = await run_unit(unit, rules, name=name, limiter=limiter)
+        except Exception as e:
+            queue.fail(unit_id, f"{type(e).__name__}: {e}")
+            print(f"[{name}] unit {unit_id} failed: {e}")
+        else:
+            queue.complete(unit_id, result)
+            done += 1
+        idle_since = time.monotonic()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="AutoEval Lab distributed worker")
+    parser.add_argument("--queue", default="experiments/queue.sqlite", help="work queue shared with the coordinator")
+    parser.add_argument("--name", default="", help="worker name in records (default: host-pid)")
+    parser.add_argument("--idle-exit", type=float, default=0.0, help="exit after this many idle seconds (0 = never)")
+    args = parser.parse_args()
+    try:
+        n = asyncio.run(run_worker(args.queue, name=args.name or None, idle_exit_s=args.idle_exit or None))
+        print(f"Processed {n} work units")
+    except KeyboardInterrupt:
+        pass